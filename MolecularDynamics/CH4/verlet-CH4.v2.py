@@ -1,6 +1,12 @@
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+
+# Modelo de fuerzas compartido (ETHANE/verlet-ETHANE-2/forces.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "ETHANE", "verlet-ETHANE-2"))
+from forces import bond_forces, bond_geometry
 
 # ==============================================
 # PARÁMETROS FÍSICOS (UNIDADES REALISTAS)
@@ -16,139 +22,203 @@ damping = 0.3  # coeficiente de amortiguamiento
 # ==============================================
 # INICIALIZACIÓN DEL SISTEMA
 # ==============================================
-def init_positions():
-    """Configuración inicial tetraédrica con pequeña perturbación"""
+def tetrahedral_positions():
+    """Geometría de equilibrio: tetraedro ideal con enlaces C-H de longitud r_eq"""
     positions = np.zeros((5, 3))
     # Posiciones tetraédricas ideales
     positions[1] = [ 1,  1,  1]  # H1
     positions[2] = [-1, -1,  1]  # H2
     positions[3] = [-1,  1, -1]  # H3
     positions[4] = [ 1, -1, -1]  # H4
-    # Normalizar a distancia de equilibrio y añadir perturbación
+    # Normalizar a distancia de equilibrio
+    positions[1:] *= r_eq / np.linalg.norm(positions[1:], axis=1)[:, None]
+    return positions
+
+def init_positions():
+    """Configuración inicial tetraédrica con pequeña perturbación"""
+    positions = tetrahedral_positions()
     for i in range(1, 5):
-        positions[i] = positions[i]/np.linalg.norm(positions[i]) * r_eq
         positions[i] += np.random.normal(0, 0.1, 3)  # Pequeña perturbación aleatoria
     return positions
 
 # ==============================================
-# CÁLCULO DE FUERZAS MEJORADO
+# TOPOLOGÍA Y CÁLCULO DE FUERZAS VECTORIZADO
 # ==============================================
-def compute_forces(pos, vel):
+# Enlaces (i, j) precalculados: C-H1 ... C-H4. Las distancias y fuerzas se
+# evalúan con las funciones vectorizadas de forces.py sobre este arreglo.
+BONDS = np.array([(0, i) for i in range(1, 5)])
+
+def compute_forces(pos, vel, damping=damping):
     forces = np.zeros_like(pos)
-    C = pos[0]
     
-    # Fuerzas de enlace C-H con protección numérica
-    for i in range(1, 5):
-        r_vec = pos[i] - C
-        r = np.linalg.norm(r_vec)
-        if r > 0.01:  # Evitar división por cero
-            f_mag = -k_bond * (r - r_eq)
-            forces[i] = f_mag * (r_vec/r)
-            forces[0] -= f_mag * (r_vec/r)
+    # Fuerzas de enlace C-H (forces.bond_forces ignora los enlaces con r <= R_MIN)
+    bond_forces(pos, forces, BONDS, r_eq, k_bond)
     
     # Amortiguamiento más fuerte para mejor minimización
     forces -= damping * vel
     
     return forces
 
+def bond_and_angle_energy(pos):
+    """Energía potencial de los enlaces C-H (este modelo no tiene términos angulares)"""
+    _, r = bond_geometry(pos, BONDS)
+    return 0.5 * k_bond * np.sum((r - r_eq)**2, axis=-1)
+
 # ==============================================
-# SIMULACIÓN CON VISUALIZACIÓN EN TIEMPO REAL
+# NÚCLEO DE SIMULACIÓN (SIN GRÁFICOS)
 # ==============================================
-def run_simulation_with_visualization():
+def run_simulation(n_steps=steps, observers=(), positions=None, damping=damping):
+    """
+    Integra con Velocity Verlet sin crear figuras ni importar matplotlib.
+    
+    observers: objetos con un atributo `every` que se llaman como
+    observer(step, positions, history) cada `every` pasos (gráficos,
+    escritura de archivos, análisis...). `history` es un diccionario con
+    las listas "dist", "pe", "ke" y "te" acumuladas hasta ese paso.
+    positions: configuración inicial (por defecto `init_positions()`).
+    damping: coeficiente de amortiguamiento; 0 para dinámica NVE.
+    """
     # Configuración inicial
-    positions = init_positions()
+    positions = init_positions() if positions is None else positions.copy()
     velocities = np.zeros_like(positions)
     masses = np.array([m_C] + [m_H]*4)
     
-    # Preparar gráficos
-    plt.ion()  # Modo interactivo
-    fig = plt.figure(figsize=(18, 6))
-    
-    # Gráfico 3D
-    ax1 = fig.add_subplot(131, projection='3d')
-    ax1.set_title('Estructura Molecular')
-    ax1.set_xlim(-2, 2)
-    ax1.set_ylim(-2, 2)
-    ax1.set_zlim(-2, 2)
-    
-    # Gráfico de distancias
-    ax2 = fig.add_subplot(132)
-    ax2.set_title('Distancias C-H')
-    ax2.set_xlabel('Paso')
-    ax2.set_ylabel('Distancia (Å)')
-    ax2.axhline(r_eq, color='k', linestyle='--')
-    
-    # Gráfico de energía
-    ax3 = fig.add_subplot(133)
-    ax3.set_title('Energías del Sistema')
-    ax3.set_xlabel('Paso')
-    ax3.set_ylabel('Energía (kcal/mol)')
-    
-    # Datos para gráficos
-    dist_history = [[] for _ in range(4)]
-    pe_history = []
-    ke_history = []
-    te_history = []
+    # Datos históricos
+    history = {"dist": [[] for _ in range(4)], "pe": [], "ke": [], "te": []}
     
     # Bucle principal de simulación
-    for step in range(steps):
+    for step in range(n_steps):
         # Velocity Verlet
-        forces = compute_forces(positions, velocities)
+        forces = compute_forces(positions, velocities, damping)
         positions += velocities * dt + 0.5 * forces/masses[:, None] * dt**2
-        new_forces = compute_forces(positions, velocities)
+        new_forces = compute_forces(positions, velocities, damping)
         velocities += 0.5 * (forces + new_forces)/masses[:, None] * dt
         
         # Calcular propiedades
-        pe = 0.5 * k_bond * sum((np.linalg.norm(positions[i]-positions[0])-r_eq)**2 for i in range(1,5))
-        ke = 0.5 * sum(m * np.sum(v**2) for m, v in zip(masses, velocities))
+        pe = bond_and_angle_energy(positions)
+        ke = 0.5 * np.sum(masses[:, None] * velocities**2)
         
         # Actualizar datos históricos
+        _, r = bond_geometry(positions, BONDS)
         for i in range(4):
-            dist_history[i].append(np.linalg.norm(positions[i+1]-positions[0]))
-        pe_history.append(pe)
-        ke_history.append(ke)
-        te_history.append(pe + ke)
+            history["dist"][i].append(r[i])
+        history["pe"].append(pe)
+        history["ke"].append(ke)
+        history["te"].append(pe + ke)
         
-        # Actualizar gráficos cada 100 pasos
-        if step % 100 == 0:
-            # Limpiar gráficos
-            ax1.cla()
-            ax2.cla()
-            ax3.cla()
-            
-            # Estructura 3D
-            ax1.scatter(*positions[0], c='black', s=200, label='C')
-            ax1.scatter(*positions[1:].T, c='red', s=100, label='H')
-            for i in range(1,5):
-                ax1.plot(*np.array([positions[0], positions[i]]).T, 'b-', alpha=0.5)
-            ax1.set_title(f'Estructura Molecular (Paso {step})')
-            ax1.set_xlim(-2, 2)
-            ax1.set_ylim(-2, 2)
-            ax1.set_zlim(-2, 2)
-            ax1.legend()
-            
-            # Distancias
-            for i in range(4):
-                ax2.plot(dist_history[i], label=f'C-H{i+1}')
-            ax2.axhline(r_eq, color='k', linestyle='--', label='Equilibrio')
-            ax2.set_title('Evolución de Distancias C-H')
-            ax2.legend()
-            ax2.grid(True)
-            
-            # Energías
-            ax3.plot(pe_history, 'r-', label='Potencial')
-            ax3.plot(ke_history, 'b-', label='Cinética')
-            ax3.plot(te_history, 'k--', label='Total')
-            ax3.set_title('Energías del Sistema')
-            ax3.legend()
-            ax3.grid(True)
-            
-            plt.tight_layout()
-            plt.draw()
-            plt.pause(0.001)
-    
-    plt.ioff()
-    return positions, dist_history, pe_history, ke_history, te_history
+        for observer in observers:
+            if step % observer.every == 0:
+                observer(step, positions, history)
+    
+    return positions, history["dist"], history["pe"], history["ke"], history["te"]
+
+# ==============================================
+# VISUALIZACIÓN EN TIEMPO REAL (OBSERVADOR)
+# ==============================================
+class LivePlot:
+    """Estructura 3D, distancias C-H y energías, redibujadas cada `every` pasos"""
+    
+    def __init__(self, every=100):
+        import matplotlib.pyplot as plt
+        self.plt = plt
+        self.every = every
+        
+        # Preparar gráficos
+        plt.ion()  # Modo interactivo
+        fig = plt.figure(figsize=(18, 6))
+        
+        # Gráfico 3D
+        self.ax1 = fig.add_subplot(131, projection='3d')
+        self.ax1.set_title('Estructura Molecular')
+        self.ax1.set_xlim(-2, 2)
+        self.ax1.set_ylim(-2, 2)
+        self.ax1.set_zlim(-2, 2)
+        
+        # Gráfico de distancias
+        self.ax2 = fig.add_subplot(132)
+        self.ax2.set_title('Distancias C-H')
+        self.ax2.set_xlabel('Paso')
+        self.ax2.set_ylabel('Distancia (Å)')
+        self.ax2.axhline(r_eq, color='k', linestyle='--')
+        
+        # Gráfico de energía
+        self.ax3 = fig.add_subplot(133)
+        self.ax3.set_title('Energías del Sistema')
+        self.ax3.set_xlabel('Paso')
+        self.ax3.set_ylabel('Energía (kcal/mol)')
+    
+    def __call__(self, step, positions, history):
+        plt, ax1, ax2, ax3 = self.plt, self.ax1, self.ax2, self.ax3
+        
+        # Limpiar gráficos
+        ax1.cla()
+        ax2.cla()
+        ax3.cla()
+        
+        # Estructura 3D
+        ax1.scatter(*positions[0], c='black', s=200, label='C')
+        ax1.scatter(*positions[1:].T, c='red', s=100, label='H')
+        for i in range(1,5):
+            ax1.plot(*np.array([positions[0], positions[i]]).T, 'b-', alpha=0.5)
+        ax1.set_title(f'Estructura Molecular (Paso {step})')
+        ax1.set_xlim(-2, 2)
+        ax1.set_ylim(-2, 2)
+        ax1.set_zlim(-2, 2)
+        ax1.legend()
+        
+        # Distancias
+        for i in range(4):
+            ax2.plot(history["dist"][i], label=f'C-H{i+1}')
+        ax2.axhline(r_eq, color='k', linestyle='--', label='Equilibrio')
+        ax2.set_title('Evolución de Distancias C-H')
+        ax2.legend()
+        ax2.grid(True)
+        
+        # Energías
+        ax3.plot(history["pe"], 'r-', label='Potencial')
+        ax3.plot(history["ke"], 'b-', label='Cinética')
+        ax3.plot(history["te"], 'k--', label='Total')
+        ax3.set_title('Energías del Sistema')
+        ax3.legend()
+        ax3.grid(True)
+        
+        plt.tight_layout()
+        plt.draw()
+        plt.pause(0.001)
+    
+    def close(self):
+        self.plt.ioff()
+
+def run_simulation_with_visualization(observers=()):
+    live_plot = LivePlot(every=100)
+    result = run_simulation(observers=[live_plot, *observers])
+    live_plot.close()
+    return result
+
+# ==============================================
+# ESPECTRO VIBRACIONAL
+# ==============================================
+class TrajectoryRecorder:
+    """Guarda una copia de las posiciones cada `every` pasos"""
+    
+    def __init__(self, every=1):
+        self.every = every
+        self.frames = []
+    
+    def __call__(self, step, positions, history):
+        self.frames.append(positions.copy())
+
+def vibrational_analysis(frames, dt_frame, n_peaks=3):
+    """
+    Espectro de potencia (FFT de la autocorrelación de velocidades, ver
+    ETHANE/verlet-ETHANE-2/spectrum.py) y frecuencias de sus picos. Las
+    velocidades se estiman por diferencias centradas entre frames.
+    """
+    from spectrum import vibrational_spectrum
+    
+    velocities = np.gradient(np.asarray(frames), dt_frame, axis=0)
+    masses = np.array([m_C] + [m_H]*4)
+    return vibrational_spectrum(velocities, dt_frame, n_peaks=n_peaks, masses=masses)
 
 # ==============================================
 # ANÁLISIS FINAL
@@ -186,5 +256,25 @@ if __name__ == "__main__":
     print(f"Desviación media del tetraedro: {np.mean(np.abs(np.array(angles)-109.47)):.2f}°")
     print(f"Energía total final: {te[-1]:.4f} kcal/mol")
     
+    # Frecuencias de estiramiento C-H (simétrico y asimétrico; sin términos
+    # angulares no hay modos de flexión). La minimización amortiguada no
+    # sirve para el espectro: las oscilaciones decaen y no dura lo bastante
+    # para separar dos picos a 0.18 de distancia. Se integra aparte un
+    # segmento NVE (sin amortiguamiento) desde el tetraedro ideal con
+    # estiramientos pequeños (~0.001 Å): sin ángulos que la frenen, la flexión
+    # se acopla al estiramiento asimétrico y con amplitudes mayores su pico
+    # se corre y se ensancha. La resolución es 1/(max_lag*dt_frame) ≈ 0.07.
+    nve_steps, nve_every = 30000, 10
+    nve_pos = tetrahedral_positions()
+    nve_pos[1:] += nve_pos[1:] / r_eq * np.random.normal(0.001, 0.001, (4, 1))
+    recorder = TrajectoryRecorder(every=nve_every)
+    run_simulation(n_steps=nve_steps, observers=[recorder], positions=nve_pos, damping=0.0)
+    freqs, spectrum, peaks = vibrational_analysis(recorder.frames, dt*nve_every, n_peaks=2)
+    expected = np.array([np.sqrt(k_bond/m_H),
+                         np.sqrt(k_bond*(1/m_H + 4/(3*m_C)))]) / (2*np.pi)
+    print(f"Picos del espectro vibracional (NVE, {nve_steps} pasos): {np.sort(peaks).round(3)}")
+    print(f"Estiramientos C-H teóricos (simétrico, asimétrico): {expected.round(3)}")
+    
     # Mostrar gráficos finales
+    import matplotlib.pyplot as plt
     plt.show()
\ No newline at end of file
@@ -1,3 +1,6 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -45,6 +48,7 @@ velocities -= 0.5 * dt * forces / masses
 
 # Guardar trayectoria
 trajectory = [positions.copy()]
+velocity_trajectory = [velocities.copy()]
 
 # Bucle principal de integración
 for _ in range(steps):
@@ -52,8 +56,22 @@ for _ in range(steps):
     forces = compute_forces(positions)
     velocities += dt * forces / masses
     trajectory.append(positions.copy())
+    velocity_trajectory.append(velocities.copy())
 
 trajectory = np.array(trajectory)
+velocity_trajectory = np.array(velocity_trajectory)
+
+# Espectro vibracional: FFT de la autocorrelación de velocidades
+# (ver ETHANE/verlet-ETHANE-2/spectrum.py). En este modelo 1D hay dos modos:
+# estiramiento simétrico (el C no se mueve) y asimétrico.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "ETHANE", "verlet-ETHANE-2"))
+from spectrum import vibrational_spectrum
+
+freqs, spectrum, peaks = vibrational_spectrum(velocity_trajectory, dt, n_peaks=2, masses=masses)
+expected = np.array([np.sqrt(k / m_O), np.sqrt(k / m_O * (1 + 2 * m_O / m_C))]) / (2 * np.pi)
+print("Frecuencias de los picos:", np.sort(peaks).round(4))
+print("Frecuencias teóricas (simétrico, asimétrico):", expected.round(4))
 
 # Graficar resultados
 plt.figure(figsize=(10, 5))
@@ -65,4 +83,14 @@ plt.ylabel("Posición (1D)")
 plt.title("Oscilaciones de la molécula de CO₂ con Leapfrog (CORREGIDO)")
 plt.legend()
 plt.grid(True)
+
+plt.figure(figsize=(10, 4))
+plt.plot(freqs, spectrum, color='purple')
+for f in expected:
+    plt.axvline(f, color='gray', linestyle='--')
+plt.xlim(0, 3 * expected[-1])
+plt.xlabel("Frecuencia (1 / unidad de tiempo)")
+plt.ylabel("Densidad espectral")
+plt.title("Espectro vibracional de CO₂ (FFT de la VACF)")
+plt.grid(True)
 plt.show()
@@ -3,8 +3,9 @@ Análisis geométrico y energético del estado final de la simulación.
 """
 
 import numpy as np
-from params import theta_eq
+from params import theta_eq, k_bond, temperature, k_B
 from forces import hch_angles, H_C1, H_C2
+from online_stats import LABELS
 
 
 def analyze_final_state(final_pos):
@@ -18,7 +19,55 @@ def analyze_final_state(final_pos):
     return dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2
 
 
-def print_summary(dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2, te_final):
+def print_statistics(stats):
+    """Resumen de los acumuladores de `observers.StatisticsObserver` (dict clave -> RunningStats)."""
+    print("\n=== PROMEDIOS SOBRE LA TRAYECTORIA ===")
+    for key, acc in stats.items():
+        label, unit = LABELS.get(key, (key, ""))
+        print(f"{label}: {acc.mean:.4f} ± {acc.std:.4f} {unit} "
+              f"(mín {acc.min:.4f}, máx {acc.max:.4f}, {acc.count} muestras)")
+
+
+def boltzmann_bond_check(bond_lengths, r0, k=k_bond, temperature=temperature, n_grid=2001):
+    """
+    Compara las longitudes de enlace muestreadas con la distribución de
+    Boltzmann de un enlace armónico, p(r) ∝ r² exp(-k (r - r0)² / (2 k_B T))
+    (el r² es el jacobiano del vector de enlace), integrada numéricamente.
+
+    Devuelve un diccionario con la media y desviación estándar muestreadas y
+    esperadas y el estadístico de Kolmogorov-Smirnov (máxima diferencia entre
+    las distribuciones acumuladas; con N muestras independientes, valores
+    del orden de 1/sqrt(N) indican acuerdo).
+    """
+    samples = np.sort(np.asarray(bond_lengths, dtype=np.float64).ravel())
+    sigma = np.sqrt(k_B * temperature / k)
+    r = np.linspace(max(r0 - 8 * sigma, 0.0), r0 + 8 * sigma, n_grid)
+    dr = r[1] - r[0]
+
+    def cumulative(y):
+        # Integral acumulada por trapecios sobre la grilla uniforme
+        return np.concatenate([[0.0], np.cumsum(0.5 * (y[1:] + y[:-1]) * dr)])
+
+    pdf = r**2 * np.exp(-0.5 * ((r - r0) / sigma) ** 2)
+    pdf /= cumulative(pdf)[-1]
+    expected_mean = cumulative(r * pdf)[-1]
+    expected_std = np.sqrt(cumulative((r - expected_mean) ** 2 * pdf)[-1])
+
+    cdf = cumulative(pdf)
+    model = np.interp(samples, r, cdf)
+    n = len(samples)
+    ks = max(np.max(np.arange(1, n + 1) / n - model), np.max(model - np.arange(n) / n))
+    return {"mean": samples.mean(), "expected_mean": expected_mean,
+            "std": samples.std(), "expected_std": expected_std, "ks": ks, "count": n}
+
+
+def print_boltzmann_check(check, label="Enlace"):
+    print(f"{label}: media {check['mean']:.4f} Å (Boltzmann {check['expected_mean']:.4f}), "
+          f"σ {check['std']:.4f} Å (Boltzmann {check['expected_std']:.4f}), "
+          f"KS {check['ks']:.4f} con {check['count']} muestras")
+
+
+def print_summary(dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2, te_final, stats=None):
     print("\n=== RESULTADOS FINALES ===")
     print(f"Distancias C-H en C1: {np.array(dist_CH_C1).round(4)} Å")
     print(f"Distancias C-H en C2: {np.array(dist_CH_C2).round(4)} Å")
@@ -28,3 +77,5 @@ def print_summary(dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2, te_fina
     print(f"Desviación media del tetraedro en C1: {np.mean(np.abs(np.array(angles_C1) - theta_eq)):.2f}°")
     print(f"Desviación media del tetraedro en C2: {np.mean(np.abs(np.array(angles_C2) - theta_eq)):.2f}°")
     print(f"Energía total final: {te_final:.4f} kcal/mol")
+    if stats is not None:
+        print_statistics(stats)
@@ -0,0 +1,122 @@
+"""
+Salida asíncrona: un hilo escritor vacía una cola acotada hacia el disco.
+
+Con la salida síncrona el integrador se detiene cada vez que se escribe un
+frame; en sistemas de archivos de red un pico de latencia frena toda la
+simulación. `BackgroundWriter` envuelve cualquiera de los escritores de
+`io_output.py` / `trajectory.py` (XYZTrajectoryWriter, EnergyFileWriter,
+BinaryTrajectoryWriter) con la misma interfaz: el integrador encola copias
+de los datos y sigue; el hilo hace la escritura real.
+
+  - Contrapresión: la cola tiene `maxsize` entradas; si el disco no da
+    abasto, encolar bloquea al integrador en lugar de acumular memoria sin
+    límite (el tiempo bloqueado queda en `blocked_time`).
+  - Errores: una excepción en el hilo escritor se vuelve a lanzar en el hilo
+    principal en la siguiente escritura, en flush() o en close().
+  - Cierre: close() espera a que la cola se vacíe y cierra el escritor, de
+    modo que todo lo encolado llega al disco aunque la simulación termine
+    con una excepción (los observadores lo llaman desde `finally`).
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Ejecuta los métodos de `writer` en un hilo propio, en orden de llegada."""
+
+    def __init__(self, writer, maxsize=256):
+        self.writer = writer
+        self.blocked_time = 0.0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error = None
+        self._failed = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, daemon=True,
+                                        name=f"io-writer:{getattr(writer, 'filename', '')}")
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    if self._failed:
+                        # close() no se encoló o se descartó: liberar el archivo igual.
+                        try:
+                            self.writer.close()
+                        except Exception:
+                            pass
+                    return
+                if not self._failed:
+                    func, args, kwargs = task
+                    func(*args, **kwargs)
+            except BaseException as exc:
+                # Se siguen consumiendo (y descartando) tareas para que el
+                # productor nunca quede bloqueado en una cola llena.
+                if not self._failed:
+                    self._error = exc
+                    self._failed = True
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Falló la escritura en segundo plano") from error
+
+    def submit(self, func, *args, **kwargs):
+        """Encola func(*args, **kwargs); los argumentos no deben modificarse después."""
+        self._raise_error()
+        if self._closed:
+            raise ValueError("El escritor en segundo plano ya está cerrado")
+        task = (func, args, kwargs)
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            t0 = time.perf_counter()
+            self._queue.put(task)
+            self.blocked_time += time.perf_counter() - t0
+
+    def write_frame(self, positions, *args, images=None, **kwargs):
+        if images is not None:
+            images = np.array(images, copy=True)
+        self.submit(self.writer.write_frame, np.array(positions, copy=True), *args,
+                    images=images, **kwargs)
+
+    def write_row(self, *values):
+        self.submit(self.writer.write_row, *values)
+
+    def flush(self):
+        """Espera a que se escriba todo lo encolado y vuelca el escritor."""
+        self.submit(self.writer.flush)
+        self._queue.join()
+        self._raise_error()
+
+    def checkpoint(self):
+        """Espera a que se escriba lo encolado y devuelve el checkpoint del escritor."""
+        self.flush()
+        return self.writer.checkpoint()
+
+    def close(self):
+        """Vacía la cola, cierra el escritor y detiene el hilo."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._failed:
+            self._queue.put((self.writer.close, (), {}))
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
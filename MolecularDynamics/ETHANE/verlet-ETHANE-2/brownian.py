@@ -0,0 +1,212 @@
+"""
+Dinámica browniana del etano a temperatura finita, sobre el mismo modelo de
+fuerzas que la minimización con Velocity Verlet. El integrador se elige por
+nombre entre los de `integrators.LANGEVIN_INTEGRATORS` (Euler-Maruyama por
+defecto, Leimkuhler-Matthews o BAOAB).
+
+`run_brownian` es el núcleo sin gráficos, con los mismos observadores que
+`simulation.run`; `run_brownian_dynamics_simulation` arma encima la vista en
+vivo, el XYZ y el archivo de energía potencial como hacía el script original
+`browniam-dynamics-ETHANE.py`.
+"""
+
+import numpy as np
+
+from params import m_C, m_H, bd_dt, bd_steps, temperature, gamma
+from init import init_positions
+from forces import energy_and_forces
+from integrators import LANGEVIN_INTEGRATORS
+from observers import (HistoryRecorder, history_from_records, XYZObserver,
+                       BinaryTrajectoryObserver, EnergyFileObserver, notify_start, notify_step, notify_finish,
+                       notify_close)
+from result_cache import cached_simulation
+from checkpoint import (save_checkpoint, load_checkpoint, get_rng_state, set_rng_state,
+                        observer_states, restore_observers)
+
+MASSES = np.array([m_C, m_C] + [m_H] * 6)
+
+
+def run_brownian(positions=None, seed=None, n_steps=bd_steps, dt=bd_dt,
+                 temperature=temperature, observers=(), rng=np.random,
+                 checkpoint_filename=None, checkpoint_every=1000, resume_from=None,
+                 integrator="euler"):
+    """
+    Núcleo de dinámica browniana sin gráficos.
+
+    positions: configuración inicial; si se omite, `init_positions(seed)` con
+               la perturbación de 0.2 Å del script original.
+    observers: ver `observers.py`; el estado contiene "step", "positions",
+               "pe" y "geometry".
+    rng: generador del ruido (`np.random`, un RandomState o un Generator;
+         con un Generator los bloques de ruido se llenan sin copias).
+    checkpoint_filename / checkpoint_every / resume_from: como en
+               `simulation.run`; el checkpoint incluye el estado de `rng` y
+               el del integrador.
+    integrator: "euler" (Euler-Maruyama, el original), "lm"
+               (Leimkuhler-Matthews) o "baoab"; ver `integrators.py`. Los dos
+               últimos admiten pasos `dt` varias veces mayores.
+
+    Devuelve las posiciones finales.
+    """
+    first_step = 1
+    if resume_from is not None:
+        saved = load_checkpoint(resume_from, kind="brownian")
+        positions = saved["positions"]
+        set_rng_state(rng, saved["rng"])
+        first_step = saved["step"] + 1
+    if positions is None:
+        positions = init_positions(seed=seed, sigma=0.2)
+    # El integrador actualiza posiciones y fuerzas en su lugar
+    positions = np.array(positions, dtype=np.float64)
+
+    integrator = LANGEVIN_INTEGRATORS[integrator](MASSES, dt, temperature, rng)
+    pe, forces, geometry = energy_and_forces(positions)
+    everies = sorted({observer.every for observer in observers})
+    state = {"step": first_step - 1, "n_steps": n_steps, "positions": positions, "pe": pe,
+             "geometry": geometry}
+    try:
+        if resume_from is not None:
+            integrator.restore(saved["integrator"], positions)
+            restore_observers(observers, saved["observers"], state)
+        else:
+            integrator.start(positions)
+            notify_start(observers, state)
+
+        for step in range(first_step, n_steps + 1):
+            # Energía y geometría solo en los pasos que algún observador ve
+            observed = step == n_steps or any(step % every == 0 for every in everies)
+            positions, pe, forces, geometry = integrator.step(positions, forces, observed)
+            if observed:
+                state.update(step=step, positions=positions, pe=pe, geometry=geometry)
+                notify_step(observers, state)
+            if checkpoint_filename is not None and step % checkpoint_every == 0:
+                save_checkpoint(checkpoint_filename, {
+                    "kind": "brownian", "step": step, "positions": positions,
+                    "rng": get_rng_state(rng), "integrator": integrator.checkpoint(),
+                    "observers": observer_states(observers)})
+
+        notify_finish(observers, state)
+    finally:
+        notify_close(observers)
+    return positions
+
+
+def run_brownian_dynamics_simulation(seed=None, plot_every=500,
+                                     xyz_filename="ethane_brownian_trajectory.xyz",
+                                     energy_filename="ethane_brownian_energy.dat",
+                                     xyz_every=100, show_plots=True, n_steps=bd_steps,
+                                     trajectory_filename=None, background_io=False,
+                                     checkpoint_filename=None, checkpoint_every=1000,
+                                     resume_from=None, observers=(), cache=None,
+                                     integrator="euler", dt=bd_dt):
+    """
+    Simulación browniana con los observadores habituales. Devuelve
+    (posiciones finales, historial) con las claves de `HistoryRecorder`
+    ("pe" es la única energía).
+
+    trajectory_filename: si se pasa, la trayectoria se guarda también en el
+    formato binario de `trajectory.py`.
+    background_io: con True los archivos se escriben desde hilos aparte
+    (`background_io.py`).
+    checkpoint_filename / checkpoint_every / resume_from / integrator / dt:
+    ver `run_brownian`.
+    observers: observadores adicionales (p. ej. `StatisticsObserver`), que se
+    agregan después de los habituales.
+    cache: un `result_cache.ResultCache`; si la misma corrida (parámetros,
+    estado inicial, archivos pedidos y versión del código) ya está en la
+    caché, se devuelve al instante y se restauran sus archivos de salida.
+    No se usa con observadores adicionales ni al reanudar un checkpoint, ni sin `seed` (el ruido no sería reproducible).
+    """
+    recorder = HistoryRecorder()
+    extra_observers, observers = observers, [recorder]
+    if show_plots:
+        from live_view import LivePlot
+        observers.append(LivePlot(recorder, every=plot_every, energies=("pe",),
+                                  show_angles=False,
+                                  title=f'Brownian Dynamics (T={temperature}K)'))
+    if xyz_filename is not None:
+        observers.append(XYZObserver(xyz_filename, every=xyz_every, energy_key="pe",
+                                     temperature=temperature, background=background_io))
+    if trajectory_filename is not None:
+        observers.append(BinaryTrajectoryObserver(trajectory_filename, every=xyz_every,
+                                                  energy_key="pe", background=background_io))
+    if energy_filename is not None:
+        observers.append(EnergyFileObserver(energy_filename, keys=("pe",),
+                                            background=background_io))
+    observers.extend(extra_observers)
+
+    initial = None
+    if cache is not None and seed is not None and not extra_observers and resume_from is None:
+        initial = init_positions(seed=seed, sigma=0.2)
+
+    def compute():
+        positions = run_brownian(positions=initial, seed=seed, n_steps=n_steps, dt=dt,
+                                 integrator=integrator, observers=observers, checkpoint_filename=checkpoint_filename,
+                                 checkpoint_every=checkpoint_every, resume_from=resume_from)
+        return positions, recorder.records
+
+    if initial is None:
+        positions, records = compute()
+    else:
+        # init_positions(seed) deja el generador global en un estado fijo:
+        # el ruido queda determinado por la semilla, que entra en la clave.
+        positions, records = cached_simulation(
+            cache, "brownian",
+            {"positions": initial, "seed": seed, "n_steps": n_steps, "xyz_every": xyz_every,
+             "integrator": integrator, "dt": dt},
+            {"trajectory.xyz": xyz_filename, "energy.dat": energy_filename,
+             "trajectory.bin": trajectory_filename}, compute)
+
+    return positions, history_from_records(records)
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    from analysis import (analyze_final_state, print_statistics, boltzmann_bond_check,
+                          print_boltzmann_check)
+    from observers import StatisticsObserver, CallbackObserver
+    from params import r_eq, r_CC_eq
+
+    print("Iniciando simulación de Brownian Dynamics para el etano...")
+    print(f"Temperatura: {temperature} K")
+    print(f"Coeficiente de fricción: {gamma} 1/ps")
+    print(f"Pasos de tiempo: {bd_steps}")
+    print(f"Δt: {bd_dt} ps")
+
+    statistics = StatisticsObserver()
+    # Longitudes de enlace después del equilibrado, para compararlas con Boltzmann
+    bond_samples = []
+
+    def sample_bonds(state):
+        if state["step"] > bd_steps // 4:
+            bond_samples.append(state["geometry"]["bonds"].copy())
+
+    sampler = CallbackObserver(sample_bonds, every=10)
+    final_pos, history = run_brownian_dynamics_simulation(observers=[statistics, sampler])
+
+    dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2 = analyze_final_state(final_pos)
+
+    print("\n=== RESULTADOS FINALES ===")
+    print(f"Distancias C-H en C1: {np.array(dist_CH_C1).round(4)} Å")
+    print(f"Distancias C-H en C2: {np.array(dist_CH_C2).round(4)} Å")
+    print(f"Distancia C-C: {dist_CC:.4f} Å")
+    print(f"Ángulos H-C-H en C1: {np.array(angles_C1).round(2)}°")
+    print(f"Ángulos H-C-H en C2: {np.array(angles_C2).round(2)}°")
+    print(f"Energía potencial final: {history['pe'][-1]:.4f} kcal/mol")
+    print_statistics(statistics.stats)
+
+    bond_samples = np.array(bond_samples)
+    print("\n=== COMPARACIÓN CON LA DISTRIBUCIÓN DE BOLTZMANN ===")
+    print_boltzmann_check(boltzmann_bond_check(bond_samples[:, 1:], r_eq), "C-H")
+    print_boltzmann_check(boltzmann_bond_check(bond_samples[:, 0], r_CC_eq), "C-C")
+
+    print(f"\nArchivos generados:")
+    print(f"- ethane_brownian_trajectory.xyz: Trayectoria Brownian Dynamics")
+    print(f"- ethane_brownian_energy.dat: Datos de energía potencial")
+
+    print(f"\nPara visualizar la trayectoria:")
+    print(f"xmakemol -f ethane_brownian_trajectory.xyz")
+    print(f"vmd ethane_brownian_trajectory.xyz")
+    print(f"ovito ethane_brownian_trajectory.xyz")
+
+    plt.show()
@@ -0,0 +1,77 @@
+"""
+Puntos de control (checkpoints) para reanudar simulaciones largas.
+
+Un checkpoint guarda todo lo necesario para continuar de forma idéntica bit
+a bit: posiciones, velocidades (Verlet), paso actual, estado del generador
+aleatorio (dinámica browniana) y el estado de cada observador (historiales,
+posición de escritura en los archivos de salida). Los núcleos
+`simulation.run` y `brownian.run_brownian` los escriben cada
+`checkpoint_every` pasos y continúan desde uno con `resume_from=`.
+
+Los observadores participan con dos ganchos de `observers.Observer`:
+  - checkpoint(): devuelve un objeto serializable con su estado (o None),
+  - restore(data, state): lo recupera en lugar de start() al reanudar
+    (por defecto llama a start()).
+Al reanudar, la lista de observadores debe armarse igual que en la corrida
+original (se emparejan por posición).
+
+El archivo se escribe con pickle en un temporal del mismo directorio y se
+renombra con `os.replace`, así que un corte a mitad de escritura deja el
+checkpoint anterior intacto. Solo deben cargarse checkpoints propios.
+"""
+
+import os
+import pickle
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def save_checkpoint(filename, data):
+    """Escribe `data` (diccionario) de forma atómica."""
+    data = dict(data, format_version=FORMAT_VERSION)
+    tmp = f"{filename}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def load_checkpoint(filename, kind=None):
+    """Lee un checkpoint; si se pasa `kind`, comprueba que sea de ese núcleo."""
+    with open(filename, "rb") as f:
+        data = pickle.load(f)
+    if data.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{filename}: versión de checkpoint no soportada")
+    if kind is not None and data.get("kind") != kind:
+        raise ValueError(f"{filename} es un checkpoint de '{data.get('kind')}', no de '{kind}'")
+    return data
+
+
+def get_rng_state(rng):
+    """Estado del generador: el global de `np.random`, un RandomState o un Generator."""
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.state
+    return rng.get_state()
+
+
+def set_rng_state(rng, rng_state):
+    if isinstance(rng, np.random.Generator):
+        rng.bit_generator.state = rng_state
+    else:
+        rng.set_state(rng_state)
+
+
+def observer_states(observers):
+    return [observer.checkpoint() for observer in observers]
+
+
+def restore_observers(observers, states, state):
+    if len(states) != len(observers):
+        raise ValueError(f"El checkpoint tiene {len(states)} observadores y la "
+                         f"simulación {len(observers)}; deben armarse igual")
+    for observer, data in zip(observers, states):
+        observer.restore(data, state)
+
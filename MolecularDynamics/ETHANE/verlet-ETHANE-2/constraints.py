@@ -0,0 +1,166 @@
+"""
+Restricciones de longitud de enlace (SHAKE/RATTLE).
+
+Las vibraciones C-H (k_bond = 450 kcal/mol/Å², masa reducida ~1 uma) son el
+movimiento más rápido del modelo y fijan el paso máximo estable de Velocity
+Verlet. Congelando esas distancias en r_eq, el límite pasa a las
+vibraciones C-C y angulares, más lentas, y se puede usar un dt 2-3 veces
+mayor.
+
+`BondConstraints` resuelve todas las restricciones a la vez con NumPy, como
+los núcleos de `forces.py`: en cada iteración se calculan las correcciones
+de todos los enlaces restringidos y se acumulan con una sola operación
+(SHAKE por Jacobi, en lugar de recorrer los enlaces uno a uno), hasta que
+el error relativo de todas las longitudes baja de `tol`. RATTLE hace lo
+mismo con las velocidades, quitando la componente a lo largo de cada
+enlace restringido. Se usa con `integrators.constrained_velocity_verlet_step`
+o pasando `constraints=` a `simulation.run`.
+"""
+
+import numpy as np
+
+from forces import BONDS, BOND_R0
+
+
+class ConstraintError(RuntimeError):
+    """SHAKE o RATTLE no convergieron en `max_iter` iteraciones."""
+
+
+class BondConstraints:
+    """
+    pairs: (n, 2) índices de los átomos de cada enlace restringido.
+    lengths: (n,) longitudes fijas [Å].
+    masses: masas de todos los átomos [uma].
+    tol: tolerancia relativa en las longitudes (SHAKE) y en la componente
+         relativa de la velocidad a lo largo del enlace (RATTLE).
+    max_iter: iteraciones máximas antes de lanzar `ConstraintError`.
+    box: `pbc.PeriodicBox`; los vectores de enlace de las posiciones usan
+         la imagen mínima (los de velocidades no la necesitan).
+
+    Lleva la cuenta de iteraciones: `last_iterations` (SHAKE, RATTLE) del
+    último paso y los totales `shake_iterations`, `rattle_iterations` y
+    `calls` (ver `mean_iterations`).
+    """
+
+    def __init__(self, pairs, lengths, masses, tol=1e-10, max_iter=500, box=None):
+        self.pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+        self.lengths = np.asarray(lengths, dtype=np.float64)
+        self.inv_m = 1.0 / np.asarray(masses, dtype=np.float64)
+        self.tol = tol
+        self.max_iter = max_iter
+        self.box = box
+        self.d2 = self.lengths**2
+        self._index = self.pairs.ravel(order='F')
+        # 1/m_i + 1/m_j de cada enlace y 1/m por extremo en el orden de _index
+        self._inv_mu = self.inv_m[self.pairs[:, 0]] + self.inv_m[self.pairs[:, 1]]
+        self._signed_inv_m = np.concatenate([-self.inv_m[self.pairs[:, 0]],
+                                             self.inv_m[self.pairs[:, 1]]])[:, None]
+        self.last_iterations = (0, 0)
+        self.shake_iterations = 0
+        self.rattle_iterations = 0
+        self.calls = 0
+
+    @classmethod
+    def xh_bonds(cls, masses, bonds=BONDS, lengths=BOND_R0, max_h_mass=1.5, **kwargs):
+        """Restricciones de todos los enlaces X-H (con un átomo de masa < max_h_mass)."""
+        bonds = np.asarray(bonds)
+        masses = np.asarray(masses)
+        is_xh = (masses[bonds] < max_h_mass).any(axis=1)
+        return cls(bonds[is_xh], np.asarray(lengths)[is_xh], masses, **kwargs)
+
+    def key(self):
+        """Lo que determina el resultado (para la clave de `result_cache`)."""
+        key = {"pairs": self.pairs, "lengths": self.lengths, "tol": self.tol}
+        if self.box is not None:
+            key["box"] = self.box.lengths
+        return key
+
+    def _vectors(self, x):
+        return x[..., self.pairs[:, 1], :] - x[..., self.pairs[:, 0], :]
+
+    def _bond_vectors(self, positions):
+        r = self._vectors(positions)
+        return r if self.box is None else self.box.minimum_image(r)
+
+    def _apply(self, x, g, r):
+        """x_i -= g r / m_i, x_j += g r / m_j para todos los enlaces a la vez."""
+        delta = np.concatenate([g[..., None] * r, g[..., None] * r], axis=-2)
+        np.add.at(x, (Ellipsis, self._index, slice(None)), delta * self._signed_inv_m)
+
+    def shake(self, positions, reference):
+        """
+        Corrige `positions` en su lugar para que cumplan las restricciones,
+        desplazando cada par a lo largo de su vector de enlace en `reference`
+        (las posiciones del paso anterior, que sí las cumplían).
+        Devuelve el número de iteraciones.
+        """
+        r_ref = self._bond_vectors(reference)
+        for iteration in range(self.max_iter):
+            r = self._bond_vectors(positions)
+            diff = self.d2 - (r * r).sum(axis=-1)
+            if np.all(np.abs(diff) < 2 * self.tol * self.d2):
+                return iteration
+            g = diff / (2 * (r_ref * r).sum(axis=-1) * self._inv_mu)
+            self._apply(positions, g, r_ref)
+        raise ConstraintError(f"SHAKE no convergió en {self.max_iter} iteraciones")
+
+    def project(self, positions, velocities=None):
+        """
+        Lleva un estado inicial que no cumple las restricciones (p. ej. la
+        perturbación de `init_positions`) a uno que sí, en su lugar.
+        """
+        self.shake(positions, positions.copy())
+        if velocities is not None:
+            self.rattle(positions, velocities)
+
+    def rattle(self, positions, velocities):
+        """
+        Quita en su lugar la componente de `velocities` a lo largo de cada
+        enlace restringido (velocidad relativa perpendicular al enlace).
+        Devuelve el número de iteraciones.
+        """
+        r = self._bond_vectors(positions)
+        for iteration in range(self.max_iter):
+            rv = (r * self._vectors(velocities)).sum(axis=-1)
+            if np.all(np.abs(rv) < self.tol * self.d2):
+                return iteration
+            self._apply(velocities, -rv / (self.d2 * self._inv_mu), r)
+        raise ConstraintError(f"RATTLE no convergió en {self.max_iter} iteraciones")
+
+    def record(self, shake_iterations, rattle_iterations):
+        self.last_iterations = (shake_iterations, rattle_iterations)
+        self.shake_iterations += shake_iterations
+        self.rattle_iterations += rattle_iterations
+        self.calls += 1
+
+    def mean_iterations(self):
+        """(SHAKE, RATTLE) promedio por paso."""
+        calls = max(self.calls, 1)
+        return self.shake_iterations / calls, self.rattle_iterations / calls
+
+    def max_violation(self, positions):
+        """Máximo error relativo |r - d| / d de las longitudes restringidas."""
+        r = np.sqrt((self._bond_vectors(positions) ** 2).sum(axis=-1))
+        return np.max(np.abs(r - self.lengths) / self.lengths)
+
+
+if __name__ == "__main__":
+    from simulation import run, MASSES
+    from init import init_positions
+    from observers import CallbackObserver
+
+    # Dinámica sin amortiguamiento: la fluctuación de la energía total mide
+    # el error del integrador para cada dt, con y sin restricciones X-H.
+    print(f"{'dt':>5} {'restricciones':>13} {'σ(E total)':>11} {'iter. SHAKE/RATTLE':>19}")
+    for step_dt in (1.0, 2.0, 3.0, 4.0):
+        for constrained in (False, True):
+            constraints = BondConstraints.xh_bonds(MASSES) if constrained else None
+            energies = []
+            with np.errstate(all="ignore"):
+                run(positions=init_positions(seed=3), n_steps=int(4000 / step_dt), dt=step_dt,
+                    damping=0.0, constraints=constraints,
+                    observers=[CallbackObserver(lambda state: energies.append(state["te"]))])
+            iterations = ("{:.1f} / {:.1f}".format(*constraints.mean_iterations())
+                          if constrained else "-")
+            print(f"{step_dt:5.1f} {'X-H' if constrained else 'no':>13} "
+                  f"{np.std(energies):11.4f} {iterations:>19}")
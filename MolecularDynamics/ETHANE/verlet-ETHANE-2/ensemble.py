@@ -0,0 +1,70 @@
+"""
+Modo conjunto (ensemble): integra R réplicas independientes del etano a la
+vez como un solo arreglo (R, 8, 3).
+
+Los núcleos de `forces.py` y el paso de `integrators.py` aceptan dimensiones
+iniciales extra, así que cada paso de Velocity Verlet avanza todas las
+réplicas con las mismas pocas llamadas a NumPy que una sola molécula.
+"""
+
+import numpy as np
+
+from params import m_C, m_H, steps, ACCEL_CONV
+from init import init_ensemble
+from forces import energy_and_forces
+from integrators import velocity_verlet_step
+
+
+def run_ensemble(n_replicas, seed=None, n_steps=steps):
+    """
+    Minimiza n_replicas copias del etano, cada una con su propia perturbación
+    inicial (ver `init_ensemble`).
+
+    Devuelve (final_pos, history):
+      final_pos: arreglo (R, 8, 3) con la geometría final de cada réplica.
+      history: diccionario con
+        "pe", "ke", "te": arreglos (R, n_steps) con la energía de cada réplica
+                          en cada paso [kcal/mol]
+        "bonds": distancias finales (R, 7) en el orden de forces.BONDS [Å]
+        "angles": ángulos H-C-H finales (R, 6) en el orden de forces.ANGLES [grados]
+    """
+    positions = init_ensemble(n_replicas, seed=seed)
+    velocities = np.zeros_like(positions)
+    masses = np.array([m_C, m_C] + [m_H] * 6)
+
+    pe_history = np.empty((n_replicas, n_steps))
+    ke_history = np.empty((n_replicas, n_steps))
+
+    pe, forces, geometry = energy_and_forces(positions)
+
+    for step in range(n_steps):
+        pe, forces, geometry = velocity_verlet_step(positions, velocities, forces, masses)
+        pe_history[:, step] = pe
+        ke_history[:, step] = 0.5 * np.sum(masses[:, None] * velocities**2,
+                                           axis=(-2, -1)) / ACCEL_CONV
+
+    history = {
+        "pe": pe_history,
+        "ke": ke_history,
+        "te": pe_history + ke_history,
+        "bonds": geometry["bonds"],
+        "angles": geometry["angles"],
+    }
+    return positions, history
+
+
+def print_ensemble_summary(history):
+    """Media y desviación estándar sobre réplicas de la geometría final."""
+    bonds, angles = history["bonds"], history["angles"]
+    dist_CH = bonds[:, 1:]
+    print(f"\n=== CONJUNTO DE {len(bonds)} RÉPLICAS ===")
+    print(f"Distancia C-H: {dist_CH.mean():.4f} ± {dist_CH.std():.4f} Å")
+    print(f"Distancia C-C: {bonds[:, 0].mean():.4f} ± {bonds[:, 0].std():.4f} Å")
+    print(f"Ángulo H-C-H: {angles.mean():.2f} ± {angles.std():.2f}°")
+    print(f"Energía total final: {history['te'][:, -1].mean():.4f} "
+          f"± {history['te'][:, -1].std():.4f} kcal/mol")
+
+
+if __name__ == "__main__":
+    final_pos, history = run_ensemble(200, seed=42)
+    print_ensemble_summary(history)
@@ -9,94 +9,215 @@ Incluye:
   - Amortiguamiento proporcional a la velocidad.
 
 No incluye fuerzas dihedrales explícitas ni efectos electrónicos/estéricos.
+
+La molécula se describe por su topología: arreglos de índices de enlaces
+(i, j) y de ángulos (i, centro, j) precalculados una sola vez. Todas las
+distancias, ángulos y gradientes se evalúan de una vez con NumPy sobre esos
+arreglos y se acumulan en las fuerzas con una sola operación por término,
+en lugar de recorrer pares de átomos con bucles de Python.
 """
 
+from itertools import combinations
+
 import numpy as np
 from params import k_bond, k_angle, r_eq, r_CC_eq, theta_eq, damping
 
 H_C1 = range(2, 5)
 H_C2 = range(5, 8)
 
+# Distancia mínima por debajo de la cual un término se ignora (evita dividir por cero)
+R_MIN = 0.01
+
+
+def build_topology(bonds, angles):
+    """
+    Convierte listas de enlaces [(i, j), ...] y ángulos [(i, centro, j), ...]
+    en arreglos de índices listos para las funciones vectorizadas.
+    """
+    bonds = np.asarray(bonds, dtype=np.intp).reshape(-1, 2)
+    angles = np.asarray(angles, dtype=np.intp).reshape(-1, 3)
+    return bonds, angles
+
+
+# Topología del etano: C1-C2, C1-H(2,3,4), C2-H(5,6,7) y los 6 ángulos H-C-H
+BONDS, ANGLES = build_topology(
+    [(0, 1)] + [(0, i) for i in H_C1] + [(1, i) for i in H_C2],
+    [(hi, c, hj) for c, h_indices in [(0, H_C1), (1, H_C2)]
+     for hi, hj in combinations(h_indices, 2)],
+)
+BOND_R0 = np.array([r_CC_eq] + [r_eq] * 6)
+ANGLE_THETA0 = np.full(len(ANGLES), np.radians(theta_eq))
+
 
-def _bond_forces(pos, forces):
-    C1, C2 = pos[0], pos[1]
+def _norm(v):
+    return np.sqrt((v * v).sum(axis=-1))
 
-    # Enlace C-C
-    r_cc_vec = C2 - C1
-    r_cc = np.linalg.norm(r_cc_vec)
-    if r_cc > 0.01:
-        f_mag_cc = -k_bond * (r_cc - r_CC_eq)
-        force_dir = r_cc_vec / r_cc
-        forces[1] += f_mag_cc * force_dir
-        forces[0] -= f_mag_cc * force_dir
 
-    # Enlaces C-H
-    for carbon_idx, h_indices in [(0, H_C1), (1, H_C2)]:
-        carbon_pos = pos[carbon_idx]
-        for i in h_indices:
-            r_vec = pos[i] - carbon_pos
-            r = np.linalg.norm(r_vec)
-            if r > 0.01:
-                f_mag = -k_bond * (r - r_eq)
-                forces[i] += f_mag * (r_vec / r)
-                forces[carbon_idx] -= f_mag * (r_vec / r)
+def bond_geometry(pos, bonds, box=None):
+    """
+    Vectores j - i y sus normas para todos los enlaces a la vez (con la
+    imagen mínima si se pasa una `pbc.PeriodicBox`).
+    """
+    r_vec = pos[..., bonds[:, 1], :] - pos[..., bonds[:, 0], :]
+    if box is not None:
+        r_vec = box.minimum_image(r_vec)
+    return r_vec, _norm(r_vec)
+
+
+def angle_geometry(pos, angles, box=None):
+    """
+    Vectores unitarios centro->i y centro->j, inversas de sus normas y coseno
+    del ángulo para todos los ángulos a la vez. Los términos con algún brazo
+    más corto que R_MIN quedan con inversas nulas y se marcan como inactivos.
+    box: como en `bond_geometry`.
+    """
+    center = pos[..., angles[:, 1], :]
+    r1 = pos[..., angles[:, 0], :] - center
+    r2 = pos[..., angles[:, 2], :] - center
+    if box is not None:
+        r1 = box.minimum_image(r1)
+        r2 = box.minimum_image(r2)
+    r1_norm = _norm(r1)
+    r2_norm = _norm(r2)
+    active = (r1_norm > R_MIN) & (r2_norm > R_MIN)
+    inv1 = np.divide(1.0, r1_norm, out=np.zeros_like(r1_norm), where=active)
+    inv2 = np.divide(1.0, r2_norm, out=np.zeros_like(r2_norm), where=active)
+    u1 = r1 * inv1[..., None]
+    u2 = r2 * inv2[..., None]
+    cos_theta = np.clip((u1 * u2).sum(axis=-1), -1, 1)
+    return u1, u2, inv1, inv2, cos_theta, active
+
+
+def bond_forces(pos, forces, bonds, r0, k, box=None):
+    """
+    Acumula en `forces` las fuerzas armónicas de enlace y devuelve la energía
+    junto con las distancias r de cada enlace.
+    U = 1/2 * k * (r - r0)^2 para cada enlace.
+    """
+    r_vec, r = bond_geometry(pos, bonds, box)
+    delta = r - r0
+    inv_r = np.divide(1.0, r, out=np.zeros_like(r), where=r > R_MIN)
+    f = (-k * delta * inv_r)[..., None] * r_vec
+
+    # Una sola acumulación: primero todos los átomos i (reciben -f), luego los j
+    np.add.at(forces, (Ellipsis, bonds.ravel(order='F'), slice(None)),
+              np.concatenate([-f, f], axis=-2))
+    return 0.5 * np.sum(k * delta**2, axis=-1), r
 
 
-def _angle_forces(pos, forces):
+def angle_forces(pos, forces, angles, theta0, k, box=None):
     """
-    Fuerza angular H-C-H corregida.
+    Acumula en `forces` la fuerza angular corregida y devuelve la energía
+    junto con los ángulos theta (en radianes).
 
-    Para theta = angulo(r1, r2), con U = 1/2 * k_angle * (theta - theta_eq)^2,
-    el gradiente de theta respecto a la posición de cada hidrógeno apunta en la
+    Para theta = angulo(r1, r2), con U = 1/2 * k * (theta - theta0)^2,
+    el gradiente de theta respecto a la posición de cada extremo apunta en la
     dirección perpendicular al radio correspondiente (dentro del plano r1-r2),
-    con magnitud 1/|r|. Aplicar la fuerza a lo largo del radio (como en la
-    versión original) no cambia theta y por lo tanto no corrige el ángulo.
+    con magnitud 1/|r|. Aplicar la fuerza a lo largo del radio no cambia
+    theta y por lo tanto no corrige el ángulo.
     """
-    theta_eq_rad = np.radians(theta_eq)
+    u1, u2, inv1, inv2, cos_theta, active = angle_geometry(pos, angles, box)
+    theta = np.arccos(cos_theta)
+    delta_theta = np.where(active, theta - theta0, 0.0)
+    sin_theta = np.sqrt(np.maximum(1 - cos_theta**2, 1e-8))
+    g = k * delta_theta / sin_theta
+    c = cos_theta[..., None]
 
-    for carbon_idx, h_indices in [(0, list(H_C1)), (1, list(H_C2))]:
-        carbon_pos = pos[carbon_idx]
+    # d(theta)/d(r1) = -perp1/r1_norm, d(theta)/d(r2) = -perp2/r2_norm,
+    # y F = -dU/dtheta * d(theta)/dr, así que el signo neto es positivo.
+    f1 = (g * inv1)[..., None] * (u2 - c * u1)
+    f2 = (g * inv2)[..., None] * (u1 - c * u2)
 
-        for i in range(len(h_indices)):
-            for j in range(i + 1, len(h_indices)):
-                hi, hj = h_indices[i], h_indices[j]
+    np.add.at(forces, (Ellipsis, angles.ravel(order='F'), slice(None)),
+              np.concatenate([f1, -(f1 + f2), f2], axis=-2))
+    return 0.5 * np.sum(k * delta_theta**2, axis=-1), theta
 
-                r1 = pos[hi] - carbon_pos
-                r2 = pos[hj] - carbon_pos
-                r1_norm = np.linalg.norm(r1)
-                r2_norm = np.linalg.norm(r2)
 
-                if r1_norm <= 0.01 or r2_norm <= 0.01:
-                    continue
+def energy_and_forces(pos, k_bond=k_bond, k_angle=k_angle):
+    """
+    Núcleo fusionado: en una sola pasada sobre la topología devuelve la
+    energía potencial, las fuerzas conservativas (sin amortiguamiento) y la
+    geometría de cada término:
+      - "bonds": distancias en el orden de BONDS (C-C, luego C1-H y C2-H) [Å]
+      - "angles": ángulos H-C-H en el orden de ANGLES (3 de C1, 3 de C2) [grados]
+
+    k_bond, k_angle: constantes de fuerza (por defecto las de params.py);
+    `functools.partial` con otros valores da un núcleo para otra parametrización.
+    """
+    forces = np.zeros_like(pos)
+    pe_bonds, r = bond_forces(pos, forces, BONDS, BOND_R0, k_bond)
+    pe_angles, theta = angle_forces(pos, forces, ANGLES, ANGLE_THETA0, k_angle)
+    geometry = {"bonds": r, "angles": np.degrees(theta)}
+    return pe_bonds + pe_angles, forces, geometry
 
-                u1 = r1 / r1_norm
-                u2 = r2 / r2_norm
 
-                cos_theta = np.clip(np.dot(u1, u2), -1, 1)
-                theta = np.arccos(cos_theta)
-                sin_theta = np.sqrt(max(1 - cos_theta**2, 1e-8))
+def bonded_kernel(bonds, angles, bond_r0, angle_theta0, k_bond=k_bond, k_angle=k_angle,
+                  box=None):
+    """
+    Núcleo con la forma de `energy_and_forces` para otra topología (p. ej.
+    la de muchas moléculas, ver `liquid.py`); bond_r0 y angle_theta0 (en
+    radianes) dan el valor de equilibrio de cada término. Con `box` (una
+    `pbc.PeriodicBox`) los enlaces y ángulos usan la imagen mínima, así que
+    una molécula puede quedar partida entre dos caras de la caja.
+    """
+    def kernel(pos):
+        forces = np.zeros_like(pos)
+        pe_bonds, r = bond_forces(pos, forces, bonds, bond_r0, k_bond, box)
+        pe_angles, theta = angle_forces(pos, forces, angles, angle_theta0, k_angle, box)
+        return pe_bonds + pe_angles, forces, {"bonds": r, "angles": np.degrees(theta)}
+    return kernel
+
+
+def sum_kernels(*kernels):
+    """
+    Núcleo suma de varios núcleos (p. ej. enlazantes + Lennard-Jones). La
+    geometría es la unión de los diccionarios de cada uno.
+    """
+    def kernel(pos):
+        pe, forces, geometry = kernels[0](pos)
+        geometry = dict(geometry)
+        for other in kernels[1:]:
+            pe_k, forces_k, geometry_k = other(pos)
+            pe = pe + pe_k
+            forces = forces + forces_k
+            geometry.update(geometry_k)
+        return pe, forces, geometry
+    return kernel
+
+
+def bond_terms(pos, k_bond=k_bond):
+    """
+    Solo los estiramientos de enlace (el grupo rápido de `respa.py`):
+    (energía, fuerzas, {"bonds": distancias}).
+    """
+    forces = np.zeros_like(pos)
+    pe, r = bond_forces(pos, forces, BONDS, BOND_R0, k_bond)
+    return pe, forces, {"bonds": r}
 
-                delta_theta = theta - theta_eq_rad
-                dUdtheta = k_angle * delta_theta
 
-                # Direcciones perpendiculares a u1 y u2, en el plano r1-r2.
-                # d(theta)/d(r1) = -perp1/r1_norm, d(theta)/d(r2) = -perp2/r2_norm,
-                # y F = -dU/dtheta * d(theta)/dr, así que el signo neto es positivo.
-                perp1 = (u2 - cos_theta * u1) / sin_theta
-                perp2 = (u1 - cos_theta * u2) / sin_theta
+def angle_terms(pos, k_angle=k_angle):
+    """Solo las flexiones H-C-H: (energía, fuerzas, {"angles": ángulos en grados})."""
+    forces = np.zeros_like(pos)
+    pe, theta = angle_forces(pos, forces, ANGLES, ANGLE_THETA0, k_angle)
+    return pe, forces, {"angles": np.degrees(theta)}
 
-                f_hi = dUdtheta / r1_norm * perp1
-                f_hj = dUdtheta / r2_norm * perp2
 
-                forces[hi] += f_hi
-                forces[hj] += f_hj
-                forces[carbon_idx] -= (f_hi + f_hj)
+def conservative_forces(pos, out=None, k_bond=k_bond, k_angle=k_angle):
+    """
+    Solo las fuerzas de `energy_and_forces`, sin armar la geometría ni
+    sumar energías, escritas en `out` si se pasa (se sobrescribe). Para los
+    pasos en que ningún observador mira la energía.
+    """
+    forces = np.zeros_like(pos) if out is None else out
+    if out is not None:
+        forces.fill(0.0)
+    bond_forces(pos, forces, BONDS, BOND_R0, k_bond)
+    angle_forces(pos, forces, ANGLES, ANGLE_THETA0, k_angle)
+    return forces
 
 
 def compute_forces(pos, vel):
-    forces = np.zeros_like(pos)
-    _bond_forces(pos, forces)
-    _angle_forces(pos, forces)
+    _, forces, _ = energy_and_forces(pos)
     forces -= damping * vel
     return forces
 
@@ -107,45 +228,19 @@ def bond_and_angle_energy(pos):
     Esta expresión no cambió respecto a la versión original: el bug
     estaba solo en la fuerza derivada de ella, no en la energía misma.
     """
-    theta_eq_rad = np.radians(theta_eq)
-
-    pe_bonds = 0.0
-    r_cc = np.linalg.norm(pos[1] - pos[0])
-    pe_bonds += 0.5 * k_bond * (r_cc - r_CC_eq) ** 2
-
-    for carbon_idx, h_indices in [(0, H_C1), (1, H_C2)]:
-        carbon_pos = pos[carbon_idx]
-        for i in h_indices:
-            r = np.linalg.norm(pos[i] - carbon_pos)
-            pe_bonds += 0.5 * k_bond * (r - r_eq) ** 2
-
-    pe_angles = 0.0
-    for carbon_idx, h_indices in [(0, list(H_C1)), (1, list(H_C2))]:
-        carbon_pos = pos[carbon_idx]
-        for i in range(len(h_indices)):
-            for j in range(i + 1, len(h_indices)):
-                hi, hj = h_indices[i], h_indices[j]
-                r1 = pos[hi] - carbon_pos
-                r2 = pos[hj] - carbon_pos
-                r1_norm = np.linalg.norm(r1)
-                r2_norm = np.linalg.norm(r2)
-                if r1_norm > 0.01 and r2_norm > 0.01:
-                    cos_theta = np.dot(r1, r2) / (r1_norm * r2_norm)
-                    theta = np.arccos(np.clip(cos_theta, -1, 1))
-                    pe_angles += 0.5 * k_angle * (theta - theta_eq_rad) ** 2
+    _, r = bond_geometry(pos, BONDS)
+    pe_bonds = 0.5 * k_bond * np.sum((r - BOND_R0) ** 2, axis=-1)
+
+    *_, cos_theta, active = angle_geometry(pos, ANGLES)
+    delta_theta = np.where(active, np.arccos(cos_theta) - ANGLE_THETA0, 0.0)
+    pe_angles = 0.5 * k_angle * np.sum(delta_theta**2, axis=-1)
 
     return pe_bonds + pe_angles
 
 
 def hch_angles(pos, carbon_idx, h_indices):
     """Devuelve la lista de ángulos H-C-H (en grados) para un carbono dado."""
-    carbon_pos = pos[carbon_idx]
-    angles = []
-    h_indices = list(h_indices)
-    for i in range(len(h_indices)):
-        for j in range(i + 1, len(h_indices)):
-            vec1 = pos[h_indices[i]] - carbon_pos
-            vec2 = pos[h_indices[j]] - carbon_pos
-            cos_theta = np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-            angles.append(np.degrees(np.arccos(np.clip(cos_theta, -1, 1))))
-    return angles
+    _, angles = build_topology([], [(hi, carbon_idx, hj)
+                                    for hi, hj in combinations(h_indices, 2)])
+    *_, cos_theta, _ = angle_geometry(pos, angles)
+    return list(np.degrees(np.arccos(cos_theta)))
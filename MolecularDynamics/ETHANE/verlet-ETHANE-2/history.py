@@ -0,0 +1,85 @@
+"""
+Almacenamiento preasignado de historiales de observables.
+
+Los historiales se guardan en un arreglo estructurado de NumPy (un registro
+por muestra) en lugar de listas de floats de Python, que ocupan ~30 veces
+más memoria y hacen una asignación pequeña por valor y por paso.
+
+Dos modos:
+  - Crecimiento: capacidad inicial (exacta si se conoce el número de pasos)
+    que se duplica si hace falta.
+  - Anillo (ring=True): capacidad fija; al llenarse se sobrescriben las
+    muestras más antiguas y la memoria queda acotada sin importar la
+    longitud de la simulación.
+
+En modo anillo cada registro se escribe dos veces, en i y en i + capacidad,
+de modo que las últimas `capacidad` muestras siempre forman un bloque
+contiguo y en orden cronológico: `view()` devuelve una vista, nunca una copia.
+
+Para los checkpoints, `checkpoint()` guarda solo los registros disponibles
+(no la capacidad sin usar) y `from_checkpoint()` vuelve a preasignar el
+buffer y los coloca en su lugar.
+"""
+
+import numpy as np
+
+
+class HistoryBuffer:
+    """Arreglo estructurado de registros con modo de crecimiento o anillo."""
+
+    def __init__(self, dtype, capacity=1024, ring=False):
+        if capacity < 1:
+            raise ValueError("La capacidad del historial debe ser al menos 1")
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.ring = ring
+        self._data = np.zeros(2 * capacity if ring else capacity, dtype=self.dtype)
+        self.count = 0  # registros escritos desde el inicio (incluye los sobrescritos)
+
+    def __len__(self):
+        return min(self.count, self.capacity) if self.ring else self.count
+
+    def append(self, record):
+        """Agrega un registro (tupla en el orden de los campos del dtype)."""
+        if self.ring:
+            i = self.count % self.capacity
+            self._data[i] = record
+            self._data[i + self.capacity] = record
+        else:
+            if self.count == len(self._data):
+                self._data = np.resize(self._data, 2 * len(self._data))
+            self._data[self.count] = record
+        self.count += 1
+
+    def view(self):
+        """Vista en orden cronológico de los registros disponibles."""
+        if not self.ring:
+            return self._data[:self.count]
+        if self.count <= self.capacity:
+            return self._data[:self.count]
+        start = self.count % self.capacity
+        return self._data[start:start + self.capacity]
+
+    def first_step_index(self):
+        """Índice (en orden de escritura) del registro más antiguo todavía disponible."""
+        return self.count - len(self)
+
+    def checkpoint(self):
+        """Estado serializable: configuración, contador y copia de los registros disponibles."""
+        return {"dtype": self.dtype, "capacity": self.capacity, "ring": self.ring,
+                "size": len(self._data), "count": self.count, "records": self.view().copy()}
+
+    @classmethod
+    def from_checkpoint(cls, data):
+        """Buffer equivalente al que devolvió `checkpoint()`."""
+        buffer = cls(data["dtype"], data["capacity"], ring=data["ring"])
+        records = data["records"]
+        buffer.count = data["count"]
+        if buffer.ring:
+            i = np.arange(buffer.count - len(records), buffer.count) % buffer.capacity
+            buffer._data[i] = records
+            buffer._data[i + buffer.capacity] = records
+        else:
+            buffer._data = np.zeros(data["size"], dtype=buffer.dtype)
+            buffer._data[:buffer.count] = records
+        return buffer
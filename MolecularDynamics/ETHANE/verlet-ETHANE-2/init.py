@@ -6,17 +6,11 @@ import numpy as np
 from params import r_eq, r_CC_eq
 
 
-def init_positions(seed=None):
+def reference_positions():
     """
-    Genera las posiciones iniciales de los 8 átomos del etano
+    Geometría ideal (sin perturbar) de los 8 átomos del etano
     (índices: 0=C1, 1=C2, 2-4=H de C1, 5-7=H de C2).
-
-    seed: si se pasa un entero, fija la semilla aleatoria para reproducibilidad
-          de la pequeña perturbación inicial.
     """
-    if seed is not None:
-        np.random.seed(seed)
-
     positions = np.zeros((8, 3))
 
     # Posición de los carbonos
@@ -48,8 +42,53 @@ def init_positions(seed=None):
         rotated_vec = np.dot(rot_matrix, tetra_vecs[i])
         positions[5 + i] = positions[1] + rotated_vec
 
+    return positions
+
+
+def random_rotations(rng, n):
+    """
+    n matrices de rotación (n, 3, 3) uniformes, por QR de matrices
+    gaussianas; para orientar al azar copias de una molécula (ver
+    `liquid.ethane_lattice` y `water.water_box`). rng: un np.random.Generator.
+    """
+    q, r = np.linalg.qr(rng.normal(size=(n, 3, 3)))
+    q *= np.sign(np.diagonal(r, axis1=1, axis2=2))[:, None, :]
+    q[np.linalg.det(q) < 0, :, 0] *= -1
+    return q
+
+
+def init_positions(seed=None, sigma=0.1):
+    """
+    Genera las posiciones iniciales de los 8 átomos del etano
+    (índices: 0=C1, 1=C2, 2-4=H de C1, 5-7=H de C2).
+
+    seed: si se pasa un entero, fija la semilla aleatoria para reproducibilidad
+          de la pequeña perturbación inicial.
+    sigma: desviación estándar de la perturbación de los hidrógenos [Å].
+    """
+    if seed is not None:
+        np.random.seed(seed)
+
+    positions = reference_positions()
+
     # Pequeña perturbación aleatoria para romper simetría exacta
     for i in range(2, 8):
-        positions[i] += np.random.normal(0, 0.1, 3)
+        positions[i] += np.random.normal(0, sigma, 3)
+
+    return positions
 
+
+def init_ensemble(n_replicas, seed=None):
+    """
+    Genera un arreglo (n_replicas, 8, 3) de configuraciones iniciales
+    independientes. Cada réplica recibe su propio flujo aleatorio, obtenido
+    con SeedSequence(seed).spawn(n_replicas), de modo que las perturbaciones
+    no se solapan entre réplicas y el conjunto completo es reproducible a
+    partir de una sola semilla.
+    """
+    children = np.random.SeedSequence(seed).spawn(n_replicas)
+    positions = np.repeat(reference_positions()[None], n_replicas, axis=0)
+    for r, child in enumerate(children):
+        rng = np.random.default_rng(child)
+        positions[r, 2:] += rng.normal(0, 0.1, (6, 3))
     return positions
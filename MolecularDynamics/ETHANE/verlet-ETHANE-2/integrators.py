@@ -0,0 +1,283 @@
+"""
+Integradores temporales para el modelo del etano.
+
+Velocity Verlet con arrastre de fuerzas: las fuerzas conservativas evaluadas
+en las posiciones nuevas al final de un paso son exactamente las que el paso
+siguiente necesita al comienzo, así que se reutilizan en lugar de
+recalcularlas. Cada paso cuesta una sola evaluación del núcleo fusionado
+`energy_and_forces`. El amortiguamiento depende solo de la velocidad y se
+añade aparte, lo que deja la trayectoria idéntica a la de la versión con
+dos llamadas a `compute_forces` por paso.
+
+Para la dinámica browniana (Langevin a temperatura finita) hay tres
+integradores con la misma interfaz (`start`, `step`, `checkpoint`,
+`restore`), seleccionables por nombre en `LANGEVIN_INTEGRATORS`:
+
+  - "euler": Euler-Maruyama sobreamortiguado (`EulerMaruyama`), el esquema
+    original, de primer orden.
+  - "lm": Leimkuhler-Matthews sobreamortiguado. Igual costo por paso, pero
+    el ruido de cada paso es el promedio de dos números aleatorios
+    consecutivos (uno se reutiliza del paso anterior); el error en las
+    medias configuracionales es de segundo orden en dt, así que admite
+    pasos varias veces mayores con la misma precisión de muestreo.
+  - "baoab": Langevin subamortiguado con velocidades, separación
+    B-A-O-A-B (Leimkuhler y Matthews, 2013), también de segundo orden en
+    las medias configuracionales.
+
+Las unidades son las de la dinámica browniana (ver params.py): movilidad
+1/(m*gamma) y aceleración F/m sin ACCEL_CONV, de modo que los tres tienen el
+mismo límite de difusión D = k_B*T/(m*gamma).
+"""
+
+import numpy as np
+
+from params import dt, damping, ACCEL_CONV, k_B, gamma
+from forces import energy_and_forces, conservative_forces
+
+
+def velocity_verlet_step(positions, velocities, forces, masses,
+                         kernel=energy_and_forces, dt=dt, damping=damping):
+    """
+    Avanza un paso de Velocity Verlet modificando `positions` y `velocities`
+    en el lugar.
+
+    forces: fuerzas conservativas en `positions` (las que devolvió el paso
+            anterior, o una llamada inicial a `kernel`).
+    kernel: función pos -> (energía, fuerzas, geometría).
+
+    Devuelve (energía, fuerzas, geometría) en las posiciones nuevas; las
+    fuerzas devueltas son las que hay que pasar al paso siguiente.
+    """
+    inv_m = ACCEL_CONV / masses[..., None]
+
+    accel = (forces - damping * velocities) * inv_m
+    positions += velocities * dt + 0.5 * accel * dt**2
+
+    pe, new_forces, geometry = kernel(positions)
+    new_accel = (new_forces - damping * velocities) * inv_m
+    velocities += 0.5 * (accel + new_accel) * dt
+
+    return pe, new_forces, geometry
+
+
+def constrained_velocity_verlet_step(positions, velocities, forces, masses, constraints,
+                                     kernel=energy_and_forces, dt=dt, damping=damping):
+    """
+    Velocity Verlet con restricciones de enlace (RATTLE), mismo contrato que
+    `velocity_verlet_step`. `constraints` es un `constraints.BondConstraints`:
+    las posiciones nuevas se corrigen con SHAKE (y la velocidad de medio paso
+    con la misma corrección / dt) y las velocidades finales con RATTLE. Las
+    iteraciones de ambos quedan en `constraints.last_iterations`.
+    """
+    inv_m = ACCEL_CONV / masses[..., None]
+
+    accel = (forces - damping * velocities) * inv_m
+    reference = positions.copy()
+    positions += velocities * dt + 0.5 * accel * dt**2
+    predicted = positions.copy()
+    shake_iterations = constraints.shake(positions, reference)
+    # Medio paso de velocidad, con la corrección de SHAKE incluida
+    half_velocities = velocities + 0.5 * accel * dt + (positions - predicted) / dt
+
+    pe, new_forces, geometry = kernel(positions)
+    new_accel = (new_forces - damping * velocities) * inv_m
+    velocities[...] = half_velocities + 0.5 * new_accel * dt
+    rattle_iterations = constraints.rattle(positions, velocities)
+    constraints.record(shake_iterations, rattle_iterations)
+
+    return pe, new_forces, geometry
+
+
+class GaussianNoise:
+    """
+    Números normales estándar de forma `shape`, sorteados por bloques de
+    `block` pasos en un búfer reutilizado: una llamada al generador cada
+    `block` pasos en lugar de una por paso. Con un `np.random.Generator` el
+    bloque se llena en su lugar (`standard_normal(out=...)`); con
+    `np.random` o un RandomState se sortea y se copia. La secuencia es la
+    misma que con una llamada por paso.
+
+    next() devuelve una vista del búfer, válida hasta la siguiente llamada.
+    """
+
+    def __init__(self, rng, shape, block=1024):
+        self.rng = rng
+        self.buffer = np.empty((block,) + tuple(shape))
+        self.index = block
+
+    def _fill(self):
+        if isinstance(self.rng, np.random.Generator):
+            self.rng.standard_normal(out=self.buffer)
+        else:
+            self.buffer[...] = self.rng.standard_normal(self.buffer.shape)
+        self.index = 0
+
+    def next(self):
+        if self.index == len(self.buffer):
+            self._fill()
+        row = self.buffer[self.index]
+        self.index += 1
+        return row
+
+    def checkpoint(self):
+        # Los números ya sorteados y no usados forman parte del estado
+        return {"buffer": self.buffer[self.index:].copy()}
+
+    def restore(self, data):
+        remaining = data["buffer"]
+        self.index = len(self.buffer) - len(remaining)
+        self.buffer[self.index:] = remaining
+
+
+class EulerMaruyama:
+    """
+    Integrador de Langevin sobreamortiguado de primer orden (Euler-Maruyama):
+    x += F dt / (m gamma) + sqrt(2 D dt) xi, con D = k_B T / (m gamma). Sin
+    arreglos temporales: los coeficientes se calculan una vez, el ruido sale
+    de `GaussianNoise` y las posiciones y fuerzas se actualizan en su lugar.
+
+    step(positions, forces, observed=True) -> (positions, energía, forces,
+    geometría) modifica `positions` y `forces` (las conservativas en
+    `positions`, que devolvió el paso anterior). Con observed=False no se
+    calculan energía ni geometría (se devuelven como None).
+
+    kernel: núcleo completo (energía, fuerzas, geometría);
+    force_kernel: f(pos, out) que solo escribe las fuerzas en `out`.
+    """
+
+    def __init__(self, masses, dt, temperature, rng=np.random, kernel=energy_and_forces,
+                 gamma=gamma, force_kernel=conservative_forces, noise_block=1024):
+        self.masses = masses
+        self.dt = dt
+        self.temperature = temperature
+        self.rng = rng
+        self.kernel = kernel
+        self.force_kernel = force_kernel
+        self.gamma = gamma
+        self.noise_block = noise_block
+        self.friction = masses[:, None] * gamma
+        self.mobility = 1.0 / self.friction
+        self.noise_std = np.sqrt(2 * (k_B * temperature / self.friction) * dt)
+
+    def _allocate(self, positions):
+        self.noise = GaussianNoise(self.rng, positions.shape, self.noise_block)
+        self.work = np.empty_like(positions)
+
+    def start(self, positions):
+        self._allocate(positions)
+
+    def _forces(self, positions, forces, observed):
+        if not observed:
+            self.force_kernel(positions, out=forces)
+            return positions, None, forces, None
+        pe, new_forces, geometry = self.kernel(positions)
+        forces[...] = new_forces
+        return positions, pe, forces, geometry
+
+    def step(self, positions, forces, observed=True):
+        work = self.work
+        np.multiply(forces, self.dt, out=work)
+        work /= self.friction
+        positions += work
+        np.multiply(self.noise.next(), self.noise_std, out=work)
+        positions += work
+        return self._forces(positions, forces, observed)
+
+    def checkpoint(self):
+        return {"noise": self.noise.checkpoint()}
+
+    def restore(self, data, positions):
+        self._allocate(positions)
+        self.noise.restore(data["noise"])
+
+
+class LeimkuhlerMatthews(EulerMaruyama):
+    """
+    Esquema de Leimkuhler-Matthews sobreamortiguado:
+        x' = x + dt * mu * F(x) + sqrt(2 * D * dt) * (R_n + R_{n+1}) / 2
+    con R_{n+1} reutilizado en el paso siguiente. El estado guardado en un
+    checkpoint es ese número aleatorio pendiente.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.drift = self.dt * self.mobility
+        self.half_std = 0.5 * self.noise_std
+
+    def start(self, positions):
+        super().start(positions)
+        self.previous = self.noise.next().copy()
+
+    def step(self, positions, forces, observed=True):
+        work = self.work
+        np.multiply(forces, self.drift, out=work)
+        positions += work
+        new_noise = self.noise.next()
+        np.add(self.previous, new_noise, out=work)
+        work *= self.half_std
+        positions += work
+        self.previous[...] = new_noise
+        return self._forces(positions, forces, observed)
+
+    def checkpoint(self):
+        return dict(super().checkpoint(), previous=self.previous.copy())
+
+    def restore(self, data, positions):
+        super().restore(data, positions)
+        self.previous = data["previous"].copy()
+
+
+class BAOAB(EulerMaruyama):
+    """
+    Langevin subamortiguado con la separación BAOAB:
+      B: v += dt/2 * F/m     A: x += dt/2 * v
+      O: v = c1 * v + c2 * sqrt(kT/m) * R, con c1 = exp(-gamma*dt), c2 = sqrt(1 - c1^2)
+      A: x += dt/2 * v       B: v += dt/2 * F(x')/m
+    Las velocidades parten de Maxwell-Boltzmann y se guardan en el checkpoint.
+    """
+
+    def __init__(self, masses, dt, temperature, rng=np.random, kernel=energy_and_forces,
+                 gamma=gamma, force_kernel=conservative_forces, noise_block=1024):
+        super().__init__(masses, dt, temperature, rng, kernel, gamma, force_kernel, noise_block)
+        self.half_dt = 0.5 * dt
+        self.half_dt_inv_m = 0.5 * dt / masses[:, None]
+        self.c1 = np.exp(-gamma * dt)
+        self.thermal_std = np.sqrt(k_B * temperature / masses[:, None])
+        self.c2_std = np.sqrt(1.0 - self.c1**2) * self.thermal_std
+
+    def start(self, positions):
+        super().start(positions)
+        self.velocities = self.thermal_std * self.noise.next()
+
+    def _drift(self, positions):
+        np.multiply(self.velocities, self.half_dt, out=self.work)
+        positions += self.work
+
+    def _kick(self, forces):
+        np.multiply(forces, self.half_dt_inv_m, out=self.work)
+        self.velocities += self.work
+
+    def step(self, positions, forces, observed=True):
+        self._kick(forces)
+        self._drift(positions)
+        self.velocities *= self.c1
+        np.multiply(self.noise.next(), self.c2_std, out=self.work)
+        self.velocities += self.work
+        self._drift(positions)
+        result = self._forces(positions, forces, observed)
+        self._kick(forces)
+        return result
+
+    def checkpoint(self):
+        return dict(super().checkpoint(), velocities=self.velocities.copy())
+
+    def restore(self, data, positions):
+        super().restore(data, positions)
+        self.velocities = data["velocities"].copy()
+
+
+LANGEVIN_INTEGRATORS = {
+    "euler": EulerMaruyama,
+    "lm": LeimkuhlerMatthews,
+    "baoab": BAOAB,
+}
@@ -2,24 +2,184 @@
 Salida a archivo: trayectoria molecular en formato XYZ y registro de energías.
 """
 
+import re
+
+import numpy as np
+
 ATOM_SYMBOLS = ["C", "C", "H", "H", "H", "H", "H", "H"]
 
 
+def _xyz_comment(step, energy=None, temperature=None, lattice=None):
+    # La caja va primero, como pares clave=valor del XYZ extendido
+    comment = f"Step: {step}" if lattice is None else f"{lattice} Step: {step}"
+    if energy is not None:
+        comment += f", Energy: {energy:.4f} kcal/mol"
+    if temperature is not None:
+        comment += f", T: {temperature}K"
+    return comment
+
+
+# Columnas por átomo de los XYZ con caja: las imágenes van después de las coordenadas
+XYZ_PROPERTIES = "Properties=species:S:1:pos:R:3:images:I:3"
+
+
+def _xyz_template(symbols, images=False):
+    """Plantilla de un frame completo: una sola llamada a format() por frame."""
+    columns = " {:.6f} {:.6f} {:.6f}" + (" {:d} {:d} {:d}" if images else "")
+    lines = "".join(f"{symbol}{columns}\n" for symbol in symbols)
+    return f"{len(symbols)}\n{{}}\n" + lines
+
+
 def init_xyz_file(filename):
     """Limpia/crea el archivo XYZ antes de empezar a escribir frames."""
     open(filename, "w").close()
 
 
-def write_xyz_frame(filename, positions, step, energy=None):
+def write_xyz_frame(filename, positions, step, energy=None, temperature=None):
     """Agrega un frame al archivo XYZ (formato estándar: N átomos, comentario, coords)."""
+    frame = _xyz_template(ATOM_SYMBOLS[:len(positions)]).format(
+        _xyz_comment(step, energy, temperature), *positions.ravel())
     with open(filename, "a") as f:
-        f.write(f"{len(positions)}\n")
-        if energy is not None:
-            f.write(f"Step: {step}, Energy: {energy:.4f} kcal/mol\n")
+        f.write(frame)
+
+
+class XYZTrajectoryWriter:
+    """
+    Escritor de trayectorias XYZ con el archivo abierto durante toda la
+    simulación y salida acumulada en memoria.
+
+    Cada frame se formatea con una sola llamada (plantilla precalculada para
+    los símbolos dados) y se agrega a un búfer; el búfer se vuelca al disco
+    cuando supera `flush_bytes` bytes o `flush_frames` frames, al llamar a
+    flush() y al cerrar. Se usa como gestor de contexto:
+
+        with XYZTrajectoryWriter("traj.xyz") as writer:
+            writer.write_frame(positions, step, energy)
+
+    El formato de salida es idéntico al de `write_xyz_frame`. Con `box` (una
+    `pbc.PeriodicBox`) cada comentario empieza con la caja en el formato XYZ
+    extendido (Lattice="..." pbc="T T T"), que leen OVITO, ASE y
+    `read_xyz_box`, y cada átomo lleva tras sus coordenadas (envueltas) los
+    tres contadores de imágenes que se pasen a write_frame (`images`, ver
+    `pbc.py`; ceros si no se pasan), declarados en Properties=.
+
+    resume: lo que devolvió checkpoint(); reabre el archivo, descarta lo
+            escrito después de ese punto y sigue agregando frames.
+    """
+
+    def __init__(self, filename, symbols=ATOM_SYMBOLS, flush_bytes=1 << 20,
+                 flush_frames=None, append=False, resume=None, box=None):
+        self.filename = filename
+        self.lattice = None if box is None else f"{box.lattice()} {XYZ_PROPERTIES}"
+        self.flush_bytes = flush_bytes
+        self.flush_frames = flush_frames
+        self._template = _xyz_template(symbols, images=box is not None)
+        self._chunks = []
+        self._n_bytes = 0
+        self.frames_written = 0
+        if resume is not None:
+            self._file = _reopen_at(filename, resume["offset"], "r+")
+            self.frames_written = resume["frames_written"]
+        else:
+            self._file = open(filename, "a" if append else "w")
+
+    def write_frame(self, positions, step, energy=None, temperature=None, images=None):
+        if self.lattice is None:
+            values = positions.ravel()
         else:
-            f.write(f"Step: {step}\n")
-        for symbol, pos in zip(ATOM_SYMBOLS, positions):
-            f.write(f"{symbol} {pos[0]:.6f} {pos[1]:.6f} {pos[2]:.6f}\n")
+            values = np.empty((len(positions), 6), dtype=object)
+            values[:, :3] = positions
+            values[:, 3:] = 0 if images is None else images
+            values = values.ravel()
+        frame = self._template.format(_xyz_comment(step, energy, temperature, self.lattice),
+                                      *values)
+        self._chunks.append(frame)
+        self._n_bytes += len(frame)
+        self.frames_written += 1
+        if self._n_bytes >= self.flush_bytes or (
+                self.flush_frames is not None and len(self._chunks) >= self.flush_frames):
+            self.flush()
+
+    def flush(self):
+        if self._chunks:
+            self._file.write("".join(self._chunks))
+            self._chunks = []
+            self._n_bytes = 0
+        self._file.flush()
+
+    def checkpoint(self):
+        """Vuelca el búfer y devuelve el punto de reanudación (ver `resume`)."""
+        self.flush()
+        return {"offset": self._file.tell(), "frames_written": self.frames_written}
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _reopen_at(filename, offset, mode):
+    """Abre un archivo existente para seguir escribiendo en `offset` (trunca lo posterior)."""
+    f = open(filename, mode)
+    f.seek(offset)
+    f.truncate()
+    return f
+
+
+_COMMENT_STEP = re.compile(r"Step:\s*(-?\d+)")
+_COMMENT_ENERGY = re.compile(r"Energy:\s*([-+0-9.eE]+|nan)")
+_COMMENT_LATTICE = re.compile(r'Lattice="([^"]*)"')
+
+
+def read_xyz_frames(filename, images=False):
+    """
+    Recorre un XYZ escrito por `write_xyz_frame` frame a frame. Genera tuplas
+    (símbolos, posiciones (n, 3), paso, energía o None); el paso y la energía
+    se leen del comentario ("Step: N, Energy: E kcal/mol"), -1 si falta.
+    Con images=True agrega a cada tupla los contadores de imágenes (n, 3)
+    de las columnas 5 a 7, o None si el archivo no los tiene.
+    """
+    with open(filename) as f:
+        while True:
+            header = f.readline()
+            if not header.strip():
+                return
+            n_atoms = int(header)
+            comment = f.readline()
+            lines = [f.readline().split() for _ in range(n_atoms)]
+            symbols = [line[0] for line in lines]
+            positions = np.array([line[1:4] for line in lines], dtype=np.float64)
+            step = _COMMENT_STEP.search(comment)
+            energy = _COMMENT_ENERGY.search(comment)
+            frame = (symbols, positions, int(step.group(1)) if step else -1,
+                     float(energy.group(1)) if energy else None)
+            if images:
+                frame += (np.array([line[4:7] for line in lines], dtype=np.int64)
+                          if len(lines[0]) >= 7 else None,)
+            yield frame
+
+
+def read_xyz_box(filename):
+    """
+    Lados de la caja periódica (3,) anotada en el primer frame de un XYZ
+    (Lattice="..." del XYZ extendido), o None si no tiene caja.
+    """
+    with open(filename) as f:
+        f.readline()
+        lattice = _COMMENT_LATTICE.search(f.readline())
+    if lattice is None:
+        return None
+    cell = np.array(lattice.group(1).split(), dtype=np.float64).reshape(3, 3)
+    if np.any(cell - np.diag(np.diag(cell))):
+        raise ValueError(f"{filename}: solo se admiten cajas ortorrómbicas")
+    return np.diag(cell).copy()
 
 
 def write_energy_file(filename, pe_history, ke_history, te_history):
@@ -30,10 +190,74 @@ def write_energy_file(filename, pe_history, ke_history, te_history):
             f.write(f"{i} {pe} {ke} {te}\n")
 
 
-def print_visualization_instructions(xyz_filename):
+def write_potential_energy_file(filename, pe_history):
+    """Escribe el historial de energía potencial (dinámica browniana), una fila por paso."""
+    with open(filename, "w") as f:
+        f.write("# Paso Energía_Potencial\n")
+        for i, pe in enumerate(pe_history):
+            f.write(f"{i} {pe}\n")
+
+
+class EnergyFileWriter:
+    """
+    Escritura incremental del archivo de energías, con el mismo formato que
+    `write_energy_file` (keys = ("pe", "ke", "te")) o
+    `write_potential_energy_file` (keys = ("pe",)): una fila por muestra,
+    numerada desde 0. Las filas se acumulan y se vuelcan cada `flush_rows`.
+    `checkpoint()` / `resume` como en `XYZTrajectoryWriter`.
+    """
+
+    HEADERS = {
+        ("pe", "ke", "te"): "# Paso Energia_Potencial Energia_Cinetica Energia_Total",
+        ("pe",): "# Paso Energía_Potencial",
+    }
+
+    def __init__(self, filename, keys=("pe", "ke", "te"), flush_rows=4096, resume=None):
+        self.filename = filename
+        self.keys = tuple(keys)
+        self.flush_rows = flush_rows
+        self._rows = []
+        if resume is not None:
+            self._file = _reopen_at(filename, resume["offset"], "r+")
+            self.rows_written = resume["rows_written"]
+        else:
+            self._file = open(filename, "w")
+            self._file.write(self.HEADERS.get(self.keys, "# Paso " + " ".join(self.keys)) + "\n")
+            self.rows_written = 0
+
+    def write_row(self, *values):
+        self._rows.append(" ".join([str(self.rows_written)] + [f"{v}" for v in values]) + "\n")
+        self.rows_written += 1
+        if len(self._rows) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._file.write("".join(self._rows))
+            self._rows = []
+        self._file.flush()
+
+    def checkpoint(self):
+        self.flush()
+        return {"offset": self._file.tell(), "rows_written": self.rows_written}
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def print_visualization_instructions(xyz_filename, energy_filename="ethane_energy.dat"):
     print(f"\nArchivos generados:")
     print(f"- {xyz_filename}: trayectoria molecular (formato XYZ)")
-    print(f"- ethane_energy.dat: datos de energía por paso")
+    print(f"- {energy_filename}: datos de energía por paso")
     print(f"\nPara visualizar la trayectoria:")
     print(f"1. Con xmakemol: xmakemol -f {xyz_filename}")
     print(f"2. Con VMD: vmd {xyz_filename}")
@@ -0,0 +1,132 @@
+"""
+Cajas de muchas moléculas de etano con interacciones intermoleculares.
+
+`ethane_lattice` coloca copias de la molécula (con orientaciones al azar)
+en una red cúbica y replica su topología; `liquid_kernel` suma las fuerzas
+enlazantes de todas las moléculas (mismos términos que `forces.py`) y un
+Lennard-Jones intermolecular con lista de vecinos por celdas
+(`neighbors.py`, `nonbonded.py`). El núcleo resultante se usa con
+`simulation.run(kernel=..., masses=...)` como el de una sola molécula.
+
+Con una `pbc.PeriodicBox` del lado de la red (`system["box"]`) la caja se
+replica en las tres direcciones: el mismo objeto se pasa a `liquid_kernel`
+y a `simulation.run(box=...)`.
+"""
+
+import time
+
+import numpy as np
+
+from params import m_C, m_H
+from init import reference_positions, random_rotations
+from forces import BONDS, ANGLES, BOND_R0, ANGLE_THETA0, bonded_kernel, sum_kernels
+from io_output import ATOM_SYMBOLS
+from neighbors import NeighborList
+from nonbonded import LennardJones
+
+ATOM_MASSES = {"C": m_C, "H": m_H}
+
+
+def ethane_lattice(n_per_side, spacing=5.0, seed=None):
+    """
+    n_per_side³ moléculas de etano en una red cúbica de paso `spacing` [Å].
+
+    Devuelve un diccionario con "positions" (N, 3), "symbols", "masses",
+    "molecule" (índice de molécula de cada átomo) y la topología replicada
+    "bonds", "angles", "bond_r0", "angle_theta0", además de "box" (lado de
+    la celda que contiene la red, para condiciones periódicas).
+    """
+    rng = np.random.default_rng(seed)
+    reference = reference_positions()
+    reference -= reference.mean(axis=0)
+    n_molecules = n_per_side**3
+    n_atoms = len(reference)
+
+    grid = np.stack(np.meshgrid(*[np.arange(n_per_side)] * 3, indexing="ij"), axis=-1)
+    centers = (grid.reshape(-1, 3) + 0.5) * spacing
+    rotations = random_rotations(rng, n_molecules)
+    positions = np.einsum("mij,aj->mai", rotations, reference) + centers[:, None, :]
+
+    offsets = (np.arange(n_molecules) * n_atoms)[:, None, None]
+    symbols = ATOM_SYMBOLS * n_molecules
+    return {
+        "positions": positions.reshape(-1, 3),
+        "symbols": symbols,
+        "masses": np.array([ATOM_MASSES[s] for s in symbols]),
+        "molecule": np.repeat(np.arange(n_molecules), n_atoms),
+        "bonds": (BONDS[None] + offsets).reshape(-1, 2),
+        "angles": (ANGLES[None] + offsets).reshape(-1, 3),
+        "bond_r0": np.tile(BOND_R0, n_molecules),
+        "angle_theta0": np.tile(ANGLE_THETA0, n_molecules),
+        "box": n_per_side * spacing,
+    }
+
+
+def liquid_kernel(system, cutoff=9.0, skin=1.0, box=None):
+    """
+    Núcleo enlazante + Lennard-Jones intermolecular para `system` (de
+    `ethane_lattice`). Devuelve (núcleo, lista de vecinos); la lista expone
+    reconstrucciones y tiempo de construcción (`NeighborList.stats`).
+    box: `pbc.PeriodicBox` para condiciones periódicas (imagen mínima en
+         todos los términos); None deja los bordes abiertos.
+    """
+    bonded = bonded_kernel(system["bonds"], system["angles"],
+                           system["bond_r0"], system["angle_theta0"], box=box)
+    neighbors = NeighborList(cutoff, skin, exclude=system["molecule"], box=box)
+    return sum_kernels(bonded, LennardJones(system["symbols"], neighbors)), neighbors
+
+
+if __name__ == "__main__":
+    from neighbors import cell_list_pairs, brute_force_pairs
+    from simulation import run
+    from observers import CallbackObserver
+    from pbc import PeriodicBox
+
+    print("Búsqueda de pares hasta 10 Å: celdas frente a todos los pares")
+    print(f"{'átomos':>8} {'pares':>10} {'celdas [s]':>11} {'O(N²) [s]':>10}")
+    for n_per_side in (3, 5, 7, 10):
+        positions = ethane_lattice(n_per_side, seed=0)["positions"]
+        t0 = time.perf_counter()
+        pairs = cell_list_pairs(positions, 10.0)
+        t_cells = time.perf_counter() - t0
+        if len(positions) <= 3000:
+            t0 = time.perf_counter()
+            brute_force_pairs(positions, 10.0)
+            t_brute = f"{time.perf_counter() - t0:10.3f}"
+        else:
+            t_brute = f"{'-':>10}"
+        print(f"{len(positions):8d} {len(pairs):10d} {t_cells:11.3f} {t_brute}")
+
+    system = ethane_lattice(6, seed=1)
+    kernel, neighbors = liquid_kernel(system)
+    n_steps = 200
+    print(f"\n{len(system['positions'])} átomos ({len(system['positions']) // 8} moléculas), "
+          f"{n_steps} pasos de Velocity Verlet con dt = 1 fs")
+    t0 = time.perf_counter()
+    positions = run(positions=system["positions"].copy(), n_steps=n_steps, dt=1.0,
+                    kernel=kernel, masses=system["masses"])
+    elapsed = time.perf_counter() - t0
+    pe, _, geometry = kernel(positions)
+    stats = neighbors.stats()
+    print(f"Energía potencial final: {pe:.2f} kcal/mol ({geometry['lj_pairs']} pares LJ en el corte)")
+    print(f"Lista de vecinos: {stats['rebuilds']} reconstrucciones en {stats['checks']} "
+          f"verificaciones, {stats['build_time']:.3f} s de construcción, {stats['pairs']} pares")
+    print(f"Tiempo total: {elapsed:.2f} s ({elapsed / n_steps * 1e3:.1f} ms por paso)")
+
+    # La misma caja con condiciones periódicas: sin superficie, todas las
+    # moléculas tienen la vecindad del seno del líquido.
+    box = PeriodicBox(system["box"])
+    kernel, neighbors = liquid_kernel(system, box=box)
+    final = {}
+    observer = CallbackObserver(lambda state: final.update(images=state["images"].copy()),
+                                every=n_steps)
+    t0 = time.perf_counter()
+    positions = run(positions=system["positions"].copy(), n_steps=n_steps, dt=1.0,
+                    kernel=kernel, masses=system["masses"], box=box, observers=[observer])
+    elapsed = time.perf_counter() - t0
+    pe, _, geometry = kernel(positions)
+    print(f"\nCaja periódica de {box.lengths[0]:.0f} Å: energía potencial final {pe:.2f} kcal/mol "
+          f"({geometry['lj_pairs']} pares LJ en el corte)")
+    print(f"Cruces de cara: {np.abs(final['images']).sum()}; desplazamiento máximo "
+          f"(sin envolver) {np.abs(box.unwrap(positions, final['images']) - system['positions']).max():.3f} Å")
+    print(f"Tiempo total: {elapsed:.2f} s ({elapsed / n_steps * 1e3:.1f} ms por paso)")
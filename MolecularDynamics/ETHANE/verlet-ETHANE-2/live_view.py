@@ -0,0 +1,297 @@
+"""
+Visualización en tiempo real como observador del núcleo de simulación:
+estructura 3D, distancias, energías y convergencia de ángulos H-C-H.
+
+Es el único módulo que importa matplotlib; el núcleo (`simulation.run`,
+`brownian.run_brownian`) se puede usar sin él.
+
+El costo de cada redibujado no crece con la longitud de la simulación:
+  - Los artistas (puntos, enlaces, curvas) se crean una sola vez y luego solo
+    se actualizan sus datos con set_data.
+  - Con blitting se restaura el fondo guardado de cada eje y se dibujan solo
+    los artistas animados; el redibujado completo de la figura ocurre solo
+    cuando cambian los límites de un eje (el eje x crece por duplicación, así
+    que eso pasa O(log n) veces).
+  - Los historiales se diezman con una envolvente mín/máx por columna
+    (`Envelope`) de tamaño acotado que se alimenta solo con las muestras
+    nuevas desde el último redibujado.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from params import r_eq, r_CC_eq, theta_eq
+from observers import Observer
+
+
+ENERGY_STYLES = {
+    "pe": ('r-', 'Potencial'),
+    "ke": ('b-', 'Cinética'),
+    "te": ('k--', 'Total'),
+}
+
+
+class Envelope:
+    """
+    Envolvente mín/máx de varias series, con a lo sumo 2 * n_columns columnas.
+
+    Cada columna resume `bucket` muestras consecutivas; cuando se acumulan
+    demasiadas columnas se fusionan de a pares y `bucket` se duplica. Las
+    muestras que todavía no completan una columna quedan pendientes y se
+    muestran tal cual.
+    """
+
+    def __init__(self, n_series, n_columns=512):
+        self.n_columns = n_columns
+        self.bucket = 1
+        self.x = np.empty(0)
+        self.lo = np.empty((0, n_series))
+        self.hi = np.empty((0, n_series))
+        self.pending = np.empty((0, n_series))
+        self.count = 0  # muestras consumidas (las pendientes incluidas)
+
+    def extend(self, values):
+        """Agrega muestras nuevas (arreglo (n, n_series))."""
+        values = np.asarray(values, dtype=float).reshape(-1, self.lo.shape[1])
+        start = self.count - len(self.pending)
+        data = np.concatenate([self.pending, values])
+        self.count += len(values)
+
+        n_full = len(data) // self.bucket
+        if n_full:
+            blocks = data[:n_full * self.bucket].reshape(n_full, self.bucket, -1)
+            self.x = np.concatenate([self.x, start + self.bucket * np.arange(n_full)])
+            self.lo = np.concatenate([self.lo, blocks.min(axis=1)])
+            self.hi = np.concatenate([self.hi, blocks.max(axis=1)])
+        self.pending = data[n_full * self.bucket:]
+
+        while len(self.x) >= 2 * self.n_columns:
+            self._merge_pairs()
+
+    def _merge_pairs(self):
+        n = len(self.x) // 2 * 2
+        self.x = np.concatenate([self.x[:n:2], self.x[n:]])
+        self.lo = np.concatenate([np.minimum(self.lo[:n:2], self.lo[1:n:2]), self.lo[n:]])
+        self.hi = np.concatenate([np.maximum(self.hi[:n:2], self.hi[1:n:2]), self.hi[n:]])
+        self.bucket *= 2
+
+    def curves(self):
+        """
+        Devuelve (x, y) para dibujar cada serie como una sola línea que
+        recorre mín y máx de cada columna, seguida de las muestras pendientes.
+        y tiene forma (n_puntos, n_series).
+        """
+        x = np.concatenate([np.repeat(self.x, 2),
+                            self.count - len(self.pending) + np.arange(len(self.pending))])
+        y = np.empty((2 * len(self.lo), self.lo.shape[1]))
+        y[0::2] = self.lo
+        y[1::2] = self.hi
+        return x, np.concatenate([y, self.pending])
+
+    def bounds(self):
+        """Mínimo y máximo global de todas las series (None si no hay datos)."""
+        parts = [a for a in (self.lo, self.hi, self.pending) if len(a)]
+        if not parts:
+            return None
+        return min(a.min() for a in parts), max(a.max() for a in parts)
+
+
+class _Panel:
+    """Un eje 2D con varias curvas alimentadas por una misma envolvente."""
+
+    def __init__(self, ax, styles, labels, n_columns):
+        self.ax = ax
+        self.envelope = Envelope(len(styles), n_columns)
+        self.lines = [ax.plot([], [], style, alpha=alpha, label=label, animated=True)[0]
+                      for (style, alpha), label in zip(styles, labels)]
+
+    def update(self, new_values):
+        """Incorpora las muestras nuevas; devuelve True si cambian los límites."""
+        self.envelope.extend(new_values)
+        x, y = self.envelope.curves()
+        for k, line in enumerate(self.lines):
+            line.set_data(x, y[:, k])
+        return self._fit_limits()
+
+    def _fit_limits(self):
+        changed = False
+        x_max = max(self.envelope.count, 1)
+        if x_max > self.ax.get_xlim()[1]:
+            self.ax.set_xlim(0, 2 ** int(np.ceil(np.log2(x_max))))
+            changed = True
+
+        bounds = self.envelope.bounds()
+        if bounds is not None:
+            y_lo, y_hi = self.ax.get_ylim()
+            lo, hi = bounds
+            if lo < y_lo or hi > y_hi:
+                margin = 0.1 * max(hi - lo, 1e-3)
+                self.ax.set_ylim(min(lo, y_lo) - margin, max(hi, y_hi) + margin)
+                changed = True
+        return changed
+
+
+class LivePlot(Observer):
+    """
+    Actualiza la figura cada `every` pasos a partir de los historiales de un
+    `HistoryRecorder`.
+
+    energies: claves de energía a graficar.
+    show_angles: agrega el panel de ángulos H-C-H.
+    title: título del panel 3D (el número de paso se muestra aparte).
+    n_columns: resolución de la envolvente de los historiales (~ancho en píxeles).
+    """
+
+    def __init__(self, recorder, every=100, energies=("pe", "ke", "te"),
+                 show_angles=True, title='Estructura del Etano', n_columns=512):
+        super().__init__(every)
+        self.recorder = recorder
+        self.energies = energies
+        self.show_angles = show_angles
+        self.title = title
+        self.n_columns = n_columns
+
+    def start(self, state):
+        n_panels = 4 if self.show_angles else 3
+        plt.ion()
+        self.fig = plt.figure(figsize=(5 * n_panels, 6))
+        ax1 = self.fig.add_subplot(1, n_panels, 1, projection='3d')
+        ax2 = self.fig.add_subplot(1, n_panels, 2)
+        ax3 = self.fig.add_subplot(1, n_panels, 3)
+
+        # --- Estructura 3D: artistas creados una sola vez ---
+        positions = state["positions"]
+        self.atoms = [
+            ax1.plot(*positions[[0]].T, 'o', color='black', ms=14, label='C1', animated=True)[0],
+            ax1.plot(*positions[[1]].T, 'o', color='gray', ms=14, label='C2', animated=True)[0],
+            ax1.plot(*positions[2:5].T, 'o', color='red', ms=10, label='H (C1)', animated=True)[0],
+            ax1.plot(*positions[5:8].T, 'o', color='blue', ms=10, label='H (C2)', animated=True)[0],
+        ]
+        self.atom_slices = [[0], [1], slice(2, 5), slice(5, 8)]
+        self.bond_pairs = [(0, 1)] + [(0, i) for i in range(2, 5)] + [(1, i) for i in range(5, 8)]
+        bond_styles = [dict(color='k', linewidth=3, alpha=0.7)] + \
+            [dict(color='r', alpha=0.5)] * 3 + [dict(color='b', alpha=0.5)] * 3
+        self.bonds = [ax1.plot(*positions[list(pair)].T, animated=True, **style)[0]
+                      for pair, style in zip(self.bond_pairs, bond_styles)]
+        self.step_text = ax1.text2D(0.02, 0.95, '', transform=ax1.transAxes, animated=True)
+        ax1.set_title(self.title)
+        ax1.set_xlim(-3, 3); ax1.set_ylim(-3, 3); ax1.set_zlim(-3, 3)
+        ax1.legend()
+
+        # --- Distancias ---
+        self.dist_panel = _Panel(
+            ax2, [('r-', 0.7)] * 3 + [('b-', 0.7)] * 3 + [('k-', 1.0)],
+            ['C1-H', '', '', 'C2-H', '', '', 'C-C'], self.n_columns)
+        ax2.axhline(r_eq, color='r', linestyle='--', label='C-H eq')
+        ax2.axhline(r_CC_eq, color='b', linestyle='--', label='C-C eq')
+        ax2.set_title('Evolución de Distancias')
+        ax2.set_xlabel('Paso'); ax2.set_ylabel('Distancia (Å)')
+        ax2.set_ylim(r_eq - 0.1, r_CC_eq + 0.1)
+        ax2.legend(); ax2.grid(True)
+
+        # --- Energías ---
+        self.energy_panel = _Panel(
+            ax3, [(ENERGY_STYLES[key][0], 1.0) for key in self.energies],
+            [ENERGY_STYLES[key][1] for key in self.energies], self.n_columns)
+        ax3.set_title('Energías del Sistema')
+        ax3.set_xlabel('Paso'); ax3.set_ylabel('Energía (kcal/mol)')
+        ax3.set_ylim(0, 1)
+        ax3.legend(); ax3.grid(True)
+
+        self.panels = [self.dist_panel, self.energy_panel]
+
+        # --- Ángulos H-C-H ---
+        if self.show_angles:
+            ax4 = self.fig.add_subplot(1, n_panels, 4)
+            self.angle_panel = _Panel(
+                ax4, [('r-', 0.6)] * 3 + [('b-', 0.6)] * 3,
+                ['C1 H-C-H', '', '', 'C2 H-C-H', '', ''], self.n_columns)
+            ax4.axhline(theta_eq, color='k', linestyle='--', label='109.47° (ideal)')
+            ax4.set_title('Convergencia de Ángulos H-C-H')
+            ax4.set_xlabel('Paso'); ax4.set_ylabel('Ángulo (°)')
+            ax4.set_ylim(theta_eq - 5, theta_eq + 5)
+            ax4.legend(); ax4.grid(True)
+            self.panels.append(self.angle_panel)
+
+        for panel in self.panels:
+            panel.ax.set_xlim(0, self.every)
+
+        self.ax3d = ax1
+        self._consumed = 0
+        self.backgrounds = None
+        plt.tight_layout()
+        plt.show(block=False)
+        self._full_redraw()
+
+    def _new_samples(self):
+        """
+        Muestras de los historiales agregadas desde el último redibujado. Si el
+        historial es un anillo y ya sobrescribió parte de ellas, se toman las
+        que siguen disponibles.
+        """
+        history = self.recorder.history
+        new = self.recorder.count - self._consumed
+        self._consumed = self.recorder.count
+        recent = slice(len(history["dist_CC"]) - min(new, len(history["dist_CC"])), None)
+
+        dist = np.column_stack([history["dist_CH"][:, recent].T, history["dist_CC"][recent]])
+        energies = np.column_stack([history[key][recent] for key in self.energies])
+        samples = [dist, energies]
+        if self.show_angles:
+            samples.append(np.hstack([history["angles_C1"][recent], history["angles_C2"][recent]]))
+        return samples
+
+    def _full_redraw(self):
+        """Redibuja toda la figura y guarda los fondos de cada eje para el blitting."""
+        canvas = self.fig.canvas
+        canvas.draw()
+        if canvas.supports_blit:
+            self.backgrounds = {ax: canvas.copy_from_bbox(ax.bbox) for ax in self._axes()}
+        self._blit(self._axes())
+
+    def _axes(self):
+        return [self.ax3d] + [panel.ax for panel in self.panels]
+
+    def _blit(self, axes):
+        canvas = self.fig.canvas
+        for ax in axes:
+            if self.backgrounds is not None:
+                canvas.restore_region(self.backgrounds[ax])
+            for artist in ax.get_children():
+                if artist.get_animated():
+                    ax.draw_artist(artist)
+            if self.backgrounds is not None:
+                canvas.blit(ax.bbox)
+        canvas.flush_events()
+
+    def __call__(self, state):
+        positions, step = state["positions"], state["step"]
+
+        for artist, idx in zip(self.atoms, self.atom_slices):
+            p = positions[idx]
+            artist.set_data_3d(p[:, 0], p[:, 1], p[:, 2])
+        for artist, pair in zip(self.bonds, self.bond_pairs):
+            p = positions[list(pair)]
+            artist.set_data_3d(p[:, 0], p[:, 1], p[:, 2])
+        self.step_text.set_text(f'Paso {step}')
+
+        # El eje 3D (estructura y número de paso) cambia siempre; de los
+        # paneles, solo los que recibieron muestras nuevas
+        changed_axes = [self.ax3d]
+        limits_changed = False
+        for panel, values in zip(self.panels, self._new_samples()):
+            if len(values):
+                limits_changed |= panel.update(values)
+                changed_axes.append(panel.ax)
+
+        if limits_changed or self.backgrounds is None:
+            self._full_redraw()
+        else:
+            self._blit(changed_axes)
+
+    def finish(self, state):
+        plt.ioff()
+        # Deja la figura final completa (con los artistas animados) para plt.show()
+        for artist in self.fig.findobj(lambda a: a.get_animated()):
+            artist.set_animated(False)
+        self.fig.canvas.draw_idle()
@@ -9,6 +9,7 @@ import matplotlib.pyplot as plt
 from simulation import run_simulation_with_visualization
 from analysis import analyze_final_state, print_summary
 from io_output import print_visualization_instructions
+from observers import StatisticsObserver
 
 
 if __name__ == "__main__":
@@ -16,16 +17,19 @@ if __name__ == "__main__":
 
     xyz_filename = "ethane_trajectory.xyz"
     energy_filename = "ethane_energy.dat"
+    statistics = StatisticsObserver()
 
     final_pos, history = run_simulation_with_visualization(
         seed=42,
         xyz_filename=xyz_filename,
         energy_filename=energy_filename,
         xyz_every=100,
+        observers=[statistics],
     )
 
     dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2 = analyze_final_state(final_pos)
-    print_summary(dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2, history["te"][-1])
+    print_summary(dist_CH_C1, dist_CH_C2, dist_CC, angles_C1, angles_C2, history["te"][-1],
+                  stats=statistics.stats)
     print_visualization_instructions(xyz_filename)
 
     plt.show()
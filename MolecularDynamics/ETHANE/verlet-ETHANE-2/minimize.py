@@ -0,0 +1,206 @@
+"""
+Minimización de energía directa (FIRE y L-BFGS) con las fuerzas analíticas.
+
+Alternativa a relajar la molécula con Velocity Verlet amortiguado durante un
+número fijo de pasos: los minimizadores se detienen en cuanto se cumplen las
+tolerancias de fuerza y de cambio de energía, e informan cuántas
+evaluaciones de fuerza usaron.
+
+El núcleo es cualquier función pos -> (energía, fuerzas, ...), como
+`forces.energy_and_forces`. Para modelos que solo exponen
+`compute_forces(pos, vel)` y una función de energía (p. ej. el script de
+CH4) se construye con `kernel_from_forces`:
+
+    kernel = kernel_from_forces(compute_forces, bond_and_angle_energy)
+    final_pos, info = minimize(init_positions(), kernel=kernel)
+"""
+
+import numpy as np
+
+from forces import energy_and_forces
+
+
+def kernel_from_forces(compute_forces, energy):
+    """
+    Adapta un par compute_forces(pos, vel) / energy(pos) al formato de núcleo
+    pos -> (energía, fuerzas). Las fuerzas se evalúan con velocidad nula, así
+    que cualquier término de amortiguamiento desaparece.
+    """
+    def kernel(pos):
+        return energy(pos), compute_forces(pos, np.zeros_like(pos))
+    return kernel
+
+
+def force_norms(forces):
+    """Máximo de la norma de la fuerza por átomo y norma RMS por átomo."""
+    per_atom = np.sqrt(np.sum(forces**2, axis=-1))
+    return per_atom.max(), np.sqrt(np.mean(per_atom**2))
+
+
+class _Evaluator:
+    """Envuelve el núcleo, cuenta evaluaciones y comprueba la convergencia."""
+
+    def __init__(self, kernel, fmax, frms, etol):
+        self.kernel = kernel
+        self.fmax = fmax
+        self.frms = frms
+        self.etol = etol
+        self.n_evals = 0
+
+    def __call__(self, pos):
+        result = self.kernel(pos)
+        self.n_evals += 1
+        return float(result[0]), result[1]
+
+    def converged(self, forces, delta_e):
+        f_max, f_rms = force_norms(forces)
+        ok = f_max <= self.fmax
+        if self.frms is not None:
+            ok = ok and f_rms <= self.frms
+        if self.etol is not None:
+            ok = ok and abs(delta_e) <= self.etol
+        return ok
+
+
+def _fire(pos, evaluate, max_evals, dt=0.01, dt_max=0.05, n_min=5,
+          f_inc=1.1, f_dec=0.5, alpha_start=0.1, f_alpha=0.99):
+    """
+    FIRE (Bitzek et al., 2006) con masas unitarias: dinámica de Euler
+    semi-implícita cuya velocidad se mezcla hacia la dirección de la fuerza
+    mientras la potencia F·v sea positiva; si se vuelve negativa, se detiene
+    el sistema y se reduce el paso.
+    """
+    energy, forces = evaluate(pos)
+    velocities = np.zeros_like(pos)
+    alpha = alpha_start
+    n_positive = 0
+    delta_e = np.inf
+
+    while not evaluate.converged(forces, delta_e) and evaluate.n_evals < max_evals:
+        power = np.sum(forces * velocities)
+        if power > 0:
+            f_norm = np.sqrt(np.sum(forces**2))
+            v_norm = np.sqrt(np.sum(velocities**2))
+            velocities = (1 - alpha) * velocities + alpha * v_norm * forces / f_norm
+            n_positive += 1
+            if n_positive > n_min:
+                dt = min(dt * f_inc, dt_max)
+                alpha *= f_alpha
+        else:
+            velocities[:] = 0.0
+            dt *= f_dec
+            alpha = alpha_start
+            n_positive = 0
+
+        velocities += dt * forces
+        pos = pos + dt * velocities
+        new_energy, forces = evaluate(pos)
+        delta_e, energy = new_energy - energy, new_energy
+
+    return pos, energy, forces, delta_e
+
+
+def _lbfgs(pos, evaluate, max_evals, memory=10, max_step=0.2, c1=1e-4):
+    """
+    L-BFGS con recursión de dos lazos y búsqueda lineal con retroceso
+    (condición de Armijo). El paso se limita a `max_step` Å por coordenada
+    para que las primeras iteraciones, sin curvatura acumulada, no lancen
+    los átomos lejos.
+    """
+    shape = pos.shape
+    x = pos.ravel().copy()
+    energy, forces = evaluate(x.reshape(shape))
+    g = -forces.ravel()
+    s_hist, y_hist, rho_hist = [], [], []
+    delta_e = np.inf
+
+    while not evaluate.converged(forces, delta_e) and evaluate.n_evals < max_evals:
+        # Recursión de dos lazos: d = -H g
+        q = g.copy()
+        alphas = []
+        for s, y, rho in reversed(list(zip(s_hist, y_hist, rho_hist))):
+            a = rho * np.dot(s, q)
+            q -= a * y
+            alphas.append(a)
+        if y_hist:
+            q *= np.dot(s_hist[-1], y_hist[-1]) / np.dot(y_hist[-1], y_hist[-1])
+        for (s, y, rho), a in zip(zip(s_hist, y_hist, rho_hist), reversed(alphas)):
+            b = rho * np.dot(y, q)
+            q += (a - b) * s
+        direction = -q
+
+        slope = np.dot(g, direction)
+        if slope >= 0:
+            # La curvatura acumulada no da una dirección de descenso: reinicio
+            s_hist, y_hist, rho_hist = [], [], []
+            direction = -g
+            slope = -np.dot(g, g)
+
+        largest = np.abs(direction).max()
+        if largest > max_step:
+            direction *= max_step / largest
+            slope *= max_step / largest
+
+        step = 1.0
+        while True:
+            x_new = x + step * direction
+            new_energy, new_forces = evaluate(x_new.reshape(shape))
+            if new_energy <= energy + c1 * step * slope or evaluate.n_evals >= max_evals:
+                break
+            step *= 0.5
+
+        g_new = -new_forces.ravel()
+        s, y = x_new - x, g_new - g
+        sy = np.dot(s, y)
+        if sy > 1e-12:
+            s_hist.append(s)
+            y_hist.append(y)
+            rho_hist.append(1.0 / sy)
+            if len(s_hist) > memory:
+                s_hist.pop(0)
+                y_hist.pop(0)
+                rho_hist.pop(0)
+
+        x, g, forces = x_new, g_new, new_forces
+        delta_e, energy = new_energy - energy, new_energy
+
+    return x.reshape(shape), energy, forces, delta_e
+
+
+METHODS = {"fire": _fire, "lbfgs": _lbfgs}
+
+
+def minimize(positions, kernel=energy_and_forces, method="lbfgs",
+             fmax=1e-3, frms=None, etol=None, max_evals=5000, **options):
+    """
+    Minimiza la energía a partir de `positions` (no se modifica el arreglo).
+
+    kernel: función pos -> (energía, fuerzas, ...); por defecto el etano.
+    method: "fire" o "lbfgs".
+    fmax:   tolerancia de la norma máxima de fuerza por átomo [kcal/mol/Å].
+    frms:   tolerancia opcional de la norma RMS de fuerza por átomo.
+    etol:   tolerancia opcional del cambio de energía entre iteraciones [kcal/mol].
+    max_evals: tope de evaluaciones del núcleo.
+    options: parámetros propios del método (p. ej. dt_max para FIRE,
+             memory o max_step para L-BFGS).
+
+    Devuelve (final_pos, info) con info = {"energy", "fmax", "frms",
+    "n_evals", "converged", "method"}.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método desconocido '{method}'; use uno de {sorted(METHODS)}")
+
+    evaluate = _Evaluator(kernel, fmax, frms, etol)
+    pos = np.array(positions, dtype=float)
+    final_pos, energy, forces, delta_e = METHODS[method](pos, evaluate, max_evals, **options)
+
+    f_max, f_rms = force_norms(forces)
+    info = {
+        "energy": energy,
+        "fmax": float(f_max),
+        "frms": float(f_rms),
+        "n_evals": evaluate.n_evals,
+        "converged": bool(evaluate.converged(forces, delta_e)),
+        "method": method,
+    }
+    return final_pos, info
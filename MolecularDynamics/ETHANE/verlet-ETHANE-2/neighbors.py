@@ -0,0 +1,174 @@
+"""
+Búsqueda de vecinos por celdas (cell list) con piel de Verlet.
+
+Para un término no enlazante con radio de corte r_c, comparar todos los
+pares cuesta O(N²). Aquí el espacio se divide en celdas de lado >= r_c, de
+modo que los vecinos de un átomo solo pueden estar en su celda o en las 26
+adyacentes; recorriendo la mitad de ellas (la propia y 13 vecinas, "media
+capa") cada par aparece una sola vez. Todo es vectorizado: los átomos se
+ordenan por celda y, para cada uno de los 14 desplazamientos de celda, los
+pares candidatos se generan de una vez con `np.repeat`, sin bucles de
+Python por átomo ni por celda. El costo es O(N) a densidad fija.
+
+`NeighborList` guarda la lista de pares hasta r_c + skin y solo la
+reconstruye cuando algún átomo se movió más de skin/2 desde la última
+construcción (entonces ningún par pudo entrar en r_c sin estar en la
+lista). Cuenta reconstrucciones, verificaciones y tiempo de construcción.
+
+Con una `pbc.PeriodicBox` las celdas cubren la caja y los índices de celda
+vecina se toman módulo el número de celdas, así que las celdas de una cara
+son vecinas de las de la cara opuesta; las distancias usan la imagen
+mínima. Hacen falta al menos 3 celdas por eje para que la media capa no
+repita pares; con menos se comparan todos los pares.
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+# Desplazamientos de celda de la media capa: la propia celda y las 13
+# vecinas lexicográficamente positivas
+HALF_SHELL = np.array([(0, 0, 0)] + [offset for offset in itertools.product((-1, 0, 1), repeat=3)
+                                     if offset > (0, 0, 0)])
+
+
+def _cell_grid(positions, cell_min):
+    """Celdas de lado >= cell_min sobre la caja que encierra a los átomos."""
+    origin = positions.min(axis=0)
+    extent = positions.max(axis=0) - origin
+    n_cells = np.maximum((extent // cell_min).astype(np.intp), 1)
+    cell_size = np.where(n_cells > 1, extent / n_cells, np.inf)
+    coords = np.minimum(((positions - origin) / cell_size).astype(np.intp), n_cells - 1)
+    return coords, n_cells
+
+
+def _periodic_cell_grid(positions, cell_min, box):
+    """Celdas de lado >= cell_min que dividen la caja periódica."""
+    n_cells = np.maximum((box.lengths // cell_min).astype(np.intp), 1)
+    coords = np.floor(positions / box.lengths * n_cells).astype(np.intp) % n_cells
+    return coords, n_cells
+
+
+def _check_cutoff(cutoff, box):
+    if box is not None and cutoff > 0.5 * box.lengths.min():
+        raise ValueError(f"El corte ({cutoff} Å) supera la mitad del lado menor de la caja "
+                         f"({box.lengths.min()} Å): la imagen mínima no alcanza")
+
+
+def cell_list_pairs(positions, cutoff, box=None):
+    """
+    Todos los pares (i, j), i < j, con |r_j - r_i| < cutoff, como arreglo
+    (n_pares, 2). Los pares salen agrupados por celda, no ordenados.
+    box: `pbc.PeriodicBox` para distancias periódicas (imagen mínima).
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    _check_cutoff(cutoff, box)
+    if not len(positions):
+        return np.empty((0, 2), dtype=np.intp)
+    if box is None:
+        coords, n_cells = _cell_grid(positions, cutoff)
+    else:
+        coords, n_cells = _periodic_cell_grid(positions, cutoff, box)
+        if np.any(n_cells < 3):
+            return brute_force_pairs(positions, cutoff, box)
+    cell = np.ravel_multi_index(coords.T, n_cells)
+    order = np.argsort(cell, kind="stable")
+    counts = np.bincount(cell, minlength=int(np.prod(n_cells)))
+    starts = np.cumsum(counts) - counts
+
+    pairs = []
+    for offset in HALF_SHELL:
+        neighbor = coords + offset
+        if box is not None:
+            neighbor %= n_cells
+        valid = np.all((neighbor >= 0) & (neighbor < n_cells), axis=1)
+        i = np.nonzero(valid)[0]
+        neighbor_cell = np.ravel_multi_index(neighbor[valid].T, n_cells)
+        c = counts[neighbor_cell]
+        total = c.sum()
+        # Para cada átomo i, los c[i] átomos de su celda vecina en `order`
+        local = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+        j = order[np.repeat(starts[neighbor_cell], c) + local]
+        i = np.repeat(i, c)
+        if not offset.any():
+            keep = j > i
+            i, j = i[keep], j[keep]
+        pairs.append(np.column_stack([i, j]))
+
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.intp)
+    r_vec = positions[pairs[:, 1]] - positions[pairs[:, 0]]
+    if box is not None:
+        r_vec = box.minimum_image(r_vec)
+    pairs = pairs[(r_vec * r_vec).sum(axis=1) < cutoff**2]
+    return np.sort(pairs, axis=1)
+
+
+def brute_force_pairs(positions, cutoff, box=None):
+    """Referencia O(N²) para verificar `cell_list_pairs` en sistemas chicos."""
+    positions = np.asarray(positions, dtype=np.float64)
+    _check_cutoff(cutoff, box)
+    i, j = np.triu_indices(len(positions), k=1)
+    r_vec = positions[j] - positions[i]
+    if box is not None:
+        r_vec = box.minimum_image(r_vec)
+    keep = (r_vec * r_vec).sum(axis=1) < cutoff**2
+    return np.column_stack([i[keep], j[keep]])
+
+
+class NeighborList:
+    """
+    Lista de medios vecinos (cada par una vez) hasta cutoff + skin [Å].
+
+    exclude: identificador de molécula de cada átomo; los pares dentro de
+             una misma molécula se descartan (sus interacciones son las
+             enlazantes). None no excluye nada.
+    box: `pbc.PeriodicBox` para condiciones periódicas; los
+         desplazamientos desde la última construcción también usan la
+         imagen mínima (los átomos envueltos saltan un lado de caja).
+
+    update(positions) devuelve los pares, reconstruyendo solo si hace falta.
+    Contadores: `rebuilds`, `checks` (llamadas a update), `build_time` [s].
+    """
+
+    def __init__(self, cutoff, skin=1.0, exclude=None, box=None):
+        self.cutoff = cutoff
+        self.skin = skin
+        self.box = box
+        self.exclude = None if exclude is None else np.asarray(exclude)
+        self.pairs = None
+        self.reference = None
+        self.rebuilds = 0
+        self.checks = 0
+        self.build_time = 0.0
+
+    def build(self, positions):
+        t0 = time.perf_counter()
+        pairs = cell_list_pairs(positions, self.cutoff + self.skin, self.box)
+        if self.exclude is not None:
+            pairs = pairs[self.exclude[pairs[:, 0]] != self.exclude[pairs[:, 1]]]
+        self.pairs = pairs
+        self.reference = np.array(positions, dtype=np.float64)
+        self.rebuilds += 1
+        self.build_time += time.perf_counter() - t0
+        return pairs
+
+    def needs_rebuild(self, positions):
+        if self.pairs is None:
+            return True
+        displacement = positions - self.reference
+        if self.box is not None:
+            displacement = self.box.minimum_image(displacement)
+        displacement2 = (displacement**2).sum(axis=1).max(initial=0.0)
+        return displacement2 > (0.5 * self.skin) ** 2
+
+    def update(self, positions):
+        self.checks += 1
+        if self.needs_rebuild(positions):
+            return self.build(positions)
+        return self.pairs
+
+    def stats(self):
+        return {"rebuilds": self.rebuilds, "checks": self.checks,
+                "build_time": self.build_time,
+                "pairs": 0 if self.pairs is None else len(self.pairs)}
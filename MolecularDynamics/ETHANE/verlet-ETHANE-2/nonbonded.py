@@ -0,0 +1,64 @@
+"""
+Interacciones no enlazantes entre moléculas: Lennard-Jones 12-6.
+
+U(r) = 4 eps [(sigma/r)^12 - (sigma/r)^6] - U(r_c)   para r < r_c
+
+con parámetros por elemento (OPLS-AA para alcanos) y reglas de mezcla de
+Lorentz-Berthelot (sigma_ij = (sigma_i + sigma_j)/2, eps_ij = sqrt(eps_i eps_j)).
+El potencial se desplaza para que valga cero en el corte. Los pares salen de
+una `neighbors.NeighborList`, así que el costo es O(N); el término tiene la
+forma de núcleo de `forces.py` (pos -> energía, fuerzas, geometría) y se suma
+a los enlazantes con `forces.sum_kernels` o se registra como grupo lento de
+`respa.py`.
+"""
+
+import numpy as np
+
+# elemento: (sigma [Å], epsilon [kcal/mol])
+LJ_PARAMS = {
+    "C": (3.50, 0.066),
+    "H": (2.50, 0.030),
+}
+
+
+class LennardJones:
+    """
+    symbols: elemento de cada átomo.
+    neighbors: `NeighborList` (su `cutoff` es el radio de corte del término;
+               si tiene `box`, los pares usan la imagen mínima).
+    shift: desplaza el potencial para que sea continuo en el corte.
+    """
+
+    def __init__(self, symbols, neighbors, params=LJ_PARAMS, shift=True):
+        self.neighbors = neighbors
+        self.cutoff = neighbors.cutoff
+        self.sigma = np.array([params[s][0] for s in symbols])
+        self.epsilon = np.array([params[s][1] for s in symbols])
+        self.shift = shift
+
+    def __call__(self, pos):
+        pairs = self.neighbors.update(pos)
+        i, j = pairs[:, 0], pairs[:, 1]
+        r_vec = pos[j] - pos[i]
+        if self.neighbors.box is not None:
+            r_vec = self.neighbors.box.minimum_image(r_vec)
+        r2 = (r_vec * r_vec).sum(axis=1)
+        inside = r2 < self.cutoff**2
+        i, j, r_vec, r2 = i[inside], j[inside], r_vec[inside], r2[inside]
+
+        sigma = 0.5 * (self.sigma[i] + self.sigma[j])
+        eps = np.sqrt(self.epsilon[i] * self.epsilon[j])
+        sr6 = (sigma**2 / r2) ** 3
+        energy = 4 * eps * (sr6**2 - sr6)
+        if self.shift:
+            src6 = (sigma / self.cutoff) ** 6
+            energy -= 4 * eps * (src6**2 - src6)
+        # F_j = -dU/dr * r_vec / r = 24 eps (2 sr12 - sr6) / r² * r_vec; F_i = -F_j
+        f = (24 * eps * (2 * sr6**2 - sr6) / r2)[:, None] * r_vec
+
+        n_atoms = len(pos)
+        forces = np.empty_like(pos)
+        for axis in range(3):
+            forces[:, axis] = (np.bincount(j, f[:, axis], minlength=n_atoms)
+                               - np.bincount(i, f[:, axis], minlength=n_atoms))
+        return energy.sum(), forces, {"lj_pairs": len(i)}
@@ -0,0 +1,373 @@
+"""
+Observadores del núcleo de simulación sin gráficos (`simulation.run`,
+`brownian.run_brownian`).
+
+El núcleo solo integra; todo lo demás (historiales, archivos XYZ, gráficos,
+análisis) se engancha como observador. Un observador tiene:
+  - every: cada cuántos pasos se le llama,
+  - start(state): antes del primer paso (estado inicial, step = 0),
+  - __call__(state): tras cada paso múltiplo de `every`,
+  - finish(state): al terminar la simulación.
+  - close(): siempre al salir del núcleo, también si hubo una excepción
+    (liberar archivos, volcar búferes).
+  - checkpoint() / restore(data, state): guardar y recuperar su estado en
+    un checkpoint (ver `checkpoint.py`); restore() reemplaza a start() al
+    reanudar una simulación.
+
+`state` es un diccionario con al menos "step", "n_steps", "positions", "pe"
+y "geometry" (ver `forces.energy_and_forces`); la dinámica de Verlet añade
+además "velocities", "ke" y "te", y con condiciones periódicas "box" e
+"images" (ver `pbc.py`). Los arreglos se reutilizan entre pasos:
+un observador que necesite guardarlos debe copiarlos.
+"""
+
+import numpy as np
+
+from history import HistoryBuffer
+from io_output import ATOM_SYMBOLS, XYZTrajectoryWriter, EnergyFileWriter
+from trajectory import BinaryTrajectoryWriter
+from background_io import BackgroundWriter
+from online_stats import RunningStats, DEFAULT_RANGES
+
+
+class Observer:
+    """Observador base: todos los ganchos son no-ops."""
+
+    def __init__(self, every=1):
+        self.every = every
+
+    def start(self, state):
+        pass
+
+    def __call__(self, state):
+        pass
+
+    def finish(self, state):
+        pass
+
+    def close(self):
+        pass
+
+    def checkpoint(self):
+        return None
+
+    def restore(self, data, state):
+        self.start(state)
+
+
+class CallbackObserver(Observer):
+    """Adapta una función f(state) a observador llamado cada `every` pasos."""
+
+    def __init__(self, callback, every=1):
+        super().__init__(every)
+        self.callback = callback
+
+    def __call__(self, state):
+        self.callback(state)
+
+
+class HistoryRecorder(Observer):
+    """
+    Guarda los historiales de distancias, energías y ángulos H-C-H en un
+    `HistoryBuffer` preasignado. `history` devuelve las mismas claves que
+    `run_simulation_with_visualization` siempre devolvió, ahora como vistas
+    de NumPy sobre el buffer:
+      "dist_CH": (6, n)   "dist_CC": (n,)
+      "angles_C1", "angles_C2": (n, 3)
+      "pe", "ke", "te": (n,), solo las presentes en el estado
+      "step": (n,) número de paso de cada muestra
+
+    every: paso (stride) entre muestras.
+    capacity: número de muestras a reservar; si se omite se deduce de
+              state["n_steps"] al empezar.
+    ring: con True, conserva solo las últimas `capacity` muestras.
+    """
+
+    ENERGY_KEYS = ("pe", "ke", "te")
+
+    def __init__(self, every=1, capacity=None, ring=False):
+        super().__init__(every)
+        if ring and capacity is None:
+            raise ValueError("El modo anillo necesita una capacidad fija")
+        self.capacity = capacity
+        self.ring = ring
+        self.buffer = None
+
+    def start(self, state):
+        self.energy_keys = [key for key in self.ENERGY_KEYS if key in state]
+        fields = [("step", np.int64), ("dist_CH", np.float64, (6,)), ("dist_CC", np.float64),
+                  ("angles_C1", np.float64, (3,)), ("angles_C2", np.float64, (3,))]
+        fields += [(key, np.float64) for key in self.energy_keys]
+
+        capacity = self.capacity
+        if capacity is None:
+            capacity = max(state.get("n_steps", 1023) // self.every, 1)
+        self.buffer = HistoryBuffer(fields, capacity, ring=self.ring)
+
+    def __call__(self, state):
+        # bonds = [C-C, C1-H x3, C2-H x3], angles = [C1 H-C-H x3, C2 H-C-H x3]
+        bonds, angles = state["geometry"]["bonds"], state["geometry"]["angles"]
+        self.buffer.append((state["step"], bonds[1:], bonds[0], angles[:3], angles[3:],
+                            *[state[key] for key in self.energy_keys]))
+
+    def checkpoint(self):
+        # Solo los registros escritos: la capacidad reservada se vuelve a
+        # preasignar al reanudar
+        return {"buffer": self.buffer.checkpoint(), "energy_keys": self.energy_keys}
+
+    def restore(self, data, state):
+        self.buffer = HistoryBuffer.from_checkpoint(data["buffer"])
+        self.energy_keys = data["energy_keys"]
+
+    @property
+    def count(self):
+        """Muestras registradas desde el inicio (incluidas las ya sobrescritas)."""
+        return 0 if self.buffer is None else self.buffer.count
+
+    @property
+    def history(self):
+        return history_from_records(self.buffer.view())
+
+    @property
+    def records(self):
+        """Registros crudos del buffer (arreglo estructurado, vista)."""
+        return self.buffer.view()
+
+
+def history_from_records(data):
+    """Diccionario de historiales de `HistoryRecorder.history` a partir de sus registros."""
+    history = {
+        "step": data["step"],
+        "dist_CH": data["dist_CH"].T,
+        "dist_CC": data["dist_CC"],
+        "angles_C1": data["angles_C1"],
+        "angles_C2": data["angles_C2"],
+    }
+    for key in HistoryRecorder.ENERGY_KEYS:
+        if key in data.dtype.names:
+            history[key] = data[key]
+    return history
+
+
+class XYZObserver(Observer):
+    """
+    Exporta la trayectoria en formato XYZ: el estado inicial, un frame cada
+    `every` pasos y el estado final (si no coincidió con un frame ya escrito).
+    Los bucles originales escribían el último paso dos veces cuando n_steps
+    era múltiplo de `every` (el frame periódico y el final, idénticos); aquí
+    ese duplicado no se escribe, así que esos archivos tienen un frame menos
+    que los de antes, con el mismo contenido. El archivo queda abierto durante la simulación (`XYZTrajectoryWriter`) y
+    se vuelca cada `flush_bytes` bytes o `flush_frames` frames.
+
+    energy_key: energía anotada en el comentario de cada frame ("te" para
+                Verlet, "pe" para dinámica browniana).
+    temperature: si se pasa, se anota también en el comentario.
+    background: con True la escritura la hace un hilo aparte
+                (`background_io.BackgroundWriter`, cola de `queue_size` frames).
+    symbols: símbolos atómicos (por defecto los del etano; los de
+             `liquid.ethane_lattice` para una caja de moléculas).
+
+    Si el estado trae una caja periódica ("box"), se anota en el archivo y
+    las posiciones se escriben envueltas, junto con sus contadores de
+    imágenes ("images"), de modo que la trayectoria continua se puede
+    reconstruir exactamente.
+    """
+
+    def __init__(self, filename, every=100, energy_key="te", temperature=None,
+                 flush_bytes=1 << 20, flush_frames=None, background=False, queue_size=256,
+                 symbols=ATOM_SYMBOLS):
+        super().__init__(every)
+        self.filename = filename
+        self.symbols = symbols
+        self.energy_key = energy_key
+        self.temperature = temperature
+        self.flush_bytes = flush_bytes
+        self.flush_frames = flush_frames
+        self.background = background
+        self.queue_size = queue_size
+        self.writer = None
+        self._last_step = None
+
+    def _write(self, state, energy):
+        self.writer.write_frame(state["positions"], state["step"], energy,
+                                temperature=self.temperature, images=state.get("images"))
+        self._last_step = state["step"]
+
+    def _open_writer(self, resume=None, box=None):
+        return XYZTrajectoryWriter(self.filename, symbols=self.symbols,
+                                   flush_bytes=self.flush_bytes,
+                                   flush_frames=self.flush_frames, resume=resume, box=box)
+
+    def _start_writer(self, resume=None, box=None):
+        self.writer = self._open_writer(resume, box)
+        if self.background:
+            self.writer = BackgroundWriter(self.writer, maxsize=self.queue_size)
+
+    def start(self, state):
+        self._start_writer(box=state.get("box"))
+        self._write(state, None)
+
+    def checkpoint(self):
+        return {"writer": self.writer.checkpoint(), "last_step": self._last_step}
+
+    def restore(self, data, state):
+        self._start_writer(resume=data["writer"], box=state.get("box"))
+        self._last_step = data["last_step"]
+
+    def __call__(self, state):
+        self._write(state, state[self.energy_key])
+
+    def finish(self, state):
+        if state["step"] != self._last_step:
+            self._write(state, state[self.energy_key])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class BinaryTrajectoryObserver(XYZObserver):
+    """
+    Igual que `XYZObserver` pero en el formato binario de `trajectory.py`
+    (coordenadas en `dtype`, paso y energía en el índice por frame).
+    """
+
+    def __init__(self, filename, every=100, energy_key="te", dtype=np.float32,
+                 background=False, queue_size=256, symbols=ATOM_SYMBOLS):
+        super().__init__(filename, every, energy_key, background=background,
+                         queue_size=queue_size, symbols=symbols)
+        self.dtype = dtype
+
+    def _open_writer(self, resume=None, box=None):
+        return BinaryTrajectoryWriter(self.filename, symbols=self.symbols, dtype=self.dtype,
+                                      resume=resume, box=box)
+
+
+class EnergyFileObserver(Observer):
+    """
+    Escribe el archivo de energías a medida que avanza la simulación
+    (`io_output.EnergyFileWriter`), una fila cada `every` pasos, en lugar de
+    volcar todo el historial al final.
+
+    keys: ("pe", "ke", "te") para Verlet, ("pe",) para dinámica browniana.
+    background: como en `XYZObserver`.
+    """
+
+    def __init__(self, filename, every=1, keys=("pe", "ke", "te"),
+                 background=False, queue_size=4096):
+        super().__init__(every)
+        self.filename = filename
+        self.keys = tuple(keys)
+        self.background = background
+        self.queue_size = queue_size
+        self.writer = None
+
+    def start(self, state, resume=None):
+        self.writer = EnergyFileWriter(self.filename, keys=self.keys, resume=resume)
+        if self.background:
+            self.writer = BackgroundWriter(self.writer, maxsize=self.queue_size)
+
+    def __call__(self, state):
+        self.writer.write_row(*[state[key] for key in self.keys])
+
+    def checkpoint(self):
+        return {"writer": self.writer.checkpoint()}
+
+    def restore(self, data, state):
+        self.start(state, resume=data["writer"])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class StatisticsObserver(Observer):
+    """
+    Estadística en línea (`online_stats.RunningStats`) de las distancias C-H
+    (las 6 juntas), C-C, ángulos H-C-H (los 6 juntos) y energías presentes en
+    el estado, sin guardar la serie. `stats` es un diccionario con las claves
+    "dist_CH", "dist_CC", "angles" y "pe"/"ke"/"te".
+
+    ranges: rangos de los histogramas por clave (por defecto
+            `online_stats.DEFAULT_RANGES`; una energía sin rango no lleva
+            histograma).
+    block: las muestras se acumulan en bloques de este tamaño y se
+           incorporan de una vez (una actualización vectorizada por bloque).
+    """
+
+    def __init__(self, every=1, ranges=None, bins=100, block=1024):
+        super().__init__(every)
+        self.ranges = dict(DEFAULT_RANGES, **(ranges or {}))
+        self.bins = bins
+        self.block = block
+        self.stats = None
+
+    def start(self, state):
+        self.energy_keys = [key for key in HistoryRecorder.ENERGY_KEYS if key in state]
+        keys = ["dist_CH", "dist_CC", "angles"] + self.energy_keys
+        self.stats = {key: RunningStats(self.bins, self.ranges.get(key)) for key in keys}
+        self._bonds = np.empty((self.block, 7))
+        self._angles = np.empty((self.block, 6))
+        self._energies = np.empty((self.block, len(self.energy_keys)))
+        self._pending = 0
+
+    def __call__(self, state):
+        i = self._pending
+        self._bonds[i] = state["geometry"]["bonds"]
+        self._angles[i] = state["geometry"]["angles"]
+        for j, key in enumerate(self.energy_keys):
+            self._energies[i, j] = state[key]
+        self._pending = i + 1
+        if self._pending == self.block:
+            self.flush()
+
+    def flush(self):
+        """Incorpora las muestras pendientes del bloque actual."""
+        n = self._pending
+        if n == 0:
+            return
+        # bonds = [C-C, C1-H x3, C2-H x3]
+        self.stats["dist_CC"].update(self._bonds[:n, 0])
+        self.stats["dist_CH"].update(self._bonds[:n, 1:])
+        self.stats["angles"].update(self._angles[:n])
+        for j, key in enumerate(self.energy_keys):
+            self.stats[key].update(self._energies[:n, j])
+        self._pending = 0
+
+    def finish(self, state):
+        self.flush()
+
+    def close(self):
+        if self.stats is not None:
+            self.flush()
+
+    def checkpoint(self):
+        self.flush()
+        return {"stats": self.stats, "energy_keys": self.energy_keys}
+
+    def restore(self, data, state):
+        self.start(state)
+        self.stats = data["stats"]
+        self.energy_keys = data["energy_keys"]
+
+
+def notify_start(observers, state):
+    for observer in observers:
+        observer.start(state)
+
+
+def notify_step(observers, state):
+    step = state["step"]
+    for observer in observers:
+        if step % observer.every == 0:
+            observer(state)
+
+
+def notify_finish(observers, state):
+    for observer in observers:
+        observer.finish(state)
+
+
+def notify_close(observers):
+    for observer in observers:
+        observer.close()
@@ -0,0 +1,116 @@
+"""
+Estadística en línea (streaming) de observables geométricos y energéticos.
+
+`analysis.analyze_final_state` solo mira el último frame y cualquier
+promedio sobre la trayectoria obligaba a guardar el historial completo. Aquí
+las medias, varianzas, mínimos, máximos e histogramas se actualizan sobre la
+marcha con memoria constante, así que sirven para promedios de millones de
+pasos (p. ej. dinámica browniana a 300 K) sin guardar la serie.
+
+La media y la varianza usan la actualización por bloques de Chan et al.
+(generalización de Welford): cada bloque de muestras se resume en
+(n, media, M2) y se combina con el acumulado, lo que es numéricamente
+estable y vectorizable. Dos `RunningStats` se combinan igual con merge().
+"""
+
+import numpy as np
+
+
+class RunningStats:
+    """
+    Media, varianza, mínimo, máximo e histograma de una magnitud escalar.
+
+    bins, range: histograma de `bins` intervalos iguales en [range[0], range[1]);
+                 las muestras fuera del rango se cuentan en `underflow` y
+                 `overflow`. Con range=None no se lleva histograma.
+    """
+
+    def __init__(self, bins=100, range=None):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.range = range
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64) if range is not None else None
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values):
+        """Agrega un bloque de muestras (cualquier forma; se aplanan)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = values.mean()
+        m2_b = np.sum((values - mean_b) ** 2)
+        self._combine(n_b, mean_b, m2_b)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        if self.counts is not None:
+            lo, hi = self.range
+            idx = np.floor((values - lo) * (self.bins / (hi - lo))).astype(np.int64)
+            below, above = idx < 0, idx >= self.bins
+            self.underflow += int(below.sum())
+            self.overflow += int(above.sum())
+            self.counts += np.bincount(idx[~(below | above)], minlength=self.bins)
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += m2_b + delta**2 * self.count * n_b / n
+        self.count = n
+
+    def merge(self, other):
+        """Incorpora las muestras resumidas en otro `RunningStats` (mismo histograma)."""
+        if other.count == 0:
+            return
+        self._combine(other.count, other.mean, other._m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.counts is not None:
+            if other.range != self.range or other.bins != self.bins:
+                raise ValueError("Los histogramas deben tener el mismo rango y número de bins")
+            self.counts += other.counts
+            self.underflow += other.underflow
+            self.overflow += other.overflow
+
+    @property
+    def variance(self):
+        """Varianza poblacional (ddof = 0, como `np.var`)."""
+        return self._m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def histogram(self, density=False):
+        """(conteos o densidad, bordes de los bins), como `np.histogram`."""
+        if self.counts is None:
+            raise ValueError("Este acumulador no lleva histograma (range=None)")
+        edges = np.linspace(self.range[0], self.range[1], self.bins + 1)
+        if density:
+            total = self.counts.sum()
+            return self.counts / (total * np.diff(edges)) if total else self.counts * 0.0, edges
+        return self.counts.copy(), edges
+
+
+# Rangos por defecto de los histogramas (Å y grados); las energías no tienen
+# una escala fija y por defecto solo llevan media/varianza/extremos.
+DEFAULT_RANGES = {
+    "dist_CH": (0.8, 1.4),
+    "dist_CC": (1.2, 1.9),
+    "angles": (90.0, 130.0),
+}
+
+LABELS = {
+    "dist_CH": ("Distancia C-H", "Å"),
+    "dist_CC": ("Distancia C-C", "Å"),
+    "angles": ("Ángulo H-C-H", "°"),
+    "pe": ("Energía potencial", "kcal/mol"),
+    "ke": ("Energía cinética", "kcal/mol"),
+    "te": ("Energía total", "kcal/mol"),
+}
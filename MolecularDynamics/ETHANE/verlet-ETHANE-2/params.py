@@ -28,3 +28,11 @@ damping = 0.3
 # veces mayor que la física real, lo que vuelve inestable al integrador
 # (la energía diverge en vez de minimizarse). Ver README para la derivación.
 ACCEL_CONV = 4.184e-4
+
+# Dinámica browniana (ver brownian.py). Aquí el paso de tiempo está en ps y el
+# desplazamiento sale directamente de la movilidad 1/(m*gamma), sin ACCEL_CONV.
+bd_dt = 0.001          # paso de tiempo [ps]
+bd_steps = 20000       # número de pasos de la simulación browniana
+temperature = 300.0    # temperatura [K]
+k_B = 0.0019872041     # constante de Boltzmann [kcal/mol/K]
+gamma = 100.0          # coeficiente de fricción [1/ps]
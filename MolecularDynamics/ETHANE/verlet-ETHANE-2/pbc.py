@@ -0,0 +1,79 @@
+"""
+Condiciones periódicas de contorno para sistemas de muchas moléculas.
+
+Con una sola molécula los bordes abiertos no importan, pero una caja de
+líquido (`liquid.py`) con bordes abiertos es una gota: los átomos de la
+superficie tienen la mitad de vecinos. `PeriodicBox` replica la caja en
+las tres direcciones:
+
+  - convención de imagen mínima: cada vector entre dos átomos se reduce a
+    su imagen más corta, r - L round(r / L), de una vez para todos los
+    pares (enlaces, ángulos, pares de Lennard-Jones),
+  - coordenadas envueltas: los átomos que salen por una cara vuelven a
+    entrar por la opuesta, y un contador entero de imágenes por átomo y
+    eje recuerda cuántas veces cruzaron, de modo que la trayectoria
+    continua (para el desplazamiento cuadrático medio) es
+    r + imágenes * L.
+
+Solo cajas ortorrómbicas (lados a lo largo de x, y, z). Una caja triclínica
+necesitaría la matriz de celda completa: las mismas operaciones pasan a
+coordenadas fraccionarias s = r h⁻¹, se redondean y se vuelve con s h; la
+interfaz (minimum_image, wrap, unwrap, lattice) no cambiaría.
+"""
+
+import numpy as np
+
+
+class PeriodicBox:
+    """
+    lengths: lados de la caja [Å], un número (caja cúbica) o tres. La caja
+             va de 0 a L en cada eje.
+    """
+
+    def __init__(self, lengths):
+        lengths = np.broadcast_to(np.asarray(lengths, dtype=np.float64), (3,))
+        if np.any(lengths <= 0):
+            raise ValueError(f"Los lados de la caja deben ser positivos: {lengths}")
+        self.lengths = lengths.copy()
+
+    def __repr__(self):
+        return f"PeriodicBox({self.lengths.tolist()})"
+
+    @property
+    def volume(self):
+        return float(np.prod(self.lengths))
+
+    @property
+    def matrix(self):
+        """Matriz de celda (filas = vectores de la celda), como en el XYZ extendido."""
+        return np.diag(self.lengths)
+
+    def minimum_image(self, r_vec):
+        """Imagen más corta de cada vector (cualquier forma (..., 3))."""
+        return r_vec - self.lengths * np.round(r_vec / self.lengths)
+
+    def wrap(self, positions, images=None):
+        """
+        Envuelve `positions` en la caja, en su lugar. Si se pasa `images`
+        (enteros, misma forma), le suma los cruces de cada átomo.
+        Devuelve los cruces de esta llamada.
+        """
+        shift = np.floor(positions / self.lengths)
+        positions -= shift * self.lengths
+        shift = shift.astype(np.int64)
+        if images is not None:
+            images += shift
+        return shift
+
+    def unwrap(self, positions, images):
+        """Posiciones continuas (sin envolver) a partir de las envueltas y sus imágenes."""
+        return positions + images * self.lengths
+
+    def lattice(self):
+        """Comentario de caja del formato XYZ extendido (OVITO, ASE, VMD)."""
+        cell = " ".join(f"{x:.6f}" for x in self.matrix.ravel())
+        return f'Lattice="{cell}" pbc="T T T"'
+
+    def key(self):
+        """Lo que determina el resultado (para la clave de `result_cache`)."""
+        return {"lengths": self.lengths}
@@ -0,0 +1,209 @@
+"""
+Intercambio de réplicas (parallel tempering) para la dinámica browniana
+del etano.
+
+K réplicas, una por temperatura, se integran a la vez como un solo arreglo
+(K, 8, 3), igual que en `ensemble.py`: los núcleos de `forces.py` y los
+integradores de Langevin de `integrators.py` aceptan la dimensión extra, y
+la temperatura entra como arreglo (K, 1, 1), así que un paso de las K
+réplicas cuesta las mismas pocas llamadas a NumPy que una sola molécula.
+
+Cada `exchange_every` pasos se intentan intercambios entre temperaturas
+vecinas (pares pares e impares alternados) con el criterio de Metropolis
+  P = min(1, exp[(1/kT_i - 1/kT_j) (U_i - U_j)]),
+con U = `compute_potential_energy` de cada configuración. Lo que se
+intercambia son las configuraciones (y sus fuerzas y, con BAOAB, sus
+velocidades reescaladas a la nueva temperatura); cada temperatura conserva
+su propio flujo de ruido. Las configuraciones de alta temperatura cruzan
+barreras y bajan por la escalera, lo que acelera la convergencia de las
+distribuciones a temperatura ambiente.
+"""
+
+import numpy as np
+
+from params import bd_dt, bd_steps, temperature, k_B
+from init import init_ensemble
+from forces import energy_and_forces, bond_and_angle_energy as compute_potential_energy
+from integrators import LANGEVIN_INTEGRATORS
+from brownian import MASSES
+from observers import notify_start, notify_step, notify_finish, notify_close
+
+
+def temperature_ladder(t_min=temperature, t_max=3 * temperature, n_replicas=8):
+    """Temperaturas en progresión geométrica (aceptación de intercambio ~uniforme)."""
+    return t_min * (t_max / t_min) ** (np.arange(n_replicas) / max(n_replicas - 1, 1))
+
+
+def run_replica_exchange(temperatures=None, seed=None, n_steps=bd_steps, dt=bd_dt,
+                         exchange_every=100, record_every=100, integrator="euler",
+                         rng=None, observers=()):
+    """
+    Dinámica browniana con intercambio de réplicas.
+
+    temperatures: K temperaturas en orden creciente [K]; por defecto
+                  `temperature_ladder()` a partir de la de params.py.
+    seed: semilla de las configuraciones iniciales (`init_ensemble`) y, si no
+          se pasa `rng`, del generador de ruido e intercambios.
+    exchange_every: pasos entre intentos de intercambio.
+    record_every: cada cuántos pasos se guarda un frame por temperatura.
+    integrator: "euler", "lm" o "baoab" (ver `integrators.py`).
+    observers: ver `observers.py`; el estado tiene "positions" (K, 8, 3),
+               "pe" (K,), "geometry" por réplica, "temperatures" y
+               "walkers" (qué réplica inicial está en cada temperatura).
+
+    Devuelve (final_pos, history):
+      final_pos: (K, 8, 3), la configuración final en cada temperatura.
+      history: diccionario con
+        "temperatures": (K,)
+        "steps": (n_frames,) pasos de los frames guardados
+        "positions": (n_frames, K, 8, 3) trayectoria de cada temperatura [Å]
+        "pe": (n_frames, K) energía potencial [kcal/mol]
+        "bonds", "angles": (n_frames, K, 7) y (n_frames, K, 6) como en
+                           `forces.energy_and_forces`
+        "walkers": (n_frames, K) réplica inicial en cada temperatura
+        "attempts", "accepted": (K - 1,) intentos y aceptaciones por par
+        "acceptance": (K - 1,) tasa de aceptación del par (T_k, T_k+1)
+    """
+    temperatures = np.asarray(temperature_ladder() if temperatures is None else temperatures,
+                              dtype=np.float64)
+    n_replicas = len(temperatures)
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    beta = 1.0 / (k_B * temperatures)
+
+    positions = init_ensemble(n_replicas, seed=seed)
+    integrator = LANGEVIN_INTEGRATORS[integrator](MASSES, dt, temperatures[:, None, None], rng)
+    pe, forces, geometry = energy_and_forces(positions)
+    walkers = np.arange(n_replicas)
+    attempts = np.zeros(n_replicas - 1, dtype=np.int64)
+    accepted = np.zeros(n_replicas - 1, dtype=np.int64)
+
+    n_frames = n_steps // record_every
+    history = {
+        "temperatures": temperatures,
+        "steps": np.arange(1, n_frames + 1) * record_every,
+        "positions": np.empty((n_frames, n_replicas) + positions.shape[1:]),
+        "pe": np.empty((n_frames, n_replicas)),
+        "bonds": np.empty((n_frames, n_replicas, geometry["bonds"].shape[-1])),
+        "angles": np.empty((n_frames, n_replicas, geometry["angles"].shape[-1])),
+        "walkers": np.empty((n_frames, n_replicas), dtype=np.int64),
+    }
+
+    everies = sorted({observer.every for observer in observers} | {record_every})
+    state = {"step": 0, "n_steps": n_steps, "positions": positions, "pe": pe,
+             "geometry": geometry, "temperatures": temperatures, "walkers": walkers}
+    try:
+        integrator.start(positions)
+        notify_start(observers, state)
+
+        for step in range(1, n_steps + 1):
+            observed = step == n_steps or any(step % every == 0 for every in everies)
+            positions, pe, forces, geometry = integrator.step(positions, forces, observed)
+
+            if step % exchange_every == 0:
+                # Lo que viaja con cada configuración; la energía se calcula
+                # aparte si este paso no la evaluó
+                arrays = [positions, forces, walkers]
+                if observed:
+                    arrays += [pe, geometry["bonds"], geometry["angles"]]
+                energies = pe if observed else compute_potential_energy(positions)
+                _attempt_exchanges((step // exchange_every) % 2, energies, arrays,
+                                   getattr(integrator, "velocities", None), beta,
+                                   temperatures, attempts, accepted, rng)
+
+            if observed:
+                state.update(step=step, positions=positions, pe=pe, geometry=geometry)
+                if step % record_every == 0:
+                    frame = step // record_every - 1
+                    history["positions"][frame] = positions
+                    history["pe"][frame] = pe
+                    history["bonds"][frame] = geometry["bonds"]
+                    history["angles"][frame] = geometry["angles"]
+                    history["walkers"][frame] = walkers
+                notify_step(observers, state)
+
+        notify_finish(observers, state)
+    finally:
+        notify_close(observers)
+
+    history["attempts"] = attempts
+    history["accepted"] = accepted
+    history["acceptance"] = accepted / np.maximum(attempts, 1)
+    return positions, history
+
+
+def _attempt_exchanges(parity, pe, arrays, velocities, beta, temperatures,
+                       attempts, accepted, rng):
+    """
+    Intentos de Metropolis sobre los pares (k, k+1) con k de la paridad dada.
+    Un intercambio aceptado permuta las filas k y k+1 de cada arreglo de
+    `arrays` (en su lugar) y reescala las velocidades, si las hay. Los
+    pares de una misma paridad son disjuntos, así que el orden no importa.
+    """
+    for k in range(parity, len(beta) - 1, 2):
+        attempts[k] += 1
+        delta = (beta[k] - beta[k + 1]) * (pe[k] - pe[k + 1])
+        if delta >= 0 or rng.random() < np.exp(delta):
+            accepted[k] += 1
+            pair, swapped = [k, k + 1], [k + 1, k]
+            for array in arrays:
+                array[pair] = array[swapped]
+            if velocities is not None:
+                # Velocidades reescaladas a la temperatura de destino
+                scale = np.sqrt(temperatures[pair] / temperatures[swapped])
+                velocities[pair] = velocities[swapped] * scale[:, None, None]
+
+
+def write_temperature_trajectories(history, prefix="ethane_rex"):
+    """Un archivo XYZ por temperatura: `<prefix>_<T>K.xyz`. Devuelve los nombres."""
+    from io_output import XYZTrajectoryWriter, ATOM_SYMBOLS
+
+    filenames = []
+    for k, temp in enumerate(history["temperatures"]):
+        filename = f"{prefix}_{temp:.0f}K.xyz"
+        with XYZTrajectoryWriter(filename, ATOM_SYMBOLS) as writer:
+            for frame, step in enumerate(history["steps"]):
+                writer.write_frame(history["positions"][frame, k], step,
+                                   history["pe"][frame, k], temp)
+        filenames.append(filename)
+    return filenames
+
+
+def print_replica_exchange_summary(history, equilibration=0.25):
+    """
+    Aceptación de intercambios y promedios por temperatura sobre los frames
+    posteriores a la fracción `equilibration` de la corrida.
+    """
+    temps = history["temperatures"]
+    start = int(equilibration * len(history["steps"]))
+    pe = history["pe"][start:]
+    dist_CH = history["bonds"][start:, :, 1:]
+    angles = history["angles"][start:]
+
+    print(f"\n=== INTERCAMBIO DE RÉPLICAS ({len(temps)} temperaturas) ===")
+    for k in range(len(temps) - 1):
+        print(f"{temps[k]:7.1f} K <-> {temps[k + 1]:7.1f} K: aceptación "
+              f"{history['acceptance'][k]:.3f} ({history['accepted'][k]}/{history['attempts'][k]})")
+    print(f"\n{'T [K]':>8} {'<U> [kcal/mol]':>15} {'C-H [Å]':>16} {'H-C-H [°]':>16}")
+    for k, temp in enumerate(temps):
+        print(f"{temp:8.1f} {pe[:, k].mean():15.4f} "
+              f"{dist_CH[:, k].mean():8.4f} ± {dist_CH[:, k].std():.4f} "
+              f"{angles[:, k].mean():8.2f} ± {angles[:, k].std():.2f}")
+
+
+if __name__ == "__main__":
+    from analysis import boltzmann_bond_check, print_boltzmann_check
+    from params import r_eq
+
+    final_pos, history = run_replica_exchange(seed=42, n_steps=20000, integrator="lm", dt=0.01,
+                                              record_every=10)
+    print_replica_exchange_summary(history)
+
+    print("\n=== C-H A CADA TEMPERATURA FRENTE A BOLTZMANN ===")
+    start = len(history["steps"]) // 4
+    for k, temp in enumerate(history["temperatures"]):
+        print_boltzmann_check(boltzmann_bond_check(history["bonds"][start:, k, 1:], r_eq,
+                                                   temperature=temp), f"{temp:6.1f} K")
+
+    filenames = write_temperature_trajectories(history)
+    print(f"\nTrayectorias por temperatura: {', '.join(filenames)}")
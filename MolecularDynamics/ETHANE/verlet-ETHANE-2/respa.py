@@ -0,0 +1,121 @@
+"""
+Integrador de pasos múltiples r-RESPA (Tuckerman, Berne y Martyna, 1992).
+
+El paso de Velocity Verlet está limitado por el término más rígido (los
+estiramientos de enlace, k_bond = 450), pero con el núcleo fusionado todos
+los términos se evalúan a ese ritmo, incluidos los más blandos y caros
+(las flexiones, que requieren arccos). RESPA separa las fuerzas en grupos
+por nivel de rapidez: cada nivel da `substeps` subpasos del nivel inferior
+por cada paso propio, y las fuerzas de un nivel solo se evalúan al ritmo de
+ese nivel. Con dos niveles y n subpasos:
+
+    v += (dt/2) F_lento / m
+    n veces:  v += (dt/2n) F_rápido / m;  x += (dt/n) v;  v += (dt/2n) F_rápido(x) / m
+    v += (dt/2) F_lento(x) / m
+
+Cada grupo se registra por separado como `ForceGroup` (nombre, núcleo,
+nivel); términos nuevos (torsiones, interacciones no enlazantes) se agregan
+como otro grupo del nivel que corresponda, sin tocar los demás. Los núcleos
+tienen la misma forma que `forces.energy_and_forces`:
+pos -> (energía, fuerzas, diccionario de geometría).
+"""
+
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+from params import k_bond, k_angle, dt, damping, ACCEL_CONV
+from forces import bond_terms, angle_terms
+
+# level 0 es el más rápido (se evalúa en cada subpaso interno)
+ForceGroup = namedtuple("ForceGroup", ["name", "kernel", "level"])
+
+
+def ethane_force_groups(k_bond=k_bond, k_angle=k_angle):
+    """Enlaces en el nivel rápido y ángulos H-C-H en el lento."""
+    return [
+        ForceGroup("bonds", partial(bond_terms, k_bond=k_bond), 0),
+        ForceGroup("angles", partial(angle_terms, k_angle=k_angle), 1),
+    ]
+
+
+class RespaIntegrator:
+    """
+    groups: lista de `ForceGroup`.
+    substeps: subpasos del nivel k dentro de un paso del nivel k+1, uno por
+              cada nivel salvo el más lento (un entero vale para dos niveles).
+    dt: paso externo (del nivel más lento) [fs].
+    damping: amortiguamiento -damping * v, aplicado en el nivel más rápido
+             como en `integrators.velocity_verlet_step`.
+
+    step(positions, velocities) avanza un paso externo en su lugar y devuelve
+    (energía, fuerzas, geometría) totales en las posiciones nuevas. Las
+    fuerzas de cada grupo se guardan de un paso al siguiente, así que cada
+    grupo se evalúa exactamente una vez por paso de su nivel;
+    `evaluations` cuenta las llamadas a cada núcleo.
+    """
+
+    def __init__(self, groups, substeps, masses, dt=dt, damping=damping):
+        self.groups = list(groups)
+        self.n_levels = max(group.level for group in self.groups) + 1
+        substeps = [substeps] if np.isscalar(substeps) else list(substeps)
+        if len(substeps) != self.n_levels - 1:
+            raise ValueError(f"Se esperaban {self.n_levels - 1} valores de substeps, "
+                             f"no {len(substeps)}")
+        self.substeps = substeps
+        self.dt = dt
+        self.damping = damping
+        self.inv_m = ACCEL_CONV / masses[..., None]
+        self.levels = [[i for i, group in enumerate(self.groups) if group.level == level]
+                       for level in range(self.n_levels)]
+        self.results = None
+        self.evaluations = {group.name: 0 for group in self.groups}
+
+    def _evaluate(self, level, positions):
+        for i in self.levels[level]:
+            group = self.groups[i]
+            self.results[i] = group.kernel(positions)
+            self.evaluations[group.name] += 1
+
+    def _level_forces(self, level):
+        forces = 0.0
+        for i in self.levels[level]:
+            forces = forces + self.results[i][1]
+        return forces
+
+    def start(self, positions):
+        """Evalúa todos los grupos en el estado inicial; devuelve los totales."""
+        self.results = [None] * len(self.groups)
+        for level in range(self.n_levels):
+            self._evaluate(level, positions)
+        return self.totals()
+
+    def totals(self):
+        pe = sum(result[0] for result in self.results)
+        forces = sum(result[1] for result in self.results)
+        geometry = {}
+        for result in self.results:
+            geometry.update(result[2])
+        return pe, forces, geometry
+
+    def _advance(self, level, h, positions, velocities):
+        if level == 0:
+            v0 = velocities.copy()
+            velocities += 0.5 * h * (self._level_forces(0) - self.damping * v0) * self.inv_m
+            positions += h * velocities
+            self._evaluate(0, positions)
+            velocities += 0.5 * h * (self._level_forces(0) - self.damping * v0) * self.inv_m
+            return
+        velocities += 0.5 * h * self._level_forces(level) * self.inv_m
+        n = self.substeps[level - 1]
+        for _ in range(n):
+            self._advance(level - 1, h / n, positions, velocities)
+        self._evaluate(level, positions)
+        velocities += 0.5 * h * self._level_forces(level) * self.inv_m
+
+    def step(self, positions, velocities):
+        if self.results is None:
+            self.start(positions)
+        self._advance(self.n_levels - 1, self.dt, positions, velocities)
+        return self.totals()
@@ -0,0 +1,195 @@
+"""
+Caché en disco de resultados de simulación, direccionada por contenido.
+
+La clave de cada resultado es un hash SHA-256 de todo lo que lo determina:
+el tipo de corrida, sus parámetros (incluidos los valores de params.py), el
+estado inicial (bytes de los arreglos) y la versión del código (hash de los
+fuentes .py de este directorio y la versión de NumPy). Cambiar cualquier
+cosa da otra clave, así que nunca se devuelve un resultado viejo.
+
+Cada entrada es un directorio `<clave>/` con `result.npz` (arreglos) y
+copias de los archivos de salida (XYZ, energías, trayectoria binaria). Se
+escribe en un directorio temporal y se renombra, de modo que una entrada a
+medio escribir nunca es visible. El tamaño total está acotado por
+`max_bytes`: al superarlo se borran las entradas usadas hace más tiempo
+(LRU, por la fecha de modificación, que se actualiza en cada acierto),
+nunca la que se acaba de guardar. Una entrada que sola ya supera
+`max_bytes` no se guarda.
+"""
+
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+
+import params
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DIRECTORY = os.environ.get(
+    "ETHANE_MD_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ethane_md"))
+
+_code_version = None
+
+
+def code_version():
+    """Hash de los fuentes del paquete y de la versión de NumPy (se calcula una vez)."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256(np.__version__.encode())
+        for path in sorted(glob.glob(os.path.join(PACKAGE_DIR, "*.py"))):
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def param_values():
+    """Valores numéricos de params.py (forman parte de la clave)."""
+    return {name: value for name, value in vars(params).items()
+            if not name.startswith("_") and isinstance(value, (int, float))}
+
+
+def _update_with(digest, value):
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest.update(f"{value.dtype.str}{value.shape}".encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            _update_with(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_with(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def cache_key(kind, inputs):
+    """Clave hexadecimal para una corrida de tipo `kind` con las entradas dadas."""
+    digest = hashlib.sha256(kind.encode())
+    _update_with(digest, {"inputs": inputs, "params": param_values(), "code": code_version()})
+    return digest.hexdigest()
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+class ResultCache:
+    """
+    directory: raíz de la caché (por defecto ~/.cache/ethane_md o la
+               variable de entorno ETHANE_MD_CACHE).
+    max_bytes: tamaño máximo total antes de desalojar entradas LRU.
+    """
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, files=None):
+        """
+        Devuelve el diccionario de arreglos guardado (o None si no está) y
+        copia los archivos de la entrada a los destinos de `files`
+        ({nombre en la caché: ruta de destino}).
+        """
+        entry = self._entry(key)
+        try:
+            with np.load(os.path.join(entry, "result.npz"), allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            for name, destination in (files or {}).items():
+                shutil.copyfile(os.path.join(entry, name), destination)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        os.utime(entry)
+        return arrays
+
+    def put(self, key, arrays, files=None):
+        """
+        Guarda los arreglos y copias de los archivos {nombre: ruta de origen}.
+        Si la entrada es más grande que max_bytes no se guarda (con un aviso).
+        """
+        entry = self._entry(key)
+        if os.path.isdir(entry):
+            os.utime(entry)
+            return
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            np.savez(os.path.join(tmp, "result.npz"), **arrays)
+            for name, source in (files or {}).items():
+                shutil.copyfile(source, os.path.join(tmp, name))
+            size = _directory_size(tmp)
+            if size > self.max_bytes:
+                shutil.rmtree(tmp, ignore_errors=True)
+                warnings.warn(f"Resultado de {size} bytes no guardado en la caché: "
+                              f"supera max_bytes = {self.max_bytes}")
+                return
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(entry):
+                raise
+        self.evict(keep=entry)
+
+    def entries(self):
+        """[(fecha de último uso, tamaño, ruta)] de las entradas, de la más antigua a la más nueva."""
+        result = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".tmp-") or not os.path.isdir(path):
+                continue
+            result.append((os.path.getmtime(path), _directory_size(path), path))
+        return sorted(result)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """
+        Borra entradas LRU hasta que el total quede por debajo de max_bytes,
+        salvo la entrada `keep` (ruta; la recién guardada en put()).
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def cached_simulation(cache, kind, inputs, outputs, compute):
+    """
+    Devuelve (posiciones finales, registros del historial) de la caché si la
+    corrida ya está; si no, llama a compute() -> (posiciones, registros) y
+    guarda el resultado.
+
+    outputs: {nombre en la caché: ruta del archivo de salida o None}; los
+             archivos pedidos forman parte de la clave y se restauran en un
+             acierto.
+    """
+    files = {name: path for name, path in outputs.items() if path is not None}
+    key = cache_key(kind, dict(inputs, outputs=sorted(files)))
+    hit = cache.get(key, files)
+    if hit is not None:
+        return hit["positions"], hit["records"]
+    positions, records = compute()
+    cache.put(key, {"positions": positions, "records": records}, files)
+    return positions, records
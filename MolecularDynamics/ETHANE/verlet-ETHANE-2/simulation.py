@@ -1,147 +1,221 @@
 """
-Simulación con Velocity Verlet y visualización en tiempo real:
-estructura 3D, distancias, energías y (nuevo) convergencia de ángulos H-C-H.
+Simulación con Velocity Verlet.
+
+`run` es el núcleo sin gráficos: integra y avisa a los observadores
+(historiales, XYZ, análisis, gráficos; ver `observers.py`). No importa
+matplotlib, así que sirve en nodos de cálculo sin pantalla.
+
+`run_simulation_with_visualization` mantiene la interfaz de siempre:
+arma los observadores habituales (historial, vista en vivo y XYZ) sobre
+`run`, con visualización en tiempo real de la estructura 3D, distancias,
+energías y convergencia de ángulos H-C-H.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
-from params import m_C, m_H, r_eq, r_CC_eq, theta_eq, dt, steps, ACCEL_CONV
+from params import m_C, m_H, steps, dt, damping, ACCEL_CONV
 from init import init_positions
-from forces import compute_forces, bond_and_angle_energy, hch_angles, H_C1, H_C2
-from io_output import init_xyz_file, write_xyz_frame, write_energy_file
+from forces import energy_and_forces
+from integrators import velocity_verlet_step, constrained_velocity_verlet_step
+from respa import RespaIntegrator
+from observers import (HistoryRecorder, history_from_records, XYZObserver,
+                       BinaryTrajectoryObserver, EnergyFileObserver, notify_start, notify_step, notify_finish,
+                       notify_close)
+from result_cache import cached_simulation
+from checkpoint import save_checkpoint, load_checkpoint, observer_states, restore_observers
+
+MASSES = np.array([m_C, m_C] + [m_H] * 6)
+
+
+def kinetic_energy(velocities, masses=MASSES):
+    # 0.5*m*v^2 con m en uma y v en Å/fs da un valor en unidades "reducidas";
+    # se divide por ACCEL_CONV para expresarlo en kcal/mol, consistente con pe.
+    return 0.5 * np.sum(masses[:, None] * velocities**2, axis=(-2, -1)) / ACCEL_CONV
+
+
+def run(positions=None, velocities=None, seed=None, n_steps=steps, observers=(),
+        checkpoint_filename=None, checkpoint_every=1000, resume_from=None,
+        kernel=energy_and_forces, dt=dt, damping=damping, constraints=None,
+        force_groups=None, respa_substeps=4, timestep=None, masses=MASSES, box=None):
+    """
+    Núcleo de integración sin gráficos.
+
+    positions / velocities: estado inicial; si se omiten, se usa
+        `init_positions(seed)` y velocidades nulas. Se modifican en el lugar.
+    observers: secuencia de observadores, llamados en orden (un observador que
+        lee los historiales de otro debe ir después de él).
+    checkpoint_filename: si se pasa, se escribe un checkpoint cada
+        `checkpoint_every` pasos (ver `checkpoint.py`).
+    resume_from: checkpoint desde el que continuar hasta `n_steps`; el
+        resultado es idéntico bit a bit al de la corrida sin interrumpir
+        (con los mismos observadores).
+    kernel, dt, damping: núcleo de fuerzas y parámetros del integrador (por
+        defecto los de params.py); ver `sweep.RunConfig`.
+    constraints: un `constraints.BondConstraints` (p. ej.
+        `BondConstraints.xh_bonds(MASSES)`) para integrar con RATTLE; el
+        estado inicial se proyecta sobre las restricciones y el estado de
+        los observadores incluye "constraint_iterations" (SHAKE, RATTLE).
+    force_groups: lista de `respa.ForceGroup` (p. ej.
+        `respa.ethane_force_groups()`) para integrar con r-RESPA en lugar
+        de `kernel`; `dt` es entonces el paso externo y `respa_substeps` los
+        subpasos de cada nivel (ver `respa.RespaIntegrator`).
+    timestep: un `timestep.AdaptiveTimeStep` para variar dt paso a paso (se
+        ignora `dt`); el estado incluye "time" y "dt", y el historial reciente
+        de dt y sus agregados quedan en el controlador. No se combina con RESPA.
+    masses: masas de los átomos (por defecto las del etano); otras para
+        sistemas de muchas moléculas (ver `liquid.py`) junto con su `kernel`.
+    box: una `pbc.PeriodicBox` para condiciones periódicas; el núcleo (y
+        las restricciones) deben usar la misma caja. Las posiciones se
+        envuelven en la caja después de cada paso y el estado incluye "box"
+        e "images" (cruces enteros por átomo y eje; las posiciones
+        continuas son `box.unwrap(positions, images)`).
+
+    Devuelve las posiciones finales.
+    """
+    first_step = 1
+    if resume_from is not None:
+        saved = load_checkpoint(resume_from, kind="verlet")
+        positions, velocities = saved["positions"], saved["velocities"]
+        first_step = saved["step"] + 1
+    if positions is None:
+        positions = init_positions(seed=seed)
+    if velocities is None:
+        velocities = np.zeros_like(positions)
+    images = None
+    if box is not None:
+        if resume_from is not None:
+            images = saved["images"]
+        else:
+            images = np.zeros(positions.shape, dtype=np.int64)
+            box.wrap(positions, images)
+    if constraints is not None and force_groups is not None:
+        raise ValueError("RESPA y las restricciones de enlace no se pueden combinar")
+    if timestep is not None and force_groups is not None:
+        raise ValueError("RESPA no admite paso de tiempo adaptativo")
+    if constraints is not None and resume_from is None:
+        constraints.project(positions, velocities)
+
+    if force_groups is not None:
+        respa = RespaIntegrator(force_groups, respa_substeps, masses, dt=dt, damping=damping)
+        pe, forces, geometry = respa.start(positions)
+    else:
+        pe, forces, geometry = kernel(positions)
+    ke = kinetic_energy(velocities, masses)
+    state = {"step": first_step - 1, "n_steps": n_steps, "positions": positions,
+             "velocities": velocities, "pe": pe, "ke": ke, "te": pe + ke, "geometry": geometry}
+    if box is not None:
+        state.update(box=box, images=images)
+
+    def verlet(step_dt):
+        if constraints is None:
+            return velocity_verlet_step(positions, velocities, forces, masses,
+                                        kernel=kernel, dt=step_dt, damping=damping)
+        result = constrained_velocity_verlet_step(positions, velocities, forces, masses,
+                                                  constraints, kernel=kernel, dt=step_dt,
+                                                  damping=damping)
+        state["constraint_iterations"] = constraints.last_iterations
+        return result
+
+    def attempt(step_dt):
+        pe, new_forces, geometry = verlet(step_dt)
+        return pe, new_forces, geometry, pe + kinetic_energy(velocities, masses)
+
+    try:
+        if resume_from is not None:
+            if timestep is not None:
+                timestep.restore(saved["timestep"])
+            restore_observers(observers, saved["observers"], state)
+        else:
+            notify_start(observers, state)
+
+        for step in range(first_step, n_steps + 1):
+            if force_groups is not None:
+                pe, forces, geometry = respa.step(positions, velocities)
+            elif timestep is not None:
+                pe, forces, geometry, _ = timestep.advance(step, attempt, positions, velocities,
+                                                           forces, state["te"], masses)
+                state.update(time=timestep.time, dt=timestep.last_dt)
+            else:
+                pe, forces, geometry = verlet(dt)
+            if box is not None:
+                box.wrap(positions, images)
+            ke = kinetic_energy(velocities, masses)
+            state.update(step=step, pe=pe, ke=ke, te=pe + ke, geometry=geometry)
+            notify_step(observers, state)
+            if checkpoint_filename is not None and step % checkpoint_every == 0:
+                save_checkpoint(checkpoint_filename, {
+                    "kind": "verlet", "step": step, "positions": positions,
+                    "velocities": velocities, "observers": observer_states(observers),
+                    "timestep": None if timestep is None else timestep.checkpoint(),
+                    "images": images})
+
+        notify_finish(observers, state)
+    finally:
+        notify_close(observers)
+    return positions
 
 
 def run_simulation_with_visualization(seed=None, plot_every=100,
                                        xyz_filename=None, energy_filename=None,
-                                       xyz_every=100):
+                                       xyz_every=100, show_plots=True, n_steps=steps,
+                                       trajectory_filename=None, background_io=False,
+                                       checkpoint_filename=None, checkpoint_every=1000,
+                                       resume_from=None, observers=(), cache=None,
+                                       dt=dt, constraints=None):
     """
     xyz_filename / energy_filename: si se pasan, se exportan la trayectoria en
     formato XYZ y el historial de energías a esos archivos (cada `xyz_every`
     pasos para el XYZ). Si se omiten, la simulación corre igual que antes,
     solo con la visualización en pantalla.
+    trajectory_filename: si se pasa, la trayectoria se guarda también en el
+    formato binario de `trajectory.py` (mismos frames que el XYZ).
+    background_io: con True los archivos se escriben desde hilos aparte
+    (`background_io.py`) y el integrador no espera al disco.
+    checkpoint_filename / checkpoint_every / resume_from: ver `run`; para
+    reanudar se llama con los mismos argumentos más `resume_from`, y los
+    archivos de salida continúan desde el punto del checkpoint.
+    observers: observadores adicionales (p. ej. `StatisticsObserver`), que se
+    agregan después de los habituales.
+    cache: un `result_cache.ResultCache`; si la misma corrida (parámetros,
+    estado inicial, archivos pedidos y versión del código) ya está en la
+    caché, se devuelve al instante y se restauran sus archivos de salida.
+    No se usa con observadores adicionales ni al reanudar un checkpoint.
+    show_plots: con False no se crea ninguna figura (ni se importa matplotlib).
+    dt / constraints: paso de tiempo y restricciones de enlace, ver `run`.
     """
-    positions = init_positions(seed=seed)
-    velocities = np.zeros_like(positions)
-    masses = np.array([m_C, m_C] + [m_H] * 6)
-
-    export_xyz = xyz_filename is not None
-    if export_xyz:
-        init_xyz_file(xyz_filename)
-        write_xyz_frame(xyz_filename, positions, 0)
-
-    plt.ion()
-    fig = plt.figure(figsize=(20, 6))
-
-    ax1 = fig.add_subplot(141, projection='3d')
-    ax2 = fig.add_subplot(142)
-    ax3 = fig.add_subplot(143)
-    ax4 = fig.add_subplot(144)
-
-    # Historiales
-    dist_CH_history = [[] for _ in range(6)]
-    dist_CC_history = []
-    pe_history, ke_history, te_history = [], [], []
-    angles_C1_history = []  # cada elemento: lista de 3 ángulos H-C-H de C1
-    angles_C2_history = []
-
-    for step in range(steps):
-        forces = compute_forces(positions, velocities)
-        accel = ACCEL_CONV * forces / masses[:, None]
-        positions += velocities * dt + 0.5 * accel * dt**2
-        new_forces = compute_forces(positions, velocities)
-        new_accel = ACCEL_CONV * new_forces / masses[:, None]
-        velocities += 0.5 * (accel + new_accel) * dt
-
-        pe = bond_and_angle_energy(positions)
-        # 0.5*m*v^2 con m en uma y v en Å/fs da un valor en unidades "reducidas";
-        # se divide por ACCEL_CONV para expresarlo en kcal/mol, consistente con pe.
-        ke = 0.5 * sum(m * np.sum(v**2) for m, v in zip(masses, velocities)) / ACCEL_CONV
-
-        for i in range(3):
-            dist_CH_history[i].append(np.linalg.norm(positions[i + 2] - positions[0]))
-        for i in range(3):
-            dist_CH_history[i + 3].append(np.linalg.norm(positions[i + 5] - positions[1]))
-
-        dist_CC_history.append(np.linalg.norm(positions[1] - positions[0]))
-        pe_history.append(pe)
-        ke_history.append(ke)
-        te_history.append(pe + ke)
-
-        angles_C1_history.append(hch_angles(positions, 0, H_C1))
-        angles_C2_history.append(hch_angles(positions, 1, H_C2))
-
-        if export_xyz and (step + 1) % xyz_every == 0:
-            write_xyz_frame(xyz_filename, positions, step + 1, te_history[-1])
-
-        if step % plot_every == 0:
-            ax1.cla(); ax2.cla(); ax3.cla(); ax4.cla()
-
-            # --- Estructura 3D ---
-            ax1.scatter(*positions[0], c='black', s=200, label='C1')
-            ax1.scatter(*positions[1], c='gray', s=200, label='C2')
-            ax1.scatter(*positions[2:5].T, c='red', s=100, label='H (C1)')
-            ax1.scatter(*positions[5:8].T, c='blue', s=100, label='H (C2)')
-            ax1.plot(*np.array([positions[0], positions[1]]).T, 'k-', linewidth=3, alpha=0.7)
-            for i in range(2, 5):
-                ax1.plot(*np.array([positions[0], positions[i]]).T, 'r-', alpha=0.5)
-            for i in range(5, 8):
-                ax1.plot(*np.array([positions[1], positions[i]]).T, 'b-', alpha=0.5)
-            ax1.set_title(f'Estructura del Etano (Paso {step})')
-            ax1.set_xlim(-3, 3); ax1.set_ylim(-3, 3); ax1.set_zlim(-3, 3)
-            ax1.legend()
-
-            # --- Distancias ---
-            for i in range(6):
-                if i < 3:
-                    ax2.plot(dist_CH_history[i], 'r-', alpha=0.7, label='C1-H' if i == 0 else "")
-                else:
-                    ax2.plot(dist_CH_history[i], 'b-', alpha=0.7, label='C2-H' if i == 3 else "")
-            ax2.plot(dist_CC_history, 'k-', label='C-C')
-            ax2.axhline(r_eq, color='r', linestyle='--', label='C-H eq')
-            ax2.axhline(r_CC_eq, color='b', linestyle='--', label='C-C eq')
-            ax2.set_title('Evolución de Distancias')
-            ax2.set_xlabel('Paso'); ax2.set_ylabel('Distancia (Å)')
-            ax2.legend(); ax2.grid(True)
-
-            # --- Energías ---
-            ax3.plot(pe_history, 'r-', label='Potencial')
-            ax3.plot(ke_history, 'b-', label='Cinética')
-            ax3.plot(te_history, 'k--', label='Total')
-            ax3.set_title('Energías del Sistema')
-            ax3.set_xlabel('Paso'); ax3.set_ylabel('Energía (kcal/mol)')
-            ax3.legend(); ax3.grid(True)
-
-            # --- Ángulos H-C-H (nuevo) ---
-            angles_C1_arr = np.array(angles_C1_history)  # (n_steps, 3)
-            angles_C2_arr = np.array(angles_C2_history)
-            for k in range(3):
-                ax4.plot(angles_C1_arr[:, k], 'r-', alpha=0.6, label='C1 H-C-H' if k == 0 else "")
-            for k in range(3):
-                ax4.plot(angles_C2_arr[:, k], 'b-', alpha=0.6, label='C2 H-C-H' if k == 0 else "")
-            ax4.axhline(theta_eq, color='k', linestyle='--', label='109.47° (ideal)')
-            ax4.set_title('Convergencia de Ángulos H-C-H')
-            ax4.set_xlabel('Paso'); ax4.set_ylabel('Ángulo (°)')
-            ax4.legend(); ax4.grid(True)
-
-            plt.tight_layout()
-            plt.draw()
-            plt.pause(0.001)
-
-    plt.ioff()
-
-    if export_xyz:
-        write_xyz_frame(xyz_filename, positions, steps, te_history[-1])
+    recorder = HistoryRecorder()
+    extra_observers, observers = observers, [recorder]
+    if show_plots:
+        from live_view import LivePlot
+        observers.append(LivePlot(recorder, every=plot_every))
+    if xyz_filename is not None:
+        observers.append(XYZObserver(xyz_filename, every=xyz_every, background=background_io))
+    if trajectory_filename is not None:
+        observers.append(BinaryTrajectoryObserver(trajectory_filename, every=xyz_every,
+                                                  background=background_io))
     if energy_filename is not None:
-        write_energy_file(energy_filename, pe_history, ke_history, te_history)
-
-    history = {
-        "dist_CH": dist_CH_history,
-        "dist_CC": dist_CC_history,
-        "pe": pe_history,
-        "ke": ke_history,
-        "te": te_history,
-        "angles_C1": angles_C1_history,
-        "angles_C2": angles_C2_history,
-    }
-    return positions, history
+        observers.append(EnergyFileObserver(energy_filename, background=background_io))
+    observers.extend(extra_observers)
+
+    initial = None
+    if cache is not None and not extra_observers and resume_from is None:
+        initial = init_positions(seed=seed)
+
+    def compute():
+        positions = run(positions=initial, seed=seed, n_steps=n_steps, observers=observers,
+                        checkpoint_filename=checkpoint_filename,
+                        checkpoint_every=checkpoint_every, resume_from=resume_from,
+                        dt=dt, constraints=constraints)
+        return positions, recorder.records
+
+    if initial is None:
+        positions, records = compute()
+    else:
+        positions, records = cached_simulation(
+            cache, "verlet",
+            {"positions": initial, "n_steps": n_steps, "xyz_every": xyz_every, "dt": dt,
+             "constraints": None if constraints is None else constraints.key()},
+            {"trajectory.xyz": xyz_filename, "energy.dat": energy_filename,
+             "trajectory.bin": trajectory_filename}, compute)
+
+    return positions, history_from_records(records)
@@ -0,0 +1,149 @@
+"""
+Espectros vibracionales a partir de trayectorias de velocidades.
+
+El espectro de potencia (densidad de estados vibracionales) es la
+transformada de Fourier de la función de autocorrelación de velocidades
+(VACF). Ambas se calculan con FFT sobre todos los canales a la vez
+(átomos × componentes), así que una sola llamada procesa muchos átomos y
+series largas:
+
+  1. VACF de cada canal por FFT con relleno de ceros (correlación lineal),
+  2. ventana (Hann por defecto) sobre los retardos, que suaviza el corte de
+     la VACF en `max_lag` y reduce las fugas espectrales,
+  3. transformada coseno de la VACF con relleno de ceros hasta
+     `pad_factor` veces su longitud (interpola el espectro; la resolución
+     real sigue siendo 1 / (max_lag * dt)),
+  4. picos: máximos locales con interpolación parabólica.
+
+Sirve para los scripts de CO2 (`leapfrog-CO2.py`, `verlet-CO.py`), CH4
+(`verlet-CH4.v2.py`) y el etano (velocidades guardadas o estimadas desde las
+posiciones con `trajectory_analysis.velocities_from_positions`). Las
+frecuencias salen en ciclos por unidad de tiempo de `dt`; con dt en fs,
+`FS_TO_CM1` las pasa a números de onda.
+"""
+
+import numpy as np
+
+# 1 / fs -> cm^-1 (dividir por la velocidad de la luz en cm/fs)
+FS_TO_CM1 = 1.0 / 2.99792458e-5
+
+WINDOWS = {
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+}
+
+
+def _lag_window(window, n):
+    """Mitad decreciente de la ventana simétrica de longitud 2n (w[0] = 1)."""
+    if window is None:
+        return np.ones(n)
+    return WINDOWS[window](2 * n + 1)[n:-1]
+
+
+def _autocorrelation_columns(x, max_lag, chunk):
+    """VACF sesgada (suma / N) de cada columna de x (N, C), por bloques de columnas."""
+    n = len(x)
+    size = 1 << (2 * n - 1).bit_length()
+    acf = np.empty((max_lag, x.shape[1]))
+    for c in range(0, x.shape[1], chunk):
+        spectrum = np.fft.rfft(np.asarray(x[:, c:c + chunk], dtype=np.float64), n=size, axis=0)
+        acf[:, c:c + chunk] = np.fft.irfft(spectrum.real**2 + spectrum.imag**2,
+                                           n=size, axis=0)[:max_lag] / n
+    return acf
+
+
+def power_spectrum(velocities, dt, max_lag=None, window="hann", pad_factor=4,
+                   masses=None, per_channel=False, remove_mean=True, chunk=64):
+    """
+    Espectro de potencia de una trayectoria de velocidades.
+
+    velocities: (n_frames, ...) — p. ej. (n_frames, n_atoms, 3) o, en los
+                modelos 1D de CO2, (n_frames, n_atoms). Cada serie después
+                del primer eje es un canal.
+    dt: tiempo entre frames.
+    max_lag: retardos de la VACF que se usan (por defecto n_frames // 2);
+             más corto = espectro más suave, más largo = más resolución.
+    window: "hann", "hamming", "blackman" o None.
+    pad_factor: relleno de ceros de la VACF antes de la FFT.
+    masses: (n_atoms,) para ponderar cada átomo por su masa (espectro de
+            energía cinética); por defecto todos los canales pesan igual.
+    per_channel: con True devuelve un espectro por canal, de forma
+                 (n_freq, ...) con los ejes de canal de `velocities`; si no,
+                 la suma sobre canales, (n_freq,).
+    remove_mean: resta la velocidad media de cada canal (deriva).
+
+    Devuelve (frecuencias, espectro).
+    """
+    velocities = np.asarray(velocities)
+    n = len(velocities)
+    channel_shape = velocities.shape[1:]
+    x = velocities.reshape(n, -1)
+    if remove_mean:
+        x = x - x.mean(axis=0)
+    max_lag = n // 2 if max_lag is None else min(max_lag, n)
+
+    acf = _autocorrelation_columns(x, max_lag, chunk)
+    acf *= _lag_window(window, max_lag)[:, None]
+
+    n_fft = 1 << (pad_factor * max_lag - 1).bit_length()
+    # Transformada coseno de la VACF extendida de forma par: 2 Re F[C] - C(0)
+    spectrum = (2 * np.fft.rfft(acf, n=n_fft, axis=0).real - acf[0]) * dt
+    spectrum = spectrum.reshape((-1,) + channel_shape)
+    freqs = np.fft.rfftfreq(n_fft, dt)
+
+    if masses is not None:
+        weights = np.asarray(masses, dtype=np.float64)
+        weights = weights.reshape(weights.shape + (1,) * (len(channel_shape) - 1))
+        spectrum = spectrum * weights
+    if not per_channel:
+        spectrum = spectrum.reshape(len(freqs), -1).sum(axis=1)
+    return freqs, spectrum
+
+
+def peak_frequencies(freqs, spectrum, n_peaks=3, min_rel_height=0.01):
+    """
+    Frecuencias de los `n_peaks` picos más altos de cada espectro.
+
+    spectrum: (n_freq,) o (n_freq, ...) como lo devuelve `power_spectrum`.
+    min_rel_height: se ignoran los máximos por debajo de esta fracción del
+                    máximo del espectro.
+
+    Devuelve (frecuencias, alturas) de forma (..., n_peaks), ordenadas de
+    mayor a menor altura y rellenas con NaN si hay menos picos.
+    """
+    spectrum = np.asarray(spectrum)
+    channel_shape = spectrum.shape[1:]
+    s = spectrum.reshape(len(freqs), -1)
+    df = freqs[1] - freqs[0]
+
+    left, mid, right = s[:-2], s[1:-1], s[2:]
+    is_peak = (mid > left) & (mid >= right) & (mid >= min_rel_height * s.max(axis=0))
+    # Vértice de la parábola por los tres puntos alrededor de cada máximo
+    denom = left - 2 * mid + right
+    shift = np.divide(0.5 * (left - right), denom, out=np.zeros_like(mid), where=denom != 0)
+    heights = np.where(is_peak, mid - 0.25 * (left - right) * shift, -np.inf)
+    positions = freqs[1:-1, None] + shift * df
+
+    order = np.argsort(-heights, axis=0)[:n_peaks]
+    top_heights = np.take_along_axis(heights, order, axis=0)
+    top_freqs = np.take_along_axis(positions, order, axis=0)
+    found = np.isfinite(top_heights)
+    top_freqs = np.where(found, top_freqs, np.nan).T
+    top_heights = np.where(found, top_heights, np.nan).T
+    if top_freqs.shape[-1] < n_peaks:
+        pad = n_peaks - top_freqs.shape[-1]
+        top_freqs = np.pad(top_freqs, ((0, 0), (0, pad)), constant_values=np.nan)
+        top_heights = np.pad(top_heights, ((0, 0), (0, pad)), constant_values=np.nan)
+    shape = channel_shape + (n_peaks,)
+    return top_freqs.reshape(shape), top_heights.reshape(shape)
+
+
+def vibrational_spectrum(velocities, dt, n_peaks=3, **kwargs):
+    """
+    Atajo: espectro total (o por canal con per_channel=True) y sus picos.
+    Devuelve (frecuencias, espectro, frecuencias de los picos).
+    """
+    freqs, spectrum = power_spectrum(velocities, dt, **kwargs)
+    peaks, _ = peak_frequencies(freqs, spectrum, n_peaks=n_peaks)
+    return freqs, spectrum, peaks
@@ -0,0 +1,156 @@
+"""
+Barridos de parámetros en paralelo para la minimización del etano.
+
+`params.py` guarda k_bond, k_angle, damping, dt y steps como globales de
+módulo, así que un proceso solo podía correr una parametrización. Aquí cada
+corrida lleva su propia configuración explícita (`RunConfig`), que se traduce
+en argumentos de `simulation.run` (núcleo con sus constantes de fuerza, dt,
+damping, número de pasos y semilla) sin tocar los globales. Las corridas se
+reparten en un pool de procesos y sus métricas finales (geometría, energía,
+estabilidad) se juntan en una tabla que se guarda como CSV y/o NPZ.
+
+Uso típico, para ajustar damping y dt:
+
+    configs = parameter_grid(damping=[0.1, 0.3, 1.0], dt=[0.001, 0.002], seed=[1, 2, 3])
+    table = run_sweep(configs, csv_filename="sweep.csv")
+"""
+
+import csv
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, fields, replace
+from functools import partial
+
+import numpy as np
+
+import params
+from init import init_positions
+from forces import energy_and_forces, BOND_R0
+from simulation import run, kinetic_energy
+from result_cache import cache_key
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Parámetros de una corrida; los omitidos toman el valor de params.py."""
+
+    k_bond: float = params.k_bond
+    k_angle: float = params.k_angle
+    damping: float = params.damping
+    dt: float = params.dt
+    steps: int = params.steps
+    seed: int = 0
+
+    def kernel(self):
+        return partial(energy_and_forces, k_bond=self.k_bond, k_angle=self.k_angle)
+
+
+def parameter_grid(base=RunConfig(), **values):
+    """
+    Producto cartesiano de listas de valores, p. ej.
+    parameter_grid(damping=[0.1, 0.3], dt=[0.001, 0.002], seed=range(4)).
+    Los campos no listados se toman de `base`.
+    """
+    names = list(values)
+    return [replace(base, **dict(zip(names, combo)))
+            for combo in itertools.product(*(values[name] for name in names))]
+
+
+# Columnas de métricas de cada corrida (después de los campos de RunConfig)
+METRICS = ("pe", "ke", "te", "max_force", "mean_CH", "mean_CC", "mean_angle_dev",
+           "rms_bond_dev", "stable", "wall_time")
+
+
+def run_one(config):
+    """
+    Corre una minimización con `config` (sin gráficos ni archivos) y devuelve
+    un diccionario con la configuración y las métricas del estado final.
+    `stable` es 1 si posiciones y energías quedaron finitas.
+    """
+    kernel = config.kernel()
+    t0 = time.perf_counter()
+    positions = init_positions(seed=config.seed)
+    velocities = np.zeros_like(positions)
+    with np.errstate(all="ignore"):
+        positions = run(positions=positions, velocities=velocities, n_steps=config.steps,
+                        kernel=kernel, dt=config.dt, damping=config.damping)
+        pe, forces, geometry = kernel(positions)
+        ke = kinetic_energy(velocities)
+    wall_time = time.perf_counter() - t0
+
+    bonds, angles = geometry["bonds"], geometry["angles"]
+    row = asdict(config)
+    row.update(
+        pe=pe, ke=ke, te=pe + ke,
+        max_force=np.sqrt((forces**2).sum(axis=-1)).max(),
+        mean_CH=bonds[1:].mean(), mean_CC=bonds[0],
+        mean_angle_dev=np.abs(angles - params.theta_eq).mean(),
+        rms_bond_dev=np.sqrt(((bonds - BOND_R0) ** 2).mean()),
+        stable=int(np.all(np.isfinite(positions)) and np.isfinite(pe + ke)),
+        wall_time=wall_time,
+    )
+    return row
+
+
+def run_sweep(configs, processes=None, csv_filename=None, npz_filename=None, cache=None):
+    """
+    Corre todas las configuraciones en un pool de `processes` procesos (por
+    defecto, uno por núcleo; con processes=1 corre en serie en este proceso)
+    y devuelve la tabla como arreglo estructurado de NumPy, una fila por
+    configuración y en el mismo orden.
+
+    cache: un `result_cache.ResultCache`; las configuraciones ya calculadas
+           (con el mismo código) se toman de ahí y solo se corren las demás.
+    """
+    configs = list(configs)
+    rows = [None] * len(configs)
+    keys = [None] * len(configs)
+    if cache is not None:
+        for i, config in enumerate(configs):
+            keys[i] = cache_key("sweep", asdict(config))
+            hit = cache.get(keys[i])
+            if hit is not None:
+                rows[i] = {name: value.item() for name, value in hit.items()}
+    pending = [i for i, row in enumerate(rows) if row is None]
+
+    if processes == 1 or len(pending) <= 1:
+        results = [run_one(configs[i]) for i in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(run_one, [configs[i] for i in pending]))
+    for i, row in zip(pending, results):
+        rows[i] = row
+        if cache is not None:
+            cache.put(keys[i], {name: np.asarray(value) for name, value in row.items()})
+
+    columns = [field.name for field in fields(RunConfig)] + list(METRICS)
+    dtype = [(name, np.int64 if name in ("steps", "seed", "stable") else np.float64)
+             for name in columns]
+    table = np.array([tuple(row[name] for name in columns) for row in rows], dtype=dtype)
+
+    if csv_filename is not None:
+        write_table_csv(csv_filename, table)
+    if npz_filename is not None:
+        np.savez(npz_filename, **{name: table[name] for name in table.dtype.names})
+    return table
+
+
+def write_table_csv(filename, table):
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(table.dtype.names)
+        writer.writerows(row.tolist() for row in table)
+
+
+if __name__ == "__main__":
+    configs = parameter_grid(damping=[0.1, 0.3, 1.0], dt=[0.001, 0.002, 0.005], seed=[1, 2],
+                             base=RunConfig(steps=2000))
+    print(f"Barrido de {len(configs)} configuraciones...")
+    table = run_sweep(configs, csv_filename="ethane_sweep.csv", npz_filename="ethane_sweep.npz")
+
+    print(f"{'damping':>8} {'dt':>7} {'seed':>4} {'E total':>10} {'|F| máx':>9} {'estable':>7}")
+    for row in table:
+        print(f"{row['damping']:8.3f} {row['dt']:7.4f} {row['seed']:4d} {row['te']:10.4f} "
+              f"{row['max_force']:9.4f} {row['stable']:7d}")
+    print("\nTabla completa: ethane_sweep.csv / ethane_sweep.npz")
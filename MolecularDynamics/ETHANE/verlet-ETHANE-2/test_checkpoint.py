@@ -0,0 +1,124 @@
+"""
+Verificación de la reanudación desde checkpoints (`checkpoint.py`): una
+corrida interrumpida y reanudada produce los mismos archivos de salida que
+la corrida sin interrumpir. Se corre con `python -m pytest test_checkpoint.py`
+desde este directorio.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from checkpoint import load_checkpoint
+from history import HistoryBuffer
+from observers import CallbackObserver, HistoryRecorder
+from simulation import run, run_simulation_with_visualization
+from timestep import AdaptiveTimeStep
+from trajectory import BinaryTrajectory, index_filename
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _interrupt_at(step):
+    def callback(state):
+        if state["step"] == step:
+            raise Interrupted
+    return CallbackObserver(callback)
+
+
+def _outputs(directory, name):
+    return {"xyz_filename": str(directory / f"{name}.xyz"),
+            "energy_filename": str(directory / f"{name}.dat"),
+            "trajectory_filename": str(directory / f"{name}.bin")}
+
+
+def _read(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("background_io", [False, True])
+def test_resume_with_binary_trajectory(tmp_path, background_io):
+    common = dict(seed=7, n_steps=300, xyz_every=20, show_plots=False,
+                  background_io=background_io)
+    reference = _outputs(tmp_path, "reference")
+    positions_ref, history_ref = run_simulation_with_visualization(**common, **reference)
+
+    # La excepción cierra los observadores (`finally` de `run`): el binario
+    # queda completo y sin índice auxiliar, y la reanudación debe recrearlo.
+    outputs = _outputs(tmp_path, "resumed")
+    checkpoint = str(tmp_path / "run.ckpt")
+    with pytest.raises(Interrupted):
+        run_simulation_with_visualization(**common, **outputs, checkpoint_filename=checkpoint,
+                                          checkpoint_every=100,
+                                          observers=[_interrupt_at(250)])
+    assert not os.path.exists(index_filename(outputs["trajectory_filename"]))
+    positions, history = run_simulation_with_visualization(
+        **common, **outputs, checkpoint_filename=checkpoint, checkpoint_every=100,
+        resume_from=checkpoint, observers=[CallbackObserver(lambda state: None)])
+
+    assert np.array_equal(positions, positions_ref)
+    assert np.array_equal(history["te"], history_ref["te"])
+    for key in outputs:
+        assert _read(outputs[key]) == _read(reference[key]), key
+    traj = BinaryTrajectory(outputs["trajectory_filename"])
+    assert traj.complete and list(traj.steps) == list(range(0, 301, 20))
+    assert not os.path.exists(index_filename(outputs["trajectory_filename"]))
+
+
+@pytest.mark.parametrize("ring, capacity, n_records", [(False, 8, 5), (False, 8, 21),
+                                                       (True, 8, 5), (True, 8, 21)])
+def test_history_buffer_checkpoint(ring, capacity, n_records):
+    buffer = HistoryBuffer([("step", np.int64), ("x", np.float64, (2,))], capacity, ring=ring)
+    for i in range(n_records):
+        buffer.append((i, (i, -i)))
+    data = buffer.checkpoint()
+    assert len(data["records"]) == len(buffer)
+    restored = HistoryBuffer.from_checkpoint(pickle.loads(pickle.dumps(data)))
+    for i in range(n_records, n_records + 13):
+        buffer.append((i, (i, -i)))
+        restored.append((i, (i, -i)))
+    assert restored.count == buffer.count
+    assert np.array_equal(restored.view(), buffer.view())
+
+
+def test_history_checkpoint_stores_only_filled_records():
+    # n_steps reserva 10^5 registros (~14 MB); el checkpoint solo lleva los escritos
+    recorder = HistoryRecorder()
+    sizes = []
+    measure = CallbackObserver(lambda state: sizes.append(len(pickle.dumps(recorder.checkpoint()))),
+                               every=10)
+    with pytest.raises(Interrupted):
+        run(n_steps=10**5, seed=0, observers=[recorder, measure, _interrupt_at(30)])
+    assert len(sizes) == 3
+    assert sizes[-1] < 10000
+
+
+def test_resume_adaptive_time_step(tmp_path):
+    reference = AdaptiveTimeStep(history_capacity=64)
+    positions_ref = run(seed=3, n_steps=400, timestep=reference)
+
+    checkpoint = str(tmp_path / "run.ckpt")
+    with pytest.raises(Interrupted):
+        run(seed=3, n_steps=400, timestep=AdaptiveTimeStep(history_capacity=64),
+            checkpoint_filename=checkpoint, checkpoint_every=100,
+            observers=[_interrupt_at(250)])
+    # Memoria acotada: el checkpoint lleva a lo sumo history_capacity pasos
+    saved = load_checkpoint(checkpoint)["timestep"]
+    assert len(saved["accepted"]["records"]) == 64
+    controller = AdaptiveTimeStep(history_capacity=64)
+    positions = run(seed=3, n_steps=400, timestep=controller, resume_from=checkpoint,
+                    checkpoint_filename=checkpoint, checkpoint_every=100,
+                    observers=[CallbackObserver(lambda state: None)])
+
+    assert np.array_equal(positions, positions_ref)
+    assert controller.time == reference.time
+    assert controller.stats() == reference.stats()
+    history, history_ref = controller.history(), reference.history()
+    for key in history:
+        assert np.array_equal(history[key], history_ref[key]), key
+    assert list(history["step"]) == list(range(337, 401))
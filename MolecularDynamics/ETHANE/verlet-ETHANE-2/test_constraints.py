@@ -0,0 +1,68 @@
+"""
+Verificación de SHAKE/RATTLE (`constraints.py`): las longitudes de los
+enlaces restringidos y las velocidades a lo largo de ellos se mantienen
+dentro de la tolerancia durante toda la dinámica. Se corre con
+`python -m pytest test_constraints.py` desde este directorio.
+"""
+
+import numpy as np
+
+from constraints import BondConstraints
+from init import init_positions
+from liquid import ethane_lattice, liquid_kernel
+from observers import CallbackObserver
+from pbc import PeriodicBox
+from simulation import run, MASSES
+
+
+def _check_every_step(constraints):
+    """Observador que verifica posiciones y velocidades restringidas en cada paso."""
+    checked = []
+
+    def check(state):
+        positions, velocities = state["positions"], state["velocities"]
+        assert constraints.max_violation(positions) < 1e-8
+        r = constraints._bond_vectors(positions)
+        rv = (r * constraints._vectors(velocities)).sum(axis=-1)
+        assert np.abs(rv).max() < 1e-8 * constraints.d2.min()
+        checked.append(state["step"])
+
+    return CallbackObserver(check, every=1), checked
+
+
+def test_xh_bonds_held_during_dynamics():
+    constraints = BondConstraints.xh_bonds(MASSES)
+    assert len(constraints.pairs) == 6
+    observer, checked = _check_every_step(constraints)
+    run(positions=init_positions(seed=3), n_steps=500, dt=2.0, damping=0.0,
+        constraints=constraints, observers=[observer])
+    assert len(checked) == 500
+    assert constraints.calls == 500
+
+
+def test_project_initial_state():
+    constraints = BondConstraints.xh_bonds(MASSES)
+    positions = init_positions(seed=1, sigma=0.2)
+    velocities = np.random.default_rng(0).normal(0.0, 0.01, size=positions.shape)
+    assert constraints.max_violation(positions) > 1e-3
+    constraints.project(positions, velocities)
+    assert constraints.max_violation(positions) < 1e-8
+    r = constraints._bond_vectors(positions)
+    assert np.abs((r * constraints._vectors(velocities)).sum(axis=-1)).max() < 1e-8
+
+
+def test_periodic_box():
+    system = ethane_lattice(3, seed=0)
+    box = PeriodicBox(system["box"])
+    kernel, _ = liquid_kernel(system, cutoff=5.0, box=box)
+    constraints = BondConstraints.xh_bonds(system["masses"], bonds=system["bonds"],
+                                           lengths=system["bond_r0"], box=box)
+    # Medio paso de red (box / 3) lleva centros de molécula a las caras:
+    # hay enlaces que cruzan el borde
+    positions = system["positions"] + 0.5 * system["box"] / 3
+    box.wrap(positions)
+    assert np.abs(constraints._vectors(positions)).max() > 0.5 * system["box"]
+    observer, checked = _check_every_step(constraints)
+    run(positions=positions, n_steps=100, dt=2.0, damping=0.0, kernel=kernel,
+        masses=system["masses"], box=box, constraints=constraints, observers=[observer])
+    assert len(checked) == 100
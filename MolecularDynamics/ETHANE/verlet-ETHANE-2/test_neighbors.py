@@ -0,0 +1,86 @@
+"""
+Verificación de la búsqueda de vecinos por celdas (`neighbors.py`) y del
+Lennard-Jones que la usa (`nonbonded.py`). Se corre con
+`python -m pytest test_neighbors.py` desde este directorio.
+"""
+
+import numpy as np
+
+from liquid import ethane_lattice
+from neighbors import NeighborList, brute_force_pairs, cell_list_pairs
+from nonbonded import LennardJones
+from pbc import PeriodicBox
+
+
+def _pair_set(pairs):
+    assert np.all(pairs[:, 0] < pairs[:, 1])
+    result = set(map(tuple, pairs.tolist()))
+    assert len(result) == len(pairs), "pares repetidos"
+    return result
+
+
+def test_cell_list_matches_brute_force_open():
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0.0, 20.0, size=(500, 3))
+    for cutoff in (1.5, 3.0, 7.0, 30.0):
+        assert _pair_set(cell_list_pairs(positions, cutoff)) == _pair_set(
+            brute_force_pairs(positions, cutoff))
+
+
+def test_cell_list_matches_brute_force_periodic():
+    rng = np.random.default_rng(1)
+    box = PeriodicBox([12.0, 15.0, 20.0])
+    # Átomos pegados a las caras para que haya pares a través de ellas
+    positions = rng.uniform(0.0, 1.0, size=(600, 3)) * box.lengths
+    positions[:50] = np.where(positions[:50] < 0.5 * box.lengths, 1e-3, box.lengths - 1e-3)
+    for cutoff in (2.0, 3.9, 5.9):
+        pairs = cell_list_pairs(positions, cutoff, box)
+        assert _pair_set(pairs) == _pair_set(brute_force_pairs(positions, cutoff, box))
+
+
+def test_empty_and_single_atom():
+    for box in (None, PeriodicBox(10.0)):
+        for n_atoms in (0, 1):
+            pairs = cell_list_pairs(np.zeros((n_atoms, 3)), 3.0, box)
+            assert pairs.shape == (0, 2)
+        neighbors = NeighborList(3.0, box=box)
+        assert neighbors.update(np.empty((0, 3))).shape == (0, 2)
+
+
+def _lennard_jones(box=None):
+    system = ethane_lattice(3, spacing=4.5, seed=2)
+    rng = np.random.default_rng(3)
+    positions = system["positions"] + rng.normal(0.0, 0.1, size=system["positions"].shape)
+    if box is not None:
+        box.wrap(positions)
+    # skin = 0: cada evaluación reconstruye la lista con las posiciones dadas
+    neighbors = NeighborList(6.0, skin=0.0, exclude=system["molecule"], box=box)
+    return positions, LennardJones(system["symbols"], neighbors)
+
+
+def _check_finite_differences(positions, lj):
+    _, forces, _ = lj(positions)
+    rng = np.random.default_rng(4)
+    h = 1e-6
+    for atom in rng.choice(len(positions), 8, replace=False):
+        for axis in range(3):
+            shifted = positions.copy()
+            shifted[atom, axis] += h
+            e_plus = lj(shifted)[0]
+            shifted[atom, axis] -= 2 * h
+            e_minus = lj(shifted)[0]
+            assert abs(-(e_plus - e_minus) / (2 * h) - forces[atom, axis]) < 1e-5
+
+
+def test_lennard_jones_forces_open():
+    _check_finite_differences(*_lennard_jones())
+
+
+def test_lennard_jones_forces_periodic():
+    _check_finite_differences(*_lennard_jones(PeriodicBox(13.5)))
+
+
+def test_lennard_jones_newton_third_law():
+    positions, lj = _lennard_jones(PeriodicBox(13.5))
+    _, forces, _ = lj(positions)
+    assert np.abs(forces.sum(axis=0)).max() < 1e-10
@@ -0,0 +1,52 @@
+"""
+Verificación de los acumuladores en línea (`online_stats.py`) contra los
+resultados de NumPy sobre la serie completa. Se corre con
+`python -m pytest test_online_stats.py` desde este directorio.
+"""
+
+import numpy as np
+
+from online_stats import RunningStats
+
+
+def _series():
+    # Media grande frente a la dispersión: el caso donde la fórmula ingenua
+    # E[x²] - E[x]² pierde precisión y la de Chan/Welford no
+    rng = np.random.default_rng(0)
+    return 1e6 + rng.normal(0.0, 0.5, size=20000)
+
+
+def test_blocks_match_numpy():
+    values = _series()
+    stats = RunningStats(bins=50, range=(1e6 - 2.0, 1e6 + 2.0))
+    for block in np.array_split(values, [1, 7, 500, 501, 12000]):
+        stats.update(block)
+    assert stats.count == len(values)
+    assert abs(stats.mean - values.mean()) < 1e-9
+    assert abs(stats.variance - values.var()) < 1e-9 * values.var()
+    assert stats.min == values.min() and stats.max == values.max()
+    counts, edges = np.histogram(values, bins=50, range=stats.range)
+    assert np.array_equal(stats.histogram()[0], counts)
+    assert stats.underflow + stats.overflow + counts.sum() == len(values)
+
+
+def test_merge_matches_single_pass():
+    values = _series()
+    parts = np.array_split(values, [3000, 3001, 15000])
+    merged = RunningStats(range=None)
+    for part in parts:
+        partial = RunningStats(range=None)
+        for block in np.array_split(part, 4):
+            partial.update(block)
+        merged.merge(partial)
+    merged.merge(RunningStats(range=None))
+    assert merged.count == len(values)
+    assert abs(merged.mean - values.mean()) < 1e-9
+    assert abs(merged.variance - values.var()) < 1e-9 * values.var()
+    assert merged.min == values.min() and merged.max == values.max()
+
+
+def test_empty():
+    stats = RunningStats(range=None)
+    stats.update([])
+    assert stats.count == 0 and np.isnan(stats.variance)
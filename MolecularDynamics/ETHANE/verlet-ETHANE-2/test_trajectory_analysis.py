@@ -0,0 +1,74 @@
+"""
+Verificación de las correlaciones por FFT de `trajectory_analysis.py`
+contra la suma directa O(N²) sobre todos los orígenes. Se corre con
+`python -m pytest test_trajectory_analysis.py` desde este directorio.
+"""
+
+import numpy as np
+
+from pbc import PeriodicBox
+from trajectory_analysis import autocorrelation, mean_squared_displacement, unwrap_positions
+
+
+def _random_walk(n_frames=300, n_atoms=11):
+    rng = np.random.default_rng(0)
+    return np.cumsum(rng.normal(0.0, 0.2, size=(n_frames, n_atoms, 3)), axis=0)
+
+
+def _direct_msd(positions, max_lag):
+    n = len(positions)
+    return np.array([((positions[k:] - positions[:n - k])**2).sum(axis=-1).mean(axis=0)
+                     for k in range(max_lag)])
+
+
+def test_msd_matches_direct_sum():
+    positions = _random_walk()
+    # chunk=4 no divide a los 11 átomos: prueba también el último bloque
+    lags, msd = mean_squared_displacement(positions, max_lag=200, per_atom=True,
+                                          dt_frame=0.5, chunk=4)
+    reference = _direct_msd(positions, 200)
+    assert np.allclose(lags, 0.5 * np.arange(200))
+    assert np.abs(msd - reference).max() < 1e-9 * reference.max()
+    _, msd_mean = mean_squared_displacement(positions, max_lag=200)
+    assert np.allclose(msd_mean, reference.mean(axis=1), rtol=1e-9, atol=1e-12)
+
+
+def test_autocorrelation_matches_direct_sum():
+    x = _random_walk(n_frames=150, n_atoms=5)
+    n = len(x)
+    _, corr = autocorrelation(x, normalize=False, subtract_mean=True, per_atom=True)
+    fluct = x - x.mean(axis=0)
+    reference = np.array([(fluct[k:] * fluct[:n - k]).sum(axis=-1).mean(axis=0)
+                          for k in range(n)])
+    assert np.abs(corr - reference).max() < 1e-9 * np.abs(reference).max()
+    _, normalized = autocorrelation(x, subtract_mean=True)
+    assert normalized[0] == 1.0
+
+
+def _wrapped_walk(box, n_frames=300, n_atoms=11):
+    positions = _random_walk(n_frames, n_atoms)
+    wrapped = positions.copy()
+    images = box.wrap(wrapped).astype(np.int32)
+    return positions, wrapped, images
+
+
+def test_unwrap_in_blocks():
+    box = PeriodicBox([3.0, 4.0, 5.0])
+    positions, wrapped, images = _wrapped_walk(box)
+    assert images.any()
+    # Bloques que no dividen a los 300 frames, de un frame y más grandes que todo
+    for frames in (1, 7, 128, 1000):
+        assert np.allclose(unwrap_positions(wrapped, box, images, frames=frames), positions)
+        # Sin imágenes, la imagen mínima enlaza los bloques; parte de wrapped[0]
+        unwrapped = unwrap_positions(wrapped, box, frames=frames)
+        assert np.allclose(unwrapped, positions - positions[0] + wrapped[0])
+
+
+def test_msd_with_box_matches_unwrapped():
+    box = PeriodicBox(4.0)
+    positions, wrapped, images = _wrapped_walk(box)
+    reference = _direct_msd(positions, 100)
+    for kwargs in ({"images": images}, {}):
+        _, msd = mean_squared_displacement(wrapped, max_lag=100, per_atom=True, chunk=4,
+                                           box=box, **kwargs)
+        assert np.abs(msd - reference).max() < 1e-9 * reference.max()
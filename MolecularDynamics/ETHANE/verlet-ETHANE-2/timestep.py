@@ -0,0 +1,180 @@
+"""
+Control adaptativo del paso de tiempo para Velocity Verlet.
+
+Con un dt fijo hay que elegirlo para el peor momento de la corrida (los
+primeros pasos desde una geometría perturbada, con fuerzas grandes), y ese
+dt es inútilmente pequeño para el resto de la relajación. `AdaptiveTimeStep`
+vigila cada paso:
+
+  - fuerzas: antes del paso, dt se limita para que ningún átomo se
+    desplace más de `max_displacement` según su velocidad y aceleración
+    actuales (|v| dt + |a| dt²/2),
+  - desplazamiento: después del paso, el máximo desplazamiento real,
+  - energía: el aumento de la energía total en el paso (con
+    amortiguamiento la energía solo puede bajar, y sin él un aumento
+    sostenido es la señal típica de inestabilidad), y que todo sea finito.
+
+Un paso que viola alguna tolerancia se descarta (se restauran posiciones
+y velocidades) y se reintenta con dt * `shrink`; mientras los pasos son
+tranquilos (errores por debajo de `quiet` veces la tolerancia) dt crece por
+`grow` hasta `dt_max`. Los dt de los últimos `history_capacity` pasos
+aceptados y rechazos quedan en buffers anillo (`history.HistoryBuffer`) para
+inspección (`history()`), y los agregados de toda la corrida (pasos, dt
+mínimo, máximo y medio, rechazos) en `stats()`; así la memoria y el tamaño
+de los checkpoints no crecen con la longitud de la corrida.
+"""
+
+import numpy as np
+
+from params import dt, ACCEL_CONV
+from history import HistoryBuffer
+
+_ACCEPTED_DTYPE = [("step", np.int64), ("dt", np.float64), ("time", np.float64)]
+_REJECTED_DTYPE = [("step", np.int64), ("dt", np.float64)]
+
+
+class TimeStepError(RuntimeError):
+    """Un paso no cumple las tolerancias ni con dt_min."""
+
+
+class AdaptiveTimeStep:
+    """
+    dt: paso inicial [fs]; dt_min / dt_max: límites (por defecto dt/1000 y
+        sin límite superior).
+    max_displacement: desplazamiento máximo de un átomo por paso [Å].
+    energy_tol: aumento máximo de la energía total por paso [kcal/mol].
+    grow / shrink: factores de crecimiento (paso tranquilo) y reducción
+        (paso rechazado).
+    quiet: fracción de las tolerancias por debajo de la cual dt crece.
+    history_capacity: pasos aceptados (y rechazos) recientes que se guardan.
+    """
+
+    def __init__(self, dt=dt, dt_min=None, dt_max=np.inf, max_displacement=0.02,
+                 energy_tol=1e-2, grow=1.2, shrink=0.5, quiet=0.25, history_capacity=4096):
+        self.dt = dt
+        self.dt_min = dt / 1000 if dt_min is None else dt_min
+        self.dt_max = dt_max
+        self.max_displacement = max_displacement
+        self.energy_tol = energy_tol
+        self.grow = grow
+        self.shrink = shrink
+        self.quiet = quiet
+        self.time = 0.0
+        self.last_dt = None
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.smallest_dt = np.inf
+        self.largest_dt = 0.0
+        self.accepted = HistoryBuffer(_ACCEPTED_DTYPE, history_capacity, ring=True)
+        self.rejected = HistoryBuffer(_REJECTED_DTYPE, history_capacity, ring=True)
+
+    def force_limit(self, forces, velocities, masses):
+        """Mayor dt con |v| dt + |a| dt²/2 <= max_displacement para todos los átomos."""
+        speed = np.sqrt((velocities**2).sum(axis=-1))
+        accel = np.sqrt((forces**2).sum(axis=-1)) * ACCEL_CONV / masses
+        d = self.max_displacement
+        # Raíz positiva de a/2 h² + v h - d = 0, escrita sin cancelación
+        limit = 2 * d / (speed + np.sqrt(speed**2 + 2 * accel * d))
+        return limit.min()
+
+    def advance(self, step, integrate, positions, velocities, forces, te, masses):
+        """
+        Da un paso aceptado. `integrate(h)` debe avanzar `positions` y
+        `velocities` en su lugar con paso h y devolver (energía potencial,
+        fuerzas, geometría, energía total); `te` es la energía total antes
+        del paso. Devuelve lo que devolvió el intento aceptado.
+        """
+        saved_positions = positions.copy()
+        saved_velocities = velocities.copy()
+        h = max(min(self.dt, self.force_limit(forces, velocities, masses)), self.dt_min)
+        while True:
+            with np.errstate(all="ignore"):
+                result = integrate(h)
+                displacement = np.sqrt(((positions - saved_positions) ** 2).sum(axis=-1)).max()
+                energy_error = result[3] - te
+            ok = (np.isfinite(result[3]) and displacement <= self.max_displacement
+                  and energy_error <= self.energy_tol)
+            if ok:
+                break
+            if h <= self.dt_min:
+                raise TimeStepError(f"Paso {step}: sin estabilidad ni con dt = {h:.3g} "
+                                    f"(desplazamiento {displacement:.3g} Å, "
+                                    f"aumento de energía {energy_error:.3g} kcal/mol)")
+            self.rejected.append((step, h))
+            self.n_rejected += 1
+            positions[...] = saved_positions
+            velocities[...] = saved_velocities
+            h = max(h * self.shrink, self.dt_min)
+
+        self.time += h
+        self.last_dt = h
+        self.n_accepted += 1
+        self.smallest_dt = min(self.smallest_dt, h)
+        self.largest_dt = max(self.largest_dt, h)
+        self.accepted.append((step, h, self.time))
+        quiet = (displacement < self.quiet * self.max_displacement
+                 and energy_error < self.quiet * self.energy_tol)
+        self.dt = min(h * self.grow, self.dt_max) if quiet else h
+        return result
+
+    def history(self):
+        """
+        {"step", "dt", "time"} de los últimos pasos aceptados (time es el
+        tiempo al final del paso) y {"rejected_step", "rejected_dt"} de los
+        últimos rechazos, hasta `history_capacity` de cada uno.
+        """
+        accepted, rejected = self.accepted.view(), self.rejected.view()
+        return {"step": accepted["step"], "dt": accepted["dt"], "time": accepted["time"],
+                "rejected_step": rejected["step"], "rejected_dt": rejected["dt"]}
+
+    def stats(self):
+        """Agregados de toda la corrida: pasos aceptados y rechazados, dt mínimo, máximo y medio."""
+        return {"accepted": self.n_accepted, "rejected": self.n_rejected,
+                "dt_min": self.smallest_dt, "dt_max": self.largest_dt,
+                "dt_mean": self.time / self.n_accepted if self.n_accepted else np.nan}
+
+    def checkpoint(self):
+        return {"dt": self.dt, "time": self.time, "last_dt": self.last_dt,
+                "n_accepted": self.n_accepted, "n_rejected": self.n_rejected,
+                "smallest_dt": self.smallest_dt, "largest_dt": self.largest_dt,
+                "accepted": self.accepted.checkpoint(), "rejected": self.rejected.checkpoint()}
+
+    def restore(self, data):
+        self.dt = data["dt"]
+        self.time = data["time"]
+        self.last_dt = data["last_dt"]
+        self.n_accepted = data["n_accepted"]
+        self.n_rejected = data["n_rejected"]
+        self.smallest_dt = data["smallest_dt"]
+        self.largest_dt = data["largest_dt"]
+        self.accepted = HistoryBuffer.from_checkpoint(data["accepted"])
+        self.rejected = HistoryBuffer.from_checkpoint(data["rejected"])
+
+
+if __name__ == "__main__":
+    from simulation import run, kinetic_energy
+    from init import init_positions
+    from forces import energy_and_forces
+    from params import steps
+
+    def total_energy(positions, velocities):
+        return energy_and_forces(positions)[0] + kinetic_energy(velocities)
+
+    # Relajación amortiguada desde la geometría perturbada: dt fijo de
+    # params.py frente al controlador, con el mismo número de pasos.
+    positions = init_positions(seed=3)
+    velocities = np.zeros_like(positions)
+    print(f"Energía total inicial: {total_energy(positions, velocities):.4f} kcal/mol")
+    run(positions=positions, velocities=velocities, n_steps=steps)
+    print(f"dt fijo = {dt} fs: {steps * dt:.1f} fs simulados, "
+          f"energía total final {total_energy(positions, velocities):.4f} kcal/mol")
+
+    controller = AdaptiveTimeStep()
+    positions = init_positions(seed=3)
+    velocities = np.zeros_like(positions)
+    run(positions=positions, velocities=velocities, n_steps=steps, timestep=controller)
+    stats = controller.stats()
+    print(f"dt adaptativo: {controller.time:.1f} fs simulados, "
+          f"energía total final {total_energy(positions, velocities):.4f} kcal/mol")
+    print(f"  dt entre {stats['dt_min']:.4g} y {stats['dt_max']:.4g} fs "
+          f"(medio {stats['dt_mean']:.4g}), {stats['rejected']} pasos rechazados")
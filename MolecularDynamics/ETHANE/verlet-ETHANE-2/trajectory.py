@@ -0,0 +1,314 @@
+"""
+Trayectorias en formato binario con acceso aleatorio por frame.
+
+El XYZ es cómodo para los visualizadores, pero leerlo de vuelta obliga a
+parsear cada línea. Este formato guarda las coordenadas como un bloque
+contiguo que se abre con `np.memmap` como un arreglo (n_frames, n_atoms, 3):
+abrir un archivo de varios GB es instantáneo y cualquier rango de frames se
+lee del disco solo cuando se usa.
+
+Estructura del archivo (little-endian):
+
+  cabecera   MAGIC (8 bytes), n_atoms (u4), bytes por coordenada (u4: 4 u 8),
+             n_frames (u8), offset del índice (u8), símbolos (4 bytes ASCII
+             por átomo, rellenos con ceros); rellena hasta múltiplo de 64
+  frames     n_frames * n_atoms * 3 coordenadas float32/float64 en Å
+  índice     n_frames registros (step: i8, energy: f8); energy es NaN en los
+             frames sin energía (el inicial)
+
+Las trayectorias con caja periódica (`pbc.PeriodicBox`) llevan MAGIC_BOX y,
+entre la cabecera y los símbolos, los tres lados de la caja (3 f8, Å); las
+coordenadas se guardan envueltas, como las produce `simulation.run`, y cada
+frame sigue con los contadores de imágenes de sus átomos (n_atoms * 3 i4),
+con los que `BinaryTrajectory.unwrapped` reconstruye la trayectoria
+continua. Los archivos sin caja conservan el formato original.
+
+Durante la escritura los registros del índice van a un archivo auxiliar
+de tamaño fijo por frame (`index_filename`, el nombre con ".idx"), a medida
+que se escriben los frames, y la cabecera lleva el número de frames del
+último flush (con offset del índice = 0). Al cerrar, el índice se copia al
+final del archivo, se completa la cabecera y el auxiliar se borra. Si la
+escritura se interrumpió (offset = 0), `BinaryTrajectory` recupera los
+frames completos a partir del tamaño del archivo y sus pasos y energías
+del archivo auxiliar (step = -1, energy = NaN donde falten).
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from io_output import ATOM_SYMBOLS, XYZTrajectoryWriter, read_xyz_frames, read_xyz_box
+from pbc import PeriodicBox
+
+MAGIC = b"ETHTRJ01"
+MAGIC_BOX = b"ETHTRJ02"
+_HEADER = struct.Struct("<8sIIQQ")
+_BOX = struct.Struct("<3d")
+_SYMBOL_BYTES = 4
+_ALIGN = 64
+INDEX_DTYPE = np.dtype([("step", "<i8"), ("energy", "<f8")])
+IMAGE_DTYPE = np.dtype("<i4")
+
+
+def _data_offset(n_atoms, has_box=False):
+    size = _HEADER.size + (_BOX.size if has_box else 0) + _SYMBOL_BYTES * n_atoms
+    return -(-size // _ALIGN) * _ALIGN
+
+
+def index_filename(filename):
+    """Archivo auxiliar con el índice de una trayectoria en escritura."""
+    return f"{filename}.idx"
+
+
+class BinaryTrajectoryWriter:
+    """
+    Escritor del formato binario, con la misma interfaz que
+    `io_output.XYZTrajectoryWriter` (write_frame, flush, close, gestor de
+    contexto) para poder usarse en su lugar desde los observadores.
+
+    dtype: np.float32 (por defecto, la mitad de espacio; ~1e-7 Å de error)
+           o np.float64.
+    resume: lo que devolvió checkpoint() (solo el número de frames);
+            descarta los frames posteriores. Vale también si el archivo
+            se cerró después del checkpoint (el índice auxiliar se recrea
+            desde el índice final).
+    box: `pbc.PeriodicBox` a guardar en la cabecera (formato MAGIC_BOX);
+         entonces cada frame guarda también las imágenes que se pasen a
+         write_frame (ceros si no se pasan).
+
+    Nada crece en memoria con la longitud de la corrida: cada frame y su
+    registro del índice se escriben al llegar, y flush() actualiza el
+    número de frames de la cabecera.
+    """
+
+    def __init__(self, filename, symbols=ATOM_SYMBOLS, dtype=np.float32, resume=None,
+                 box=None):
+        self.filename = filename
+        self.symbols = list(symbols)
+        self.box = box
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        if self.dtype.itemsize not in (4, 8) or self.dtype.kind != "f":
+            raise ValueError("dtype debe ser float32 o float64")
+        self.n_atoms = len(self.symbols)
+        if resume is not None:
+            self._n_frames = resume["frames"]
+            self._file = open(filename, "r+b")
+            if not os.path.exists(index_filename(filename)):
+                self._restore_index_file()
+            self._index_file = open(index_filename(filename), "r+b")
+            self._index_file.seek(self._n_frames * INDEX_DTYPE.itemsize)
+            self._index_file.truncate()
+            self._write_header(self._n_frames, 0)
+            self._file.seek(self._data_offset() + self._n_frames * self._frame_bytes())
+            self._file.truncate()
+        else:
+            self._n_frames = 0
+            self._file = open(filename, "wb")
+            self._index_file = open(index_filename(filename), "wb")
+            self._write_header(0, 0)
+            self._file.seek(self._data_offset())
+
+    def _restore_index_file(self):
+        """
+        Recrea el índice auxiliar a partir del índice final de un archivo que
+        se cerró después del checkpoint (p. ej. al terminar con una
+        excepción); lo posterior al checkpoint se descarta al truncar.
+        """
+        self._file.seek(0)
+        _, _, _, n_frames, index_offset = _HEADER.unpack(self._file.read(_HEADER.size))
+        if index_offset == 0 or n_frames < self._n_frames:
+            raise ValueError(f"No se puede reanudar {self.filename}: falta el índice "
+                             f"({index_filename(self.filename)})")
+        self._file.seek(index_offset)
+        with open(index_filename(self.filename), "wb") as f:
+            f.write(self._file.read(self._n_frames * INDEX_DTYPE.itemsize))
+
+    def _data_offset(self):
+        return _data_offset(self.n_atoms, self.box is not None)
+
+    def _frame_bytes(self):
+        itemsize = self.dtype.itemsize + (IMAGE_DTYPE.itemsize if self.box is not None else 0)
+        return self.n_atoms * 3 * itemsize
+
+    @property
+    def frames_written(self):
+        return self._n_frames
+
+    def _write_header(self, n_frames, index_offset):
+        symbols = b"".join(s.encode("ascii")[:_SYMBOL_BYTES].ljust(_SYMBOL_BYTES, b"\0")
+                           for s in self.symbols)
+        if self.box is None:
+            header = _HEADER.pack(MAGIC, self.n_atoms, self.dtype.itemsize,
+                                  n_frames, index_offset) + symbols
+        else:
+            header = (_HEADER.pack(MAGIC_BOX, self.n_atoms, self.dtype.itemsize,
+                                   n_frames, index_offset)
+                      + _BOX.pack(*self.box.lengths) + symbols)
+        self._file.seek(0)
+        self._file.write(header.ljust(self._data_offset(), b"\0"))
+
+    def write_frame(self, positions, step, energy=None, temperature=None, images=None):
+        """
+        Agrega un frame. `temperature` se acepta por compatibilidad y no se
+        guarda; `images` solo se guarda en los archivos con caja.
+        """
+        frame = np.ascontiguousarray(positions, dtype=self.dtype)
+        if frame.shape != (self.n_atoms, 3):
+            raise ValueError(f"Se esperaban posiciones ({self.n_atoms}, 3), llegó {frame.shape}")
+        self._file.write(frame.tobytes())
+        if self.box is not None:
+            self._file.write(np.broadcast_to(
+                np.asarray(0 if images is None else images, dtype=IMAGE_DTYPE),
+                frame.shape).tobytes())
+        self._index_file.write(
+            np.array((step, np.nan if energy is None else energy), dtype=INDEX_DTYPE).tobytes())
+        self._n_frames += 1
+
+    def flush(self):
+        """Vuelca frames e índice y anota en la cabecera cuántos frames hay."""
+        self._index_file.flush()
+        end = self._file.tell()
+        self._write_header(self._n_frames, 0)
+        self._file.seek(end)
+        self._file.flush()
+
+    def checkpoint(self):
+        self.flush()
+        return {"frames": self._n_frames}
+
+    def close(self):
+        """Copia el índice al final del bloque de frames y completa la cabecera."""
+        if self._file.closed:
+            return
+        self._index_file.close()
+        with open(index_filename(self.filename), "rb") as f:
+            index = f.read(self._n_frames * INDEX_DTYPE.itemsize)
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._write_header(self._n_frames, index_offset)
+        self._file.close()
+        os.remove(index_filename(self.filename))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class BinaryTrajectory:
+    """
+    Trayectoria binaria abierta para lectura, sin cargarla en memoria.
+
+      positions: np.memmap (n_frames, n_atoms, 3) de solo lectura
+      steps, energies: (n_frames,) del índice
+      symbols: lista de símbolos atómicos
+      box: lados de la caja periódica (3,) [Å], o None si no tiene
+      images: np.memmap (n_frames, n_atoms, 3) de los contadores de
+              imágenes de cada frame, o None si no tiene caja
+
+    `traj[i]` o `traj[a:b]` devuelven las posiciones de esos frames (vistas
+    del memmap); `np.asarray(traj[a:b])` las lee del disco.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            magic, n_atoms, itemsize, n_frames, index_offset = _HEADER.unpack(
+                f.read(_HEADER.size))
+            if magic not in (MAGIC, MAGIC_BOX):
+                raise ValueError(f"{filename} no es una trayectoria binaria")
+            has_box = magic == MAGIC_BOX
+            self.box = np.array(_BOX.unpack(f.read(_BOX.size))) if has_box else None
+            raw = f.read(_SYMBOL_BYTES * n_atoms)
+        self.symbols = [raw[i:i + _SYMBOL_BYTES].rstrip(b"\0").decode("ascii")
+                        for i in range(0, len(raw), _SYMBOL_BYTES)]
+        self.n_atoms = n_atoms
+        self.dtype = np.dtype("<f4" if itemsize == 4 else "<f8")
+
+        offset = _data_offset(n_atoms, has_box)
+        fields = [("positions", self.dtype, (n_atoms, 3))]
+        if has_box:
+            fields.append(("images", IMAGE_DTYPE, (n_atoms, 3)))
+        frame_dtype = np.dtype(fields)
+        self.complete = index_offset != 0
+        if not self.complete:
+            n_frames = (os.path.getsize(filename) - offset) // frame_dtype.itemsize
+
+        if n_frames:
+            frames = np.memmap(filename, dtype=frame_dtype, mode="r",
+                               offset=offset, shape=(n_frames,))
+        else:
+            frames = np.empty(0, dtype=frame_dtype)
+        self.positions = frames["positions"]
+        self.images = frames["images"] if has_box else None
+
+        if self.complete and n_frames:
+            index = np.memmap(filename, dtype=INDEX_DTYPE, mode="r",
+                              offset=index_offset, shape=(n_frames,))
+        else:
+            index = np.empty(n_frames, dtype=INDEX_DTYPE)
+            index["step"] = -1
+            index["energy"] = np.nan
+            if not self.complete and os.path.exists(index_filename(filename)):
+                partial = np.fromfile(index_filename(filename), dtype=INDEX_DTYPE,
+                                      count=n_frames)
+                index[:len(partial)] = partial
+        self.steps = index["step"]
+        self.energies = index["energy"]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def unwrapped(self, item=slice(None)):
+        """Posiciones continuas (float64) de los frames `item`, a partir de las imágenes."""
+        positions = np.asarray(self.positions[item], dtype=np.float64)
+        if self.images is None:
+            return positions
+        return PeriodicBox(self.box).unwrap(positions, self.images[item])
+
+    def __getitem__(self, item):
+        return self.positions[item]
+
+    def frame_at_step(self, step):
+        """Posiciones del frame guardado en el paso `step`."""
+        matches = np.flatnonzero(self.steps == step)
+        if not len(matches):
+            raise KeyError(f"No hay frame guardado en el paso {step}")
+        return self.positions[matches[0]]
+
+
+def open_trajectory(filename):
+    return BinaryTrajectory(filename)
+
+
+def xyz_to_binary(xyz_filename, binary_filename, dtype=np.float32):
+    """Convierte un XYZ escrito por `write_xyz_frame` al formato binario (con su caja)."""
+    lengths = read_xyz_box(xyz_filename)
+    box = None if lengths is None else PeriodicBox(lengths)
+    writer = None
+    for symbols, positions, step, energy, images in read_xyz_frames(xyz_filename, images=True):
+        if writer is None:
+            writer = BinaryTrajectoryWriter(binary_filename, symbols=symbols, dtype=dtype,
+                                            box=box)
+        writer.write_frame(positions, step, energy, images=images)
+    if writer is None:
+        raise ValueError(f"{xyz_filename} no contiene frames")
+    writer.close()
+    return writer.frames_written
+
+
+def binary_to_xyz(binary_filename, xyz_filename, temperature=None):
+    """Convierte una trayectoria binaria al formato XYZ de `write_xyz_frame`."""
+    traj = BinaryTrajectory(binary_filename)
+    box = None if traj.box is None else PeriodicBox(traj.box)
+    images = traj.images if box is not None else [None] * len(traj)
+    with XYZTrajectoryWriter(xyz_filename, symbols=traj.symbols, box=box) as writer:
+        for positions, step, energy, frame_images in zip(traj.positions, traj.steps,
+                                                         traj.energies, images):
+            writer.write_frame(positions, int(step),
+                               None if np.isnan(energy) else float(energy),
+                               temperature=temperature, images=frame_images)
+    return len(traj)
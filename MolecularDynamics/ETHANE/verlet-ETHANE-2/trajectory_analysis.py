@@ -0,0 +1,295 @@
+"""
+Análisis vectorizado de trayectorias completas.
+
+Todas las funciones trabajan sobre un arreglo de posiciones de forma
+(n_frames, n_atoms, 3), como el que devuelven `load_positions` (XYZ de
+`write_xyz_frame` o trayectoria binaria de `trajectory.py`) o la vista
+`BinaryTrajectory.positions`, sin bucles de Python por frame.
+
+Las correlaciones temporales (desplazamiento cuadrático medio, funciones de
+autocorrelación) se calculan con FFT en O(N log N) en lugar de la suma
+directa O(N²), con relleno de ceros a 2N para obtener la correlación lineal
+(no circular). Para series muy largas los átomos se procesan por bloques
+(`chunk`), así que la memoria de trabajo no crece con el número de átomos.
+
+Unidades: distancias en Å; los tiempos de retardo se devuelven en las
+unidades de `dt_frame` (fs para Verlet, ps para dinámica browniana; ojo, un
+frame del archivo son `xyz_every` pasos de integración).
+
+Las trayectorias con condiciones periódicas guardan coordenadas envueltas
+(los átomos saltan un lado de caja al cruzar una cara) y los contadores de
+imágenes de cada átomo; `unwrap_positions` reconstruye las continuas a
+partir de la caja (`load_box`) y esas imágenes antes de calcular
+desplazamientos.
+"""
+
+import os
+
+import numpy as np
+
+from forces import BONDS, ANGLES, bond_geometry, angle_geometry
+from io_output import read_xyz_frames, read_xyz_box
+from trajectory import MAGIC, MAGIC_BOX, BinaryTrajectory
+from pbc import PeriodicBox
+
+
+def load_positions(source):
+    """
+    Devuelve (positions (n_frames, n_atoms, 3), steps (n_frames,), images),
+    con images los contadores de imágenes (n_frames, n_atoms, 3) de una
+    trayectoria periódica o None si el archivo no los tiene.
+
+    source: archivo XYZ, archivo binario de `trajectory.py` (se devuelve el
+            memmap, sin leerlo entero) o un arreglo ya cargado.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        positions = np.asarray(source)
+        return positions, np.arange(len(positions)), None
+    with open(source, "rb") as f:
+        is_binary = f.read(len(MAGIC)) in (MAGIC, MAGIC_BOX)
+    if is_binary:
+        traj = BinaryTrajectory(source)
+        return traj.positions, np.asarray(traj.steps), traj.images
+    frames = list(read_xyz_frames(source, images=True))
+    positions = np.array([frame[1] for frame in frames])
+    steps = np.array([frame[2] for frame in frames])
+    images = (np.array([frame[4] for frame in frames])
+              if frames and frames[0][4] is not None else None)
+    return positions, steps, images
+
+
+def load_box(source):
+    """Lados de la caja periódica (3,) de un archivo XYZ o binario, o None si no tiene."""
+    with open(source, "rb") as f:
+        is_binary = f.read(len(MAGIC)) in (MAGIC, MAGIC_BOX)
+    return BinaryTrajectory(source).box if is_binary else read_xyz_box(source)
+
+
+def unwrap_positions(positions, box, images=None, out=None, frames=4096):
+    """
+    Trayectoria continua a partir de coordenadas envueltas y sus contadores
+    de imágenes (`pbc.PeriodicBox.unwrap`), exacta aunque los frames estén
+    muy espaciados.
+
+    Para archivos sin imágenes (images=None), el desplazamiento entre frames
+    consecutivos se reduce a su imagen mínima y se acumula; eso vale
+    mientras ningún átomo se mueva más de medio lado de caja entre dos
+    frames guardados.
+
+    Se procesa por bloques de `frames` frames (en el modo sin imágenes el
+    último frame de cada bloque enlaza con el siguiente), así que un memmap
+    no se carga entero: solo el resultado ocupa memoria, o nada si se pasa
+    `out` (p. ej. otro np.memmap, forma de `positions`).
+
+    box: `pbc.PeriodicBox` o los lados de la caja (3,).
+    """
+    box = box if isinstance(box, PeriodicBox) else PeriodicBox(box)
+    if out is None:
+        out = np.empty(np.shape(positions), dtype=np.float64)
+    last_wrapped = last_unwrapped = None
+    for start in range(0, len(positions), frames):
+        block = np.asarray(positions[start:start + frames], dtype=np.float64)
+        stop = start + len(block)
+        if images is not None:
+            out[start:stop] = box.unwrap(block, np.asarray(images[start:stop]))
+            continue
+        if last_wrapped is None:
+            last_wrapped = last_unwrapped = block[0]
+        steps = box.minimum_image(np.diff(block, axis=0, prepend=last_wrapped[None]))
+        out[start:stop] = last_unwrapped + np.cumsum(steps, axis=0)
+        last_wrapped, last_unwrapped = block[-1], out[stop - 1]
+    return out
+
+
+def _fft_size(n):
+    """Potencia de 2 >= 2n: relleno suficiente para que la correlación no sea circular."""
+    return 1 << (2 * n - 1).bit_length()
+
+
+def _correlation_sums(x, max_lag):
+    """
+    Para x de forma (N, A, D), sumas S[k, a] = sum_t sum_d x[t, a, d] x[t+k, a, d]
+    para k = 0..max_lag-1, por FFT.
+    """
+    n = len(x)
+    size = _fft_size(n)
+    spectrum = np.fft.rfft(x, n=size, axis=0)
+    power = (spectrum * spectrum.conj()).real.sum(axis=-1)
+    return np.fft.irfft(power, n=size, axis=0)[:max_lag]
+
+
+def _per_atom(func, x, max_lag, chunk, load=None):
+    """
+    Aplica `func(x[:, bloque], max_lag)` por bloques de átomos y concatena.
+    load(a, b): arreglo float64 de los átomos a:b, si no es x[:, a:b].
+    """
+    if load is None:
+        def load(a, b):
+            return np.asarray(x[:, a:b], dtype=np.float64)
+    n_atoms = x.shape[1]
+    return np.concatenate([func(load(a, a + chunk), max_lag)
+                           for a in range(0, n_atoms, chunk)], axis=1)
+
+
+def _lags(max_lag, dt_frame):
+    return np.arange(max_lag) * dt_frame
+
+
+def autocorrelation(x, max_lag=None, normalize=True, subtract_mean=False,
+                    per_atom=False, dt_frame=1.0, chunk=8):
+    """
+    Función de autocorrelación C(τ) = <x(t) · x(t + τ)> promediada sobre los
+    orígenes t (estimador no sesgado: suma / (N - τ)) y sobre los átomos.
+
+    x: (n_frames, n_atoms, 3) — posiciones o velocidades.
+    normalize: divide por C(0) para que C(0) = 1.
+    subtract_mean: resta el promedio temporal de cada átomo (fluctuaciones).
+    per_atom: devuelve (max_lag, n_atoms) en lugar de promediar sobre átomos.
+
+    Devuelve (tiempos de retardo, C).
+    """
+    n = len(x)
+    max_lag = n if max_lag is None else min(max_lag, n)
+
+    def sums(block, max_lag):
+        if subtract_mean:
+            block = block - block.mean(axis=0)
+        return _correlation_sums(block, max_lag)
+
+    corr = _per_atom(sums, x, max_lag, chunk) / (n - np.arange(max_lag))[:, None]
+    if not per_atom:
+        corr = corr.mean(axis=1)
+    if normalize:
+        corr = corr / corr[0]
+    return _lags(max_lag, dt_frame), corr
+
+
+def velocities_from_positions(positions, dt_frame):
+    """
+    Velocidades por diferencias centradas entre frames (los archivos de
+    trayectoria solo guardan posiciones). Para dinámica browniana son
+    velocidades de desplazamiento medio, no velocidades instantáneas.
+    """
+    return np.gradient(np.asarray(positions, dtype=np.float64), dt_frame, axis=0)
+
+
+def velocity_autocorrelation(positions=None, velocities=None, dt_frame=1.0, **kwargs):
+    """
+    VACF normalizada. Usa `velocities` si se pasan; si no, las estima desde
+    `positions` con `velocities_from_positions`. Acepta las mismas opciones
+    que `autocorrelation`.
+    """
+    if velocities is None:
+        velocities = velocities_from_positions(positions, dt_frame)
+    return autocorrelation(velocities, dt_frame=dt_frame, **kwargs)
+
+
+def position_autocorrelation(positions, dt_frame=1.0, **kwargs):
+    """Autocorrelación de las fluctuaciones de posición respecto de la media."""
+    kwargs.setdefault("subtract_mean", True)
+    return autocorrelation(positions, dt_frame=dt_frame, **kwargs)
+
+
+def mean_squared_displacement(positions, max_lag=None, per_atom=False, dt_frame=1.0, chunk=8,
+                              box=None, images=None):
+    """
+    MSD(τ) = <|r(t + τ) - r(t)|²> promediado sobre todos los orígenes t, por
+    el algoritmo FFT: MSD(τ) = S1(τ) - 2 S2(τ), con S2 la autocorrelación de
+    posiciones y S1 = (1/(N-τ)) sum_t [r²(t) + r²(t+τ)], que se obtiene con
+    sumas acumuladas.
+
+    Devuelve (tiempos de retardo, MSD) con MSD de forma (max_lag,) o
+    (max_lag, n_atoms) si per_atom. Con `box` las posiciones se tratan como
+    envueltas y se desenvuelve cada bloque de `chunk` átomos al leerlo
+    (`unwrap_positions`, con `images` si se pasan).
+    """
+    load = None
+    if box is not None:
+        # Se desenvuelve cada bloque de átomos al usarlo (cada átomo es
+        # independiente), sin copiar la trayectoria entera en memoria
+        def load(a, b):
+            return unwrap_positions(positions[:, a:b], box,
+                                    None if images is None else images[:, a:b])
+    n = len(positions)
+    max_lag = n if max_lag is None else min(max_lag, n)
+    lag = np.arange(max_lag)
+
+    def sums(block, max_lag):
+        r2 = (block**2).sum(axis=-1)                       # (N, A)
+        prefix = np.concatenate([np.zeros((1, r2.shape[1])), np.cumsum(r2, axis=0)])
+        total = prefix[-1]
+        # sum_{t=0}^{N-1-k} r2[t] + sum_{t=k}^{N-1} r2[t]
+        s1 = prefix[n - lag] + (total - prefix[lag])
+        return s1 - 2 * _correlation_sums(block, max_lag)
+
+    msd = _per_atom(sums, positions, max_lag, chunk, load) / (n - lag)[:, None]
+    if not per_atom:
+        msd = msd.mean(axis=1)
+    return _lags(max_lag, dt_frame), msd
+
+
+def center_of_mass(positions, masses):
+    """Trayectoria del centro de masas, (n_frames, 1, 3) para usar con las funciones de arriba."""
+    masses = np.asarray(masses, dtype=np.float64)
+    com = np.tensordot(np.asarray(positions, dtype=np.float64), masses, axes=([1], [0]))
+    return (com / masses.sum())[:, None, :]
+
+
+def diffusion_coefficient(lags, msd, fit_range=(0.1, 0.5)):
+    """
+    Coeficiente de difusión por ajuste lineal de MSD = 6 D τ (3D) en la
+    fracción `fit_range` de los retardos (los más largos tienen pocos
+    orígenes y mucho ruido). Unidades: Å² / unidad de `lags`.
+    """
+    n = len(lags)
+    lo, hi = int(fit_range[0] * n), max(int(fit_range[1] * n), int(fit_range[0] * n) + 2)
+    slope = np.polyfit(lags[lo:hi], msd[lo:hi], 1)[0]
+    return slope / 6.0
+
+
+def pair_distances(positions, pairs=BONDS):
+    """Distancias (n_frames, n_pares) para los pares de átomos dados (por defecto, los enlaces)."""
+    return bond_geometry(np.asarray(positions, dtype=np.float64), np.asarray(pairs))[1]
+
+
+def all_pairs(n_atoms):
+    """Todos los pares i < j, como arreglo (n_pares, 2)."""
+    return np.column_stack(np.triu_indices(n_atoms, k=1))
+
+
+def angle_series(positions, angles=ANGLES):
+    """Ángulos (n_frames, n_ángulos) en grados; por defecto los 6 H-C-H."""
+    cos_theta = angle_geometry(np.asarray(positions, dtype=np.float64), np.asarray(angles))[4]
+    return np.degrees(np.arccos(cos_theta))
+
+
+def distance_distribution(positions, pairs=BONDS, bins=100, range=None, density=True):
+    """
+    Distribución de distancias intramoleculares sobre todos los frames y
+    pares: (histograma, bordes). `pairs="all"` usa todos los pares de átomos.
+    """
+    if isinstance(pairs, str) and pairs == "all":
+        pairs = all_pairs(np.shape(positions)[1])
+    return np.histogram(pair_distances(positions, pairs), bins=bins, range=range, density=density)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python trajectory_analysis.py TRAYECTORIA [dt_frame]")
+        sys.exit(1)
+
+    dt_frame = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    positions, steps, images = load_positions(sys.argv[1])
+    print(f"{len(positions)} frames, {positions.shape[1]} átomos")
+
+    bonds = pair_distances(positions)
+    angles = angle_series(positions)
+    print(f"Distancia C-C media: {bonds[:, 0].mean():.4f} ± {bonds[:, 0].std():.4f} Å")
+    print(f"Distancia C-H media: {bonds[:, 1:].mean():.4f} ± {bonds[:, 1:].std():.4f} Å")
+    print(f"Ángulo H-C-H medio: {angles.mean():.2f} ± {angles.std():.2f}°")
+
+    box = load_box(sys.argv[1])
+    lags, msd = mean_squared_displacement(positions, dt_frame=dt_frame, box=box, images=images)
+    print(f"D (ajuste del MSD atómico): {diffusion_coefficient(lags, msd):.4e} Å²/unidad de tiempo")
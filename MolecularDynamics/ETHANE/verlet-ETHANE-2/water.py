@@ -0,0 +1,184 @@
+"""
+Cajas periódicas de agua 3D con cargas parciales y electrostática PME.
+
+Los scripts de `H2O/` modelan una molécula de agua 2D con resortes O-H y sin
+cargas. Aquí cada molécula es 3D y flexible, con el modelo SPC/Fw (Wu,
+Tepper y Voth, J. Chem. Phys. 124, 024503, 2006): enlaces O-H y ángulo
+H-O-H armónicos, cargas parciales en los tres átomos y Lennard-Jones solo
+entre oxígenos. `water_box` arma la caja (misma red cúbica con
+orientaciones al azar que `liquid.ethane_lattice`) y `water_kernel` suma
+
+  - los términos enlazantes (`forces.bonded_kernel`, con imagen mínima),
+  - Lennard-Jones O-O (`nonbonded.LennardJones`),
+  - Coulomb con Ewald de malla suave (`ewald.ParticleMeshEwald`),
+
+los dos últimos sobre la misma lista de vecinos periódica. El núcleo se usa
+con `simulation.run(kernel=..., masses=..., box=...)`.
+"""
+
+import time
+
+import numpy as np
+
+from forces import bonded_kernel, sum_kernels
+from neighbors import NeighborList
+from nonbonded import LennardJones
+from init import random_rotations
+from ewald import COULOMB, ParticleMeshEwald
+
+# SPC/Fw: U_enlace = 1/2 k (r - r0)², U_ángulo = 1/2 k (theta - theta0)²
+WATER_BOND_K = 1059.162     # [kcal/mol/Å²]
+WATER_R0 = 1.012            # [Å]
+WATER_ANGLE_K = 75.90       # [kcal/mol/rad²]
+WATER_THETA0 = 113.24       # [grados]
+WATER_CHARGES = np.array([-0.82, 0.41, 0.41])    # O, H, H [e]
+WATER_LJ_PARAMS = {"O": (3.165492, 0.1554253), "H": (0.0, 0.0)}
+WATER_MASSES = np.array([15.9994, 1.008, 1.008])
+WATER_SYMBOLS = ["O", "H", "H"]
+
+# Topología de una molécula: O-H1, O-H2, el ángulo H1-O-H2 y los pares sin
+# Coulomb (todos los de la molécula)
+WATER_BONDS = np.array([[0, 1], [0, 2]])
+WATER_ANGLES = np.array([[1, 0, 2]])
+WATER_PAIRS = np.array([[0, 1], [0, 2], [1, 2]])
+
+
+def water_geometry():
+    """Posiciones (3, 3) de una molécula en su geometría de equilibrio, centrada en el O."""
+    half = np.radians(WATER_THETA0) / 2
+    return np.array([[0.0, 0.0, 0.0],
+                     [WATER_R0 * np.sin(half), WATER_R0 * np.cos(half), 0.0],
+                     [-WATER_R0 * np.sin(half), WATER_R0 * np.cos(half), 0.0]])
+
+
+def water_box(n_per_side, spacing=3.104, seed=None):
+    """
+    n_per_side³ moléculas de agua en una red cúbica de paso `spacing` [Å]
+    (3.104 Å da la densidad del agua líquida, ~1 g/cm³). Devuelve un
+    diccionario con las mismas claves que `liquid.ethane_lattice`, más
+    "charges" y "exclusions" (pares sin Coulomb).
+    """
+    rng = np.random.default_rng(seed)
+    reference = water_geometry()
+    reference -= reference.mean(axis=0)
+    n_molecules = n_per_side**3
+    n_atoms = len(reference)
+
+    grid = np.stack(np.meshgrid(*[np.arange(n_per_side)] * 3, indexing="ij"), axis=-1)
+    centers = (grid.reshape(-1, 3) + 0.5) * spacing
+    rotations = random_rotations(rng, n_molecules)
+    positions = np.einsum("mij,aj->mai", rotations, reference) + centers[:, None, :]
+
+    offsets = (np.arange(n_molecules) * n_atoms)[:, None, None]
+    return {
+        "positions": positions.reshape(-1, 3),
+        "symbols": WATER_SYMBOLS * n_molecules,
+        "masses": np.tile(WATER_MASSES, n_molecules),
+        "charges": np.tile(WATER_CHARGES, n_molecules),
+        "molecule": np.repeat(np.arange(n_molecules), n_atoms),
+        "bonds": (WATER_BONDS[None] + offsets).reshape(-1, 2),
+        "angles": (WATER_ANGLES[None] + offsets).reshape(-1, 3),
+        "bond_r0": np.full(2 * n_molecules, WATER_R0),
+        "angle_theta0": np.full(n_molecules, np.radians(WATER_THETA0)),
+        "exclusions": (WATER_PAIRS[None] + offsets).reshape(-1, 2),
+        "box": n_per_side * spacing,
+    }
+
+
+def water_kernel(system, box, cutoff=9.0, skin=1.0, alpha=None, tol=1e-5,
+                 grid=None, grid_spacing=1.0, order=4):
+    """
+    Núcleo SPC/Fw completo para `system` (de `water_box`) en la caja
+    periódica `box`. cutoff es el corte de Lennard-Jones y del espacio real
+    de Ewald; alpha, tol, grid, grid_spacing y order son las perillas de
+    `ewald.ParticleMeshEwald`. Devuelve (núcleo, lista de vecinos, PME).
+    """
+    bonded = bonded_kernel(system["bonds"], system["angles"], system["bond_r0"],
+                           system["angle_theta0"], k_bond=WATER_BOND_K,
+                           k_angle=WATER_ANGLE_K, box=box)
+    neighbors = NeighborList(cutoff, skin, exclude=system["molecule"], box=box)
+    lj = LennardJones(system["symbols"], neighbors, params=WATER_LJ_PARAMS)
+    pme = ParticleMeshEwald(system["charges"], box, neighbors, exclusions=system["exclusions"],
+                            alpha=alpha, tol=tol, grid=grid, grid_spacing=grid_spacing,
+                            order=order)
+    return sum_kernels(bonded, lj, pme), neighbors, pme
+
+
+def direct_coulomb(positions, charges, box, molecule):
+    """
+    Coulomb por suma directa de todos los pares intermoleculares con imagen
+    mínima, O(N²): la alternativa sin Ewald (sin largo alcance más allá de
+    la imagen mínima), para comparar costos. Devuelve la energía.
+    """
+    i, j = np.triu_indices(len(positions), k=1)
+    keep = molecule[i] != molecule[j]
+    i, j = i[keep], j[keep]
+    r = np.sqrt((box.minimum_image(positions[j] - positions[i]) ** 2).sum(axis=1))
+    return COULOMB * (charges[i] * charges[j] / r).sum()
+
+
+if __name__ == "__main__":
+    from pbc import PeriodicBox
+    from ewald import ewald_reciprocal
+    from simulation import run
+    from observers import CallbackObserver
+
+    # Precisión: fuerzas recíprocas de PME frente a la suma de Ewald directa
+    system = water_box(4, seed=0)
+    box = PeriodicBox(system["box"])
+    positions = system["positions"]
+    _, _, pme = water_kernel(system, box, cutoff=5.0)
+    reference = ewald_reciprocal(positions, system["charges"], box, pme.alpha, k_max=12)
+    f_norm = np.sqrt((reference[1]**2).sum(axis=1).mean())
+    print(f"{len(positions)} átomos, caja de {box.lengths[0]:.2f} Å, α = {pme.alpha:.3f} 1/Å")
+    print(f"{'malla':>12} {'orden':>6} {'error E rec':>12} {'error F rms':>12} {'tiempo [ms]':>12}")
+    for grid_spacing in (2.0, 1.0, 0.5):
+        for order in (4, 6):
+            _, _, pme = water_kernel(system, box, cutoff=5.0, grid_spacing=grid_spacing,
+                                     order=order)
+            t0 = time.perf_counter()
+            energy, forces = pme._reciprocal(positions)
+            elapsed = time.perf_counter() - t0
+            error = np.sqrt(((forces - reference[1])**2).sum(axis=1).mean()) / f_norm
+            print(f"{'x'.join(map(str, pme.grid)):>12} {order:6d} "
+                  f"{abs(energy - reference[0]) / abs(reference[0]):12.2e} {error:12.2e} "
+                  f"{elapsed * 1e3:12.2f}")
+
+    # Costo: PME completo frente a la suma directa O(N²)
+    print(f"\n{'átomos':>8} {'PME [s]':>9} {'directa [s]':>12}")
+    for n_per_side in (8, 10, 12, 14):
+        system = water_box(n_per_side, seed=0)
+        box = PeriodicBox(system["box"])
+        kernel, _, _ = water_kernel(system, box)
+        kernel(system["positions"])
+        t0 = time.perf_counter()
+        kernel(system["positions"])
+        t_pme = time.perf_counter() - t0
+        if len(system["positions"]) <= 3000:
+            t0 = time.perf_counter()
+            direct_coulomb(system["positions"], system["charges"], box, system["molecule"])
+            t_direct = f"{time.perf_counter() - t0:12.3f}"
+        else:
+            t_direct = f"{'-':>12}"
+        print(f"{len(system['positions']):8d} {t_pme:9.3f} {t_direct}")
+
+    # Conservación de la energía sin amortiguamiento
+    system = water_box(8, seed=1)
+    box = PeriodicBox(system["box"])
+    kernel, neighbors, pme = water_kernel(system, box)
+    positions = system["positions"].copy()
+    velocities = np.zeros_like(positions)
+    energies = []
+    record = CallbackObserver(lambda state: energies.append(state["te"]), every=10)
+    n_steps = 200
+    t0 = time.perf_counter()
+    run(positions=positions, velocities=velocities, n_steps=n_steps, dt=0.25, damping=0.0,
+        kernel=kernel, masses=system["masses"], box=box, observers=[record])
+    elapsed = time.perf_counter() - t0
+    energies = np.array(energies)
+    print(f"\nNVE, {len(positions)} átomos, {n_steps} pasos de 0.25 fs: energía total "
+          f"{energies[0]:.2f} -> {energies[-1]:.2f} kcal/mol "
+          f"(desviación máx. {np.abs(energies - energies[0]).max():.3f})")
+    print(f"Términos de Coulomb: " + ", ".join(f"{k} {v:.1f}" for k, v in pme.last_terms.items()))
+    print(f"Tiempo: {elapsed:.2f} s ({elapsed / n_steps * 1e3:.1f} ms por paso), "
+          f"{neighbors.stats()['rebuilds']} reconstrucciones de la lista de vecinos")
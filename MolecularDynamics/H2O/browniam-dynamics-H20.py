@@ -11,8 +11,15 @@
 # Al ejecutar el código, se generará una gráfica que muestra la evolución de la posición x de cada átomo (oxígeno y dos hidrógenos) a lo largo del tiempo, lo que permite visualizar cómo se mueve cada átomo bajo la influencia de las fuerzas de resorte y el ruido térmico.
 # Importar bibliotecas necesarias
 # Este código simula la dinámica browniana de una molécula de agua (H2O) utilizando un modelo simplificado de resortes para representar los enlaces O-H. La simulación se realiza utilizando un enfoque de Langevin overdamped, que incluye tanto las fuerzas de resorte como el ruido térmico. Al final, se grafica la evolución de la posición x de cada átomo a lo largo del tiempo.
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+# Modelo de fuerzas compartido (ETHANE/verlet-ETHANE-2/forces.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "ETHANE", "verlet-ETHANE-2"))
+from forces import bond_forces
 
 # Parámetros físicos y de simulación
 k = 100.0              # Constante del resorte (kcal/mol/Å²)
@@ -22,51 +29,69 @@ gamma = 1.0            # Coeficiente de fricción
 kT = 0.001             # Energía térmica (kcal/mol)
 steps = 10000
 
-# Posiciones iniciales
-positions = np.array([
-    [0.0, 0.0],         # Oxígeno
-    [1.5, 0.0],         # H1 desplazado
-    [-1.0, 1.0]         # H2
-])
-
-trajectory = [positions.copy()]
-
-# Función de fuerza por resorte
-def spring_force(r_vec, r0, k):
-    dist = np.linalg.norm(r_vec)
-    if dist == 0:
-        return np.zeros_like(r_vec)
-    direction = r_vec / dist
-    return -k * (dist - r0) * direction
-
-# Simulación
-for step in range(steps):
-    forces = np.zeros_like(positions)
-
-    # O-H1 y O-H2
-    for i in [1, 2]:
-        r_vec = positions[i] - positions[0]
-        f = spring_force(r_vec, r_eq, k)
-        forces[i] += f
-        forces[0] -= f
-
-    # Movimiento tipo Langevin overdamped
-    noise = np.random.normal(scale=np.sqrt(2 * gamma * kT * dt), size=positions.shape)
-    positions += dt / gamma * forces + noise
-
-    trajectory.append(positions.copy())
-
-# Convertir trayectoria a array
-trajectory = np.array(trajectory)
-
-# Graficar trayectoria en tiempo para cada átomo (coordenada x)
-plt.figure(figsize=(10, 6))
-labels = ['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']
-for i in range(3):
-    plt.plot(trajectory[:, i, 0], label=f'{labels[i]} - x')
-plt.xlabel('Tiempo (pasos)')
-plt.ylabel('Posición x (Å)')
-plt.title('Evolución de posición x con el tiempo')
-plt.legend()
-plt.grid()
-plt.show()
\ No newline at end of file
+# Enlaces (i, j) de la molécula: O-H1 y O-H2
+BONDS = np.array([[0, 1], [0, 2]])
+
+# Fuerzas de resorte sobre todos los enlaces a la vez (ley de Hooke vectorial,
+# forces.bond_forces: vale igual en 2D que en 3D)
+def compute_forces(pos):
+    forces = np.zeros_like(pos)
+    bond_forces(pos, forces, BONDS, r_eq, k)
+    return forces
+
+# Simulación sin gráficos.
+# observers: objetos con atributo `every` que se llaman como observer(step, positions)
+# cada `every` pasos (escritura de archivos, análisis...); no hace falta matplotlib.
+# integrator: "euler" (Euler-Maruyama) o "lm" (Leimkuhler-Matthews: el ruido de cada
+# paso es el promedio de dos números aleatorios consecutivos; mismo costo, pero las
+# distribuciones de equilibrio son correctas a segundo orden y admite dt mayores).
+def run(n_steps=steps, observers=(), integrator="euler"):
+    # Posiciones iniciales
+    positions = np.array([
+        [0.0, 0.0],         # Oxígeno
+        [1.5, 0.0],         # H1 desplazado
+        [-1.0, 1.0]         # H2
+    ])
+
+    trajectory = [positions.copy()]
+    noise_scale = np.sqrt(2 * gamma * kT * dt)
+    if integrator == "lm":
+        previous_noise = np.random.normal(scale=noise_scale, size=positions.shape)
+
+    for step in range(n_steps):
+        forces = compute_forces(positions)
+
+        # Movimiento tipo Langevin overdamped
+        noise = np.random.normal(scale=noise_scale, size=positions.shape)
+        if integrator == "lm":
+            positions += dt / gamma * forces + 0.5 * (previous_noise + noise)
+            previous_noise = noise
+        else:
+            positions += dt / gamma * forces + noise
+
+        trajectory.append(positions.copy())
+
+        for observer in observers:
+            if (step + 1) % observer.every == 0:
+                observer(step + 1, positions)
+
+    # Convertir trayectoria a array
+    return np.array(trajectory)
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    trajectory = run()
+
+    # Graficar trayectoria en tiempo para cada átomo (coordenada x)
+    plt.figure(figsize=(10, 6))
+    labels = ['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']
+    for i in range(3):
+        plt.plot(trajectory[:, i, 0], label=f'{labels[i]} - x')
+    plt.xlabel('Tiempo (pasos)')
+    plt.ylabel('Posición x (Å)')
+    plt.title('Evolución de posición x con el tiempo')
+    plt.legend()
+    plt.grid()
+    plt.show()
\ No newline at end of file
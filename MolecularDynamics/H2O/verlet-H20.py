@@ -13,8 +13,15 @@
 # pip install numpy matplotlib
 # Este código simula la dinámica de una molécula de agua utilizando el método de Verlet con disipación, modelando los enlaces O-H como resortes y agregando un término de fricción para observar la relajación hacia el equilibrio.
 # El resultado incluye gráficos de la evolución de la posición x en el tiempo para cada átomo, así como un estado de fase que muestra la relación entre posición y velocidad en la coordenada x.
+import os
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+# Modelo de fuerzas compartido (ETHANE/verlet-ETHANE-2/forces.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "ETHANE", "verlet-ETHANE-2"))
+from forces import bond_forces
 
 # Parámetros físicos
 k = 100.0          # Constante del resorte (kcal/mol/Å²)
@@ -23,76 +30,83 @@ dt = 0.001         # Paso de tiempo
 steps = 10000
 gamma = 1.0        # Coeficiente de fricción (disipación)
 
-# Posiciones iniciales (Oxígeno en el centro)
-positions = np.array([
-    [0.0, 0.0],       # Oxígeno
-    [1.5, 0.0],       # Hidrógeno 1 (desplazado)
-    [-1.0, 1.0]       # Hidrógeno 2
-])
-
-# Velocidades iniciales
-velocities = np.zeros_like(positions)
-
 # Masas (aproximadas)
 masses = np.array([16.0, 1.0, 1.0]).reshape(-1, 1)
 
-# Almacenar historia
-pos_history = [positions.copy()]
-vel_history = [velocities.copy()]
-
-# Función de fuerza por resorte
-def spring_force(r_vec, r0, k):
-    dist = np.linalg.norm(r_vec)
-    if dist == 0:
-        return np.zeros_like(r_vec)
-    direction = r_vec / dist
-    return -k * (dist - r0) * direction
-
-# Simulación con dinámica molecular y disipación (Langevin simplificado)
-for step in range(steps):
-    forces = np.zeros_like(positions)
-
-    # Fuerzas del oxígeno a cada hidrógeno
-    for i in [1, 2]:
-        r_vec = positions[i] - positions[0]
-        f = spring_force(r_vec, r_eq, k)
-        forces[i] += f
-        forces[0] -= f
-
-    # Agregar fricción (fuerza viscosa proporcional a velocidad)
-    forces -= gamma * velocities
-
-    # Actualización por integración tipo Verlet con velocidad (Velocity-Verlet)
-    accelerations = forces / masses
-    velocities += accelerations * dt
-    positions += velocities * dt
-
-    pos_history.append(positions.copy())
-    vel_history.append(velocities.copy())
-
-# Convertir a arrays para análisis
-pos_history = np.array(pos_history)  # shape: (steps, 3, 2)
-vel_history = np.array(vel_history)
-
-# Graficar evolución de posición x en el tiempo para cada átomo
-t = np.arange(steps + 1) * dt
-plt.figure(figsize=(10, 6))
-for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
-    plt.plot(t, pos_history[:, i, 0], label=f'{label} - x')
-plt.xlabel('Tiempo (ps)')
-plt.ylabel('Posición x (Å)')
-plt.title('Relajación de posiciones - coordenada x')
-plt.legend()
-plt.grid()
-plt.show()
-
-# Graficar estado de fase (posición vs velocidad en x)
-plt.figure(figsize=(8, 6))
-for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
-    plt.plot(pos_history[:, i, 0], vel_history[:, i, 0], label=label)
-plt.xlabel('Posición x (Å)')
-plt.ylabel('Velocidad x (Å/ps)')
-plt.title('Estado de fase - coordenada x')
-plt.legend()
-plt.grid()
-plt.show()
\ No newline at end of file
+# Enlaces (i, j) de la molécula: O-H1 y O-H2
+BONDS = np.array([[0, 1], [0, 2]])
+
+# Fuerzas de resorte sobre todos los enlaces a la vez (ley de Hooke vectorial,
+# forces.bond_forces: vale igual en 2D que en 3D)
+def compute_forces(pos):
+    forces = np.zeros_like(pos)
+    bond_forces(pos, forces, BONDS, r_eq, k)
+    return forces
+
+# Simulación con dinámica molecular y disipación (Langevin simplificado), sin gráficos.
+# observers: objetos con atributo `every` que se llaman como observer(step, positions, velocities)
+# cada `every` pasos (escritura de archivos, análisis...); no hace falta matplotlib.
+def run(n_steps=steps, observers=()):
+    # Posiciones iniciales (Oxígeno en el centro)
+    positions = np.array([
+        [0.0, 0.0],       # Oxígeno
+        [1.5, 0.0],       # Hidrógeno 1 (desplazado)
+        [-1.0, 1.0]       # Hidrógeno 2
+    ])
+
+    # Velocidades iniciales
+    velocities = np.zeros_like(positions)
+
+    # Almacenar historia
+    pos_history = [positions.copy()]
+    vel_history = [velocities.copy()]
+
+    for step in range(n_steps):
+        forces = compute_forces(positions)
+
+        # Agregar fricción (fuerza viscosa proporcional a velocidad)
+        forces -= gamma * velocities
+
+        # Actualización por integración tipo Verlet con velocidad (Velocity-Verlet)
+        accelerations = forces / masses
+        velocities += accelerations * dt
+        positions += velocities * dt
+
+        pos_history.append(positions.copy())
+        vel_history.append(velocities.copy())
+
+        for observer in observers:
+            if (step + 1) % observer.every == 0:
+                observer(step + 1, positions, velocities)
+
+    # Convertir a arrays para análisis
+    return np.array(pos_history), np.array(vel_history)  # shape: (steps + 1, 3, 2)
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    pos_history, vel_history = run()
+
+    # Graficar evolución de posición x en el tiempo para cada átomo
+    t = np.arange(steps + 1) * dt
+    plt.figure(figsize=(10, 6))
+    for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
+        plt.plot(t, pos_history[:, i, 0], label=f'{label} - x')
+    plt.xlabel('Tiempo (ps)')
+    plt.ylabel('Posición x (Å)')
+    plt.title('Relajación de posiciones - coordenada x')
+    plt.legend()
+    plt.grid()
+    plt.show()
+
+    # Graficar estado de fase (posición vs velocidad en x)
+    plt.figure(figsize=(8, 6))
+    for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
+        plt.plot(pos_history[:, i, 0], vel_history[:, i, 0], label=label)
+    plt.xlabel('Posición x (Å)')
+    plt.ylabel('Velocidad x (Å/ps)')
+    plt.title('Estado de fase - coordenada x')
+    plt.legend()
+    plt.grid()
+    plt.show()
\ No newline at end of file